@@ -0,0 +1,205 @@
+"""
+Nested Booking Limits
+EMSR-b protection levels per day and park, validated against first-come-first-served
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from pricing_model import segments, current_prices, segment_shares, segment_vector
+from capacity_allocation import park_daily_permits, east_african_min_share
+from forecast_optimization import forecast_start
+from revenue_projection import base_year_demand
+
+
+def daily_segment_demand(monthly_demand, year=forecast_start.year, daily_permits=None, shares=None):
+    """
+    Expected requests per day, park and segment from a 12-month permit forecast.
+
+    Each month's forecast is spread evenly over its days and split across
+    parks in proportion to their daily permits, as in capacity_allocation.py.
+    Returns dates, a days x parks x segments array and the parks' daily capacity.
+    """
+    daily_permits = daily_permits or park_daily_permits
+    capacity = np.array(list(daily_permits.values()), dtype=float)
+    dates = pd.date_range(f'{year}-01-01', f'{year}-12-31', freq='D')
+    per_day = np.asarray(monthly_demand, dtype=float)[dates.month - 1] / dates.days_in_month
+    shares = segment_vector(segment_shares if shares is None else shares)
+    mu = per_day.to_numpy()[:, None, None] * (capacity / capacity.sum())[None, :, None] * shares
+    return dates, mu, capacity
+
+
+def emsr_b(mu, fares, capacity, sigma=None, min_limits=None):
+    """
+    EMSR-b protection levels and nested booking limits.
+
+    mu, sigma and fares have segments on the last axis and broadcast over
+    any leading axes (days, parks); capacity broadcasts against the leading
+    axes. sigma defaults to Poisson sqrt(mu). Segments are nested by fare
+    within each cell, so month-varying schedules are handled too.
+
+    Returns (protection, limits), both in segment order: protection[..., j]
+    is the number of permits held back for segments paying more than j, and
+    limits[..., j] is the most permits segment j may book. min_limits
+    optionally guarantees a floor for a segment's limit (equity quotas).
+    """
+    mu = np.asarray(mu, dtype=float)
+    fares = np.broadcast_to(np.asarray(fares, dtype=float), mu.shape)
+    sigma = np.sqrt(mu) if sigma is None else np.broadcast_to(np.asarray(sigma, dtype=float), mu.shape)
+    capacity = np.broadcast_to(np.asarray(capacity, dtype=float), mu.shape[:-1])[..., None]
+
+    # Highest fare first
+    order = np.argsort(-fares, axis=-1, kind='stable')
+    f = np.take_along_axis(fares, order, axis=-1)
+    m = np.take_along_axis(mu, order, axis=-1)
+    s = np.take_along_axis(sigma, order, axis=-1)
+
+    cum_mu = np.cumsum(m, axis=-1)
+    cum_sd = np.sqrt(np.cumsum(s ** 2, axis=-1))
+    f_agg = np.divide(np.cumsum(f * m, axis=-1), cum_mu, out=f.copy(), where=cum_mu > 0)
+
+    # Protect the top-j nest against class j+1: P(D_1..j > y) = f_{j+1} / f_agg_j
+    ratio = np.clip(f[..., 1:] / f_agg[..., :-1], 0, 1)
+    y = cum_mu[..., :-1] + cum_sd[..., :-1] * norm.ppf(1 - ratio)
+    y = np.round(np.clip(np.nan_to_num(y, neginf=0.0), 0, capacity))
+    y = np.maximum.accumulate(y, axis=-1)
+
+    sorted_protection = np.concatenate([np.zeros_like(capacity), y], axis=-1)
+    sorted_limits = capacity - sorted_protection
+
+    protection = np.empty_like(sorted_protection)
+    limits = np.empty_like(sorted_limits)
+    np.put_along_axis(protection, order, sorted_protection, axis=-1)
+    np.put_along_axis(limits, order, sorted_limits, axis=-1)
+    if min_limits is not None:
+        limits = np.minimum(np.maximum(limits, min_limits), capacity)
+    return protection, limits
+
+
+def _request_sequence(demand, rng):
+    # Each cell's requests as segment labels in random order, padded with -1
+    n_max = demand.sum(axis=-1).max()
+    ends = np.cumsum(demand, axis=-1)
+    position = np.arange(n_max)
+    labels = (position[None, :, None] >= ends[:, None, :]).sum(axis=-1)
+    labels = np.where(position[None, :] < ends[:, -1:], labels, -1)
+    keys = np.where(labels >= 0, rng.random(labels.shape), np.inf)
+    return np.take_along_axis(labels, np.argsort(keys, axis=1), axis=1)
+
+
+def simulate_bookings(mu, fares, limits, capacity, n_reps=200, arrival='low_before_high', seed=42):
+    """
+    Monte Carlo revenue under nested booking limits.
+
+    Requests are Poisson(mu) per cell. With arrival='low_before_high' all
+    requests of cheaper segments arrive first (the EMSR assumption and the
+    worst case for first-come-first-served); with 'random' requests arrive
+    in random order and a segment books only while it and the cheaper
+    segments together are under its limit (standard nesting). Pass limits equal to
+    capacity for first-come-first-served. Every replication, day and park
+    is simulated at once; returns (revenue, sold) with a leading rep axis.
+    """
+    rng = np.random.default_rng(seed)
+    mu = np.asarray(mu, dtype=float)
+    fares = np.broadcast_to(np.asarray(fares, dtype=float), mu.shape)
+    limits = np.broadcast_to(np.asarray(limits, dtype=float), mu.shape)
+    capacity = np.broadcast_to(np.asarray(capacity, dtype=float), mu.shape[:-1])
+    demand = rng.poisson(mu, size=(n_reps,) + mu.shape)
+
+    if arrival == 'low_before_high':
+        order = np.argsort(fares, axis=-1, kind='stable')
+        sold = np.zeros(demand.shape)
+        booked = np.zeros(demand.shape[:-1])
+        for k in range(mu.shape[-1]):
+            j = order[..., k:k + 1]
+            requested = np.take_along_axis(demand, np.broadcast_to(j, demand.shape[:-1] + (1,)), axis=-1)[..., 0]
+            limit = np.take_along_axis(limits, j, axis=-1)[..., 0]
+            accepted = np.minimum(requested, np.clip(np.minimum(limit, capacity) - booked, 0, None))
+            np.put_along_axis(sold, np.broadcast_to(j, demand.shape[:-1] + (1,)), accepted[..., None], axis=-1)
+            booked = booked + accepted
+    elif arrival == 'random':
+        n_segments = mu.shape[-1]
+        flat = demand.reshape(-1, n_segments)
+        cell_limits = np.broadcast_to(limits, demand.shape).reshape(-1, n_segments)
+        cell_capacity = np.broadcast_to(capacity, demand.shape[:-1]).reshape(-1)
+        # nest[cell, j, k]: segment k books against segment j's limit (fare no higher than j's)
+        nest = fares[..., None, :] <= fares[..., :, None]
+        nest = np.broadcast_to(nest, demand.shape + (n_segments,)).reshape(-1, n_segments, n_segments)
+        sequence = _request_sequence(flat, rng)
+        rows = np.arange(len(flat))
+        sold = np.zeros(flat.shape)
+        for t in range(sequence.shape[1]):
+            label = sequence[:, t]
+            valid = label >= 0
+            segment = np.where(valid, label, 0)
+            # A request books only while its nest (itself and cheaper segments) is under its limit
+            in_nest = (sold * nest[rows, segment]).sum(axis=1)
+            ok = valid & (in_nest < cell_limits[rows, segment]) & (sold.sum(axis=1) < cell_capacity)
+            sold[rows, segment] += ok
+        sold = sold.reshape(demand.shape)
+    else:
+        raise ValueError(f"Unknown arrival pattern '{arrival}'")
+
+    return (sold * fares).sum(axis=-1), sold
+
+
+if __name__ == '__main__':
+    print("="*70)
+    print("NESTED BOOKING LIMITS (EMSR-b)")
+    print("="*70)
+
+    fares = segment_vector(current_prices)
+    ea = segments.index('East_African')
+    monthly_demand = base_year_demand()
+
+    for demand_scale in (1.0, 1.3):
+        dates, mu, capacity = daily_segment_demand(monthly_demand * demand_scale)
+        # East African citizens keep their reserved share of each day's permits
+        min_limits = np.floor(east_african_min_share * capacity)[:, None] * (np.arange(len(segments)) == ea)
+
+        start = time.perf_counter()
+        protection, limits = emsr_b(mu, fares, capacity, min_limits=min_limits)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"\n[{demand_scale:.1f}x forecast demand] {mu.shape[0]} days x {mu.shape[1]} parks: "
+              f"limits computed in {elapsed_ms:.1f} ms")
+
+        rows = []
+        for arrival in ('low_before_high', 'random'):
+            start = time.perf_counter()
+            fcfs_revenue, fcfs_sold = simulate_bookings(mu, fares, capacity[:, None], capacity, arrival=arrival)
+            nested_revenue, nested_sold = simulate_bookings(mu, fares, limits, capacity, arrival=arrival)
+            elapsed = time.perf_counter() - start
+            fcfs_annual = fcfs_revenue.sum(axis=(1, 2))
+            nested_annual = nested_revenue.sum(axis=(1, 2))
+            rows.append({
+                'Arrival': arrival,
+                'FCFS_Revenue': fcfs_annual.mean(),
+                'Nested_Revenue': nested_annual.mean(),
+                'Uplift_%': (nested_annual / fcfs_annual - 1).mean() * 100,
+                'Uplift_P05_%': np.percentile((nested_annual / fcfs_annual - 1) * 100, 5),
+                'FCFS_EA_Permits': fcfs_sold[..., ea].sum(axis=(1, 2)).mean(),
+                'Nested_EA_Permits': nested_sold[..., ea].sum(axis=(1, 2)).mean(),
+                'Sim_Seconds': elapsed
+            })
+        print(pd.DataFrame(rows).round(1).to_string(index=False))
+
+        if demand_scale == 1.0:
+            records = pd.DataFrame({
+                'Date': np.repeat(dates, len(capacity)),
+                'Park': np.tile(list(park_daily_permits), len(dates)),
+                'Capacity': np.tile(capacity, len(dates))
+            })
+            for j, segment in enumerate(segments):
+                records[f'Expected_{segment}'] = mu[..., j].ravel()
+                records[f'Protect_Above_{segment}'] = protection[..., j].ravel()
+                records[f'Limit_{segment}'] = limits[..., j].ravel()
+            records.to_csv(f'booking_limits_{dates[0].year}.csv', index=False)
+
+    print(f"\n✓ Saved: booking_limits_{forecast_start.year}.csv")
+
+    print("\n" + "="*70)
+    print("BOOKING LIMIT ANALYSIS COMPLETE")
+    print("="*70)
@@ -0,0 +1,131 @@
+"""
+Capacity-Constrained Permit Allocation
+Allocates limited monthly permit supply across visitor segments
+"""
+
+import calendar
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import linprog
+
+from pricing_model import (config, segments, current_prices, peak_months,
+                           season_price_matrix, demand_response)
+
+# 8 groups/day x 8 people x 365 days = 23,360 permits/year across the gorilla parks
+park_daily_permits = {
+    'Bwindi': 56,    # 7 habituated groups open to trekking
+    'Mgahinga': 8    # 1 habituated group
+}
+
+# Minimum share of each month's quota reserved for East African citizens
+east_african_min_share = 0.10
+
+
+def monthly_capacity(daily_permits=None, year=2023):
+    """Return a parks x 12 array of monthly permit quotas."""
+    daily_permits = daily_permits or park_daily_permits
+    days = np.array([calendar.monthrange(year, month)[1] for month in range(1, 13)])
+    return np.array(list(daily_permits.values()), dtype=float)[:, None] * days
+
+
+class CapacityAllocator:
+    """
+    Sparse LP that allocates monthly quotas across segments to maximize revenue.
+
+    Variables are permits sold per (park, month, segment). The quota rows are
+    built once for a given problem shape, so repeated calls from a price-search
+    loop only swap the cost vector and bounds before handing off to HiGHS.
+    """
+
+    def __init__(self, n_parks, n_months=12, segment_names=None, protected_segment='East_African'):
+        self.segments = segment_names or segments
+        self.shape = (n_parks, n_months, len(self.segments))
+        self.protected = self.segments.index(protected_segment)
+
+        # One quota row per (park, month) summing that month's segment allocations
+        self.A_ub = sparse.kron(sparse.identity(n_parks * n_months, format='csr'),
+                                np.ones((1, len(self.segments))), format='csr')
+
+    def solve(self, demand, prices, capacity, min_share=east_african_min_share, max_share=None):
+        """
+        Allocate permits for one price scheme.
+
+        demand:   parks x months x segments permits requested at these prices
+        prices:   broadcastable to demand (e.g. months x segments)
+        capacity: parks x months permit quotas
+        max_share: optional {segment: share} cap on a segment's share of quota
+        """
+        demand = np.broadcast_to(np.asarray(demand, dtype=float), self.shape)
+        prices = np.broadcast_to(np.asarray(prices, dtype=float), self.shape)
+        capacity = np.asarray(capacity, dtype=float).reshape(self.shape[:2])
+
+        upper = demand.copy()
+        if max_share:
+            for segment, share in max_share.items():
+                idx = self.segments.index(segment)
+                upper[..., idx] = np.minimum(upper[..., idx], share * capacity)
+
+        # Reserve the protected segment's minimum, limited to what it actually demands
+        lower = np.zeros(self.shape)
+        lower[..., self.protected] = np.minimum(min_share * capacity, upper[..., self.protected])
+
+        res = linprog(-prices.ravel(),
+                      A_ub=self.A_ub, b_ub=capacity.ravel(),
+                      bounds=np.column_stack([lower.ravel(), upper.ravel()]),
+                      method='highs')
+        if not res.success:
+            raise ValueError(f"Allocation LP failed: {res.message}")
+
+        allocation = res.x.reshape(self.shape)
+        return {
+            'allocation': allocation,
+            'revenue': -res.fun,
+            'unserved': demand - allocation,
+            'utilization': allocation.sum(axis=-1) / capacity
+        }
+
+
+if __name__ == '__main__':
+    print("="*70)
+    print("CAPACITY-CONSTRAINED PERMIT ALLOCATION")
+    print("="*70)
+
+    df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
+
+    # Latest full year of demand, split across parks in proportion to quota
+    demand_2023 = df[df['Year'] == 2023].sort_values('Month')[segments].to_numpy(dtype=float)
+    capacity = monthly_capacity()
+    park_share = capacity.sum(axis=1) / capacity.sum()
+    base_demand = park_share[:, None, None] * demand_2023[None, :, :]
+
+    print(f"\n✓ Annual quota: {capacity.sum():,.0f} permits across {len(park_daily_permits)} parks")
+    print(f"✓ 2023 demand: {base_demand.sum():,.0f} permits")
+
+    allocator = CapacityAllocator(n_parks=capacity.shape[0])
+    results = []
+    for scenario in config['scenarios']:
+        name = scenario['name']
+        prices = season_price_matrix(scenario['peak_multiplier'], scenario['offpeak_multiplier'],
+                                     current_prices, peak_months)
+        demand = demand_response(base_demand, prices)
+
+        start = time.perf_counter()
+        solution = allocator.solve(demand, prices, capacity)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        results.append({
+            'Scenario': name,
+            'Unconstrained_Revenue': (demand * prices).sum(),
+            'Constrained_Revenue': solution['revenue'],
+            'Permits_Allocated': solution['allocation'].sum(),
+            'Permits_Unserved': solution['unserved'].sum(),
+            'Peak_Utilization': solution['utilization'].max() * 100,
+            'Solve_ms': elapsed_ms
+        })
+        print(f"  {name}: solved in {elapsed_ms:.1f} ms")
+
+    comparison = pd.DataFrame(results)
+    print("\n" + comparison.round(1).to_string(index=False))
@@ -0,0 +1,206 @@
+"""
+Competitor-Response Pricing
+Best-response and Nash-equilibrium gorilla permit prices for DRC, Uganda and Rwanda
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from pricing_model import config, segments
+from price_schedule import scenario_schedule, schedule_revenue
+
+competitors = config['competitors']
+countries = list(competitors['prices'])
+home_country = 'Uganda'
+
+
+class CompetitiveMarket:
+    """
+    Three-country permit market with linear cross-price demand.
+
+    Demand for country i is calibrated at the observed prices and permits,
+    q_i = q0_i * (1 + sum_j E_ij * (p_j / p0_j - 1)), the multi-country form
+    of the analysis' linear elasticity model, and is capped at each
+    country's annual permit capacity. Every array carries a leading batch
+    axis of K markets (e.g. elasticity draws or home-price candidates), so
+    best responses for all K are found with one grid evaluation.
+    """
+
+    def __init__(self, market=None, elasticity_draws=None):
+        market = market or competitors
+        self.countries = list(market['prices'])
+        self.p0 = np.array([market['prices'][c] for c in self.countries], dtype=float)
+        self.q0 = np.array([market['annual_permits'][c] for c in self.countries], dtype=float)
+        self.capacity = np.array([market['daily_permits'][c] for c in self.countries], dtype=float) * 365
+        E = np.array([[market['cross_elasticities'][i][j] for j in self.countries] for i in self.countries])
+        E = E if elasticity_draws is None else np.asarray(elasticity_draws, dtype=float)
+        self.E = E.reshape(-1, len(self.countries), len(self.countries))
+
+    def _elasticities(self, n_markets):
+        return np.broadcast_to(self.E, (n_markets,) + self.E.shape[1:])
+
+    def demand(self, prices):
+        """K x countries permits sold at K x countries prices."""
+        change = np.atleast_2d(np.asarray(prices, dtype=float)) / self.p0 - 1
+        q = self.q0 * (1 + np.einsum('kij,kj->ki', self._elasticities(len(change)), change))
+        return np.clip(q, 0, self.capacity)
+
+    def revenue(self, prices):
+        return np.asarray(prices, dtype=float) * self.demand(prices)
+
+    def best_response(self, i, prices, span=(0.25, 4.0), grid_points=1001, refine=2):
+        """
+        Revenue-maximizing price for country i given everyone else's prices.
+
+        Searches a grid of span x observed price, then refines twice around
+        the best point, to a resolution of a few cents.
+        """
+        prices = np.asarray(prices, dtype=float)
+        change = prices / self.p0 - 1
+        change[:, i] = 0
+        E = self._elasticities(len(prices))
+        base = self.q0[i] * (1 + np.einsum('kj,kj->k', E[:, i, :], change))
+        slope = self.q0[i] * E[:, i, i] / self.p0[i]
+
+        lo = np.full(len(prices), span[0] * self.p0[i])
+        hi = np.full(len(prices), span[1] * self.p0[i])
+        rows = np.arange(len(prices))
+        for _ in range(refine + 1):
+            grid = lo[:, None] + (hi - lo)[:, None] * np.linspace(0, 1, grid_points)
+            q = np.clip(base[:, None] + slope[:, None] * (grid - self.p0[i]), 0, self.capacity[i])
+            best = grid[rows, np.argmax(grid * q, axis=1)]
+            step = (hi - lo) / (grid_points - 1)
+            lo, hi = np.maximum(best - step, span[0] * self.p0[i]), np.minimum(best + step, span[1] * self.p0[i])
+        return best
+
+    def equilibrium(self, start=None, fixed=None, tol=0.01, max_iter=500):
+        """
+        Nash equilibrium by iterated best response (Gauss-Seidel over countries).
+
+        fixed maps a country to a length-K array of prices it holds while the
+        others respond, e.g. the home country's candidate prices. Returns
+        K x countries prices and the number of rounds used; raises
+        RuntimeError if any market still moves by tol or more after max_iter.
+        """
+        fixed = fixed or {}
+        n_markets = max([len(self.E)] + [np.size(v) for v in fixed.values()])
+        prices = np.tile(self.p0 if start is None else start, (n_markets, 1)).astype(float)
+        for country, values in fixed.items():
+            prices[:, self.countries.index(country)] = values
+
+        players = [i for i, c in enumerate(self.countries) if c not in fixed]
+        for rounds in range(1, max_iter + 1):
+            previous = prices.copy()
+            for i in players:
+                prices[:, i] = self.best_response(i, prices)
+            change = np.max(np.abs(prices - previous), axis=1)
+            if np.max(change) < tol:
+                break
+        else:
+            raise RuntimeError(f"No equilibrium after {max_iter} rounds: {np.sum(change >= tol)} of "
+                               f"{n_markets} markets still moving (largest price change {np.max(change):.3g})")
+        return prices, rounds
+
+    def reaction_factor(self, home_prices, home=home_country):
+        """
+        Home demand with competitors re-optimizing, relative to competitors
+        holding their observed prices, for each candidate home price.
+        """
+        h = self.countries.index(home)
+        home_prices = np.asarray(home_prices, dtype=float)
+        reacted, _ = self.equilibrium(fixed={home: home_prices})
+        held = np.tile(self.p0, (len(home_prices), 1))
+        held[:, h] = home_prices
+        return self.demand(reacted)[:, h] / self.demand(held)[:, h], reacted
+
+
+def effective_home_price(scenario, monthly_demand):
+    """Demand-weighted average foreign non-resident price over the year under a scenario."""
+    fnr = segments.index('Foreign_NonResident')
+    schedule = scenario_schedule(scenario)[:, fnr]
+    return float(schedule @ monthly_demand / monthly_demand.sum())
+
+
+def scenario_annual_revenue(scenario, df, reaction=1.0):
+    """
+    Average annual revenue of a scenario over the historical months, as in
+    revenue_optimization.py, with foreign non-resident demand scaled by
+    reaction, the competitors' response factor for the scenario.
+    """
+    base = df[segments].to_numpy(dtype=float, copy=True)
+    base[:, segments.index('Foreign_NonResident')] *= reaction
+    revenue, _ = schedule_revenue(base, scenario_schedule(scenario), months=df['Month'].to_numpy())
+    return float(revenue) / df['Year'].nunique()
+
+
+if __name__ == '__main__':
+    print("="*70)
+    print("COMPETITOR-RESPONSE PRICING EQUILIBRIUM")
+    print("="*70)
+
+    market = CompetitiveMarket()
+    print("\nCross-price elasticities (row: demand, column: price):")
+    print(pd.DataFrame(market.E[0], index=countries, columns=countries).to_string())
+
+    # Nash equilibrium of the observed market
+    start = time.perf_counter()
+    nash, rounds = market.equilibrium()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    nash_demand = market.demand(nash)[0]
+    print(f"\n✓ Nash equilibrium in {rounds} best-response rounds ({elapsed_ms:.1f} ms)")
+    equilibrium_df = pd.DataFrame({
+        'Observed_Price': market.p0,
+        'Nash_Price': nash[0],
+        'Observed_Permits': market.q0,
+        'Nash_Permits': nash_demand,
+        'Observed_Revenue': market.p0 * market.q0,
+        'Nash_Revenue': nash[0] * nash_demand
+    }, index=countries)
+    print(equilibrium_df.round(0).to_string())
+
+    # Competitor reaction to each pricing scenario's effective foreign price
+    df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
+    fnr_2023 = df[df['Year'] == 2023].sort_values('Month')['Foreign_NonResident'].to_numpy(dtype=float)
+    home_prices = np.array([effective_home_price(s, fnr_2023) for s in config['scenarios']])
+    factor, reacted = market.reaction_factor(home_prices)
+
+    reaction_df = pd.DataFrame({'Scenario': [s['name'] for s in config['scenarios']],
+                                'Uganda_Effective_Price': home_prices})
+    for j, country in enumerate(countries):
+        if country != home_country:
+            reaction_df[f'{country}_Response_Price'] = reacted[:, j]
+    reaction_df['Uganda_Demand_Adjustment'] = factor
+    print("\nCompetitor response to each scenario (foreign non-resident price):")
+    print(reaction_df.round(3).to_string(index=False))
+
+    # Scenario revenue re-evaluated with the competitors' reaction
+    reaction_df['Annual_Revenue'] = [scenario_annual_revenue(s, df) for s in config['scenarios']]
+    reaction_df['Annual_Revenue_With_Reaction'] = [scenario_annual_revenue(s, df, f)
+                                                   for s, f in zip(config['scenarios'], factor)]
+    reaction_df['Reaction_Revenue_Change'] = reaction_df['Annual_Revenue_With_Reaction'] - reaction_df['Annual_Revenue']
+    reaction_df['Reaction_Revenue_Change_Pct'] = reaction_df['Reaction_Revenue_Change'] / reaction_df['Annual_Revenue'] * 100
+    print("\nAnnual revenue with and without competitor reaction:")
+    for row in reaction_df.itertuples():
+        print(f"  {row.Scenario:30s}: ${row.Annual_Revenue:,.0f} -> ${row.Annual_Revenue_With_Reaction:,.0f} "
+              f"({row.Reaction_Revenue_Change_Pct:+.1f}%)")
+
+    # Equilibrium under uncertain elasticities: every draw solved together
+    n_draws = 2000
+    rng = np.random.default_rng(config['random_seed'])
+    draws = market.E[0] * rng.uniform(0.5, 1.5, size=(n_draws,) + market.E[0].shape)
+    start = time.perf_counter()
+    uncertain = CompetitiveMarket(elasticity_draws=draws)
+    nash_draws, rounds = uncertain.equilibrium()
+    elapsed = time.perf_counter() - start
+    print(f"\n✓ {n_draws:,} elasticity draws (±50%) solved in {elapsed:.2f}s ({rounds} rounds)")
+    spread_df = pd.DataFrame(nash_draws, columns=countries).describe(percentiles=[0.05, 0.5, 0.95])
+    print(spread_df.loc[['mean', '5%', '50%', '95%']].round(0).to_string())
+
+    reaction_df.to_csv('competitor_equilibrium.csv', index=False)
+    print("\n✓ Saved: competitor_equilibrium.csv")
+
+    print("\n" + "="*70)
+    print("COMPETITOR ANALYSIS COMPLETE")
+    print("="*70)
@@ -0,0 +1,108 @@
+"""
+Analysis Configuration
+Loads pricing assumptions from pricing_config.json and expands parameter sweeps
+"""
+
+import copy
+import hashlib
+import itertools
+import json
+import os
+
+import numpy as np
+
+config_dir = os.path.dirname(os.path.abspath(__file__))
+default_config_file = os.path.join(config_dir, 'pricing_config.json')
+
+
+def load_config(path=None):
+    """
+    Load the analysis configuration.
+
+    The file is taken from `path`, else the PRICING_CONFIG environment
+    variable, else pricing_config.json next to the scripts. COVID factor
+    years are returned as integers.
+    """
+    path = path or os.environ.get('PRICING_CONFIG', default_config_file)
+    with open(path) as f:
+        config = json.load(f)
+    return normalize(config)
+
+
+def normalize(config):
+    config = copy.deepcopy(config)
+    config['covid_factors'] = {int(year): factor for year, factor in config['covid_factors'].items()}
+    return config
+
+
+def config_hash(config):
+    """Short stable hash identifying a fully-resolved configuration."""
+    payload = dict(config, covid_factors={str(k): v for k, v in config['covid_factors'].items()})
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def scenario_by_name(config, name):
+    for scenario in config['scenarios']:
+        if scenario['name'] == name:
+            return scenario
+    raise KeyError(f"No scenario named '{name}'")
+
+
+def _resolve(node, key):
+    # Lists are addressed by position or by their items' 'name'
+    if isinstance(node, list):
+        return int(key) if key.isdigit() else [item['name'] for item in node].index(key)
+    if isinstance(node, dict) and key not in node and key.lstrip('-').isdigit() and int(key) in node:
+        return int(key)
+    return key
+
+
+def set_path(config, path, value):
+    """Set a dotted-path value, e.g. 'scenarios.Aggressive Pricing.peak_multiplier.East_African'."""
+    keys = path.split('.')
+    node = config
+    for key in keys[:-1]:
+        node = node[_resolve(node, key)]
+    node[_resolve(node, keys[-1])] = value
+
+
+def sweep_values(spec):
+    """
+    Values for one swept parameter: a list, or {'start', 'stop', 'num'} for an
+    even range. A range of integers with an integral step (e.g. seeds) stays
+    integer; any other range is float.
+    """
+    if isinstance(spec, dict):
+        start, stop, num = spec['start'], spec['stop'], spec['num']
+        if all(isinstance(v, int) and not isinstance(v, bool) for v in (start, stop)) \
+                and (num == 1 or (stop - start) % (num - 1) == 0):
+            step = (stop - start) // (num - 1) if num > 1 else 0
+            return [start + i * step for i in range(num)]
+        return [round(float(v), 10) for v in np.linspace(start, stop, num)]
+    return list(spec)
+
+
+def load_sweep(path):
+    """
+    Expand a sweep file into (parameters, config) pairs, one per combination.
+
+    A sweep file names a base config and a 'sweep' mapping of dotted paths to
+    value lists or ranges; runs are the Cartesian product of all values.
+    """
+    with open(path) as f:
+        sweep = json.load(f)
+
+    base = sweep.get('base', default_config_file)
+    if isinstance(base, str):
+        base_path = base if os.path.isabs(base) else os.path.join(os.path.dirname(os.path.abspath(path)), base)
+        base = load_config(base_path)
+    else:
+        base = normalize(base)
+
+    paths = list(sweep['sweep'])
+    grids = [sweep_values(sweep['sweep'][p]) for p in paths]
+    for combination in itertools.product(*grids):
+        config = copy.deepcopy(base)
+        for p, value in zip(paths, combination):
+            set_path(config, p, value)
+        yield dict(zip(paths, combination)), config
@@ -0,0 +1,529 @@
+"""
+Interactive Dashboard Export
+Writes a single self-contained HTML file covering views 01-08 plus daily park demand
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from pricing_model import (config, segments, current_prices, elasticities, peak_months,
+                           segment_vector, demand_response)
+from price_schedule import scenario_schedule
+from batch_decomposition import classical_decompose, mask_periods
+from capacity_allocation import park_daily_permits
+from booking_limits import daily_segment_demand
+from revenue_projection import base_year_demand
+from eda_and_modeling import covid_period
+
+# Most points embedded for any one line; longer series are LTTB-downsampled
+dashboard_max_points = 1000
+
+# The daily park charts are small multiples about 520 px wide; more points than this don't show
+daily_max_points = 240
+
+colors = ['#2E86AB', '#F18F01', '#E63946', '#6A994E', '#A23B72', '#457B9D', '#C73E1D', '#F2CC8F']
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of n_out - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the next bucket's average, which preserves
+    peaks and troughs far better than striding or bucket means.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    edges = np.append(edges, n)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_y = y[edges[i + 1]:edges[i + 2]]
+        avg_x = x[edges[i + 1]:edges[i + 2]].mean()
+        avg_y = np.nanmean(next_y) if np.isfinite(next_y).any() else y[a]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        kept[i + 1] = a
+    return kept
+
+
+def _values(values, decimals=2):
+    values = np.round(np.asarray(values, dtype=float), decimals)
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+def _x_values(index):
+    if isinstance(index, pd.DatetimeIndex):
+        return (index.asi8 // 10**6).tolist()   # epoch milliseconds
+    return _values(index, 4)
+
+
+def line_series(name, index, values, color=None, lower=None, upper=None, dash=False, markers=False,
+                max_points=dashboard_max_points):
+    """One chart line, downsampled with LTTB; an optional band shares the kept points."""
+    index = pd.DatetimeIndex(index) if np.issubdtype(np.asarray(index).dtype, np.datetime64) else np.asarray(index)
+    values = np.asarray(values, dtype=float)
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else index
+    kept = lttb_indices(x, values, max_points)
+    series = {'name': name, 'x': _x_values(index[kept]), 'y': _values(values[kept]),
+              'color': color, 'dash': dash, 'markers': markers, 'points': int(len(values))}
+    if lower is not None:
+        series['lower'] = _values(np.asarray(lower, dtype=float)[kept])
+        series['upper'] = _values(np.asarray(upper, dtype=float)[kept])
+    return series
+
+
+def line_chart(title, series, y_label='', x_type='date', shade=None):
+    return {'type': 'line', 'title': title, 'y_label': y_label, 'x_type': x_type,
+            'series': series, 'shade': shade or []}
+
+
+def bar_chart(title, categories, series, y_label=''):
+    """series: list of (name, values, color)."""
+    return {'type': 'bar', 'title': title, 'y_label': y_label, 'categories': list(categories),
+            'series': [{'name': name, 'values': _values(values), 'color': color} for name, values, color in series]}
+
+
+def heatmap(title, labels, values):
+    return {'type': 'heatmap', 'title': title, 'labels': list(labels), 'values': [_values(row, 3) for row in values]}
+
+
+def _covid_shade():
+    start, end = covid_period[0]
+    return [{'from': int(pd.Timestamp(start).value // 10**6), 'to': int(pd.Timestamp(end).value // 10**6),
+             'label': 'COVID-19'}]
+
+
+def _label(segment):
+    return segment.replace('_', ' ')
+
+
+def build_views(df, forecast_df, daily=None):
+    """Chart specifications for every dashboard view."""
+    views = []
+
+    # 01 Time series
+    monthly_avg = df.groupby('Month')['Total_Permits'].mean()
+    views.append({'id': '01', 'title': 'Time Series', 'charts': [
+        line_chart('Total Gorilla Permit Sales', [line_series('Total permits', df.index, df['Total_Permits'], colors[0])],
+                   'Monthly permits', shade=_covid_shade()),
+        line_chart('Permit Sales by Visitor Category',
+                   [line_series(_label(s), df.index, df[s], colors[i]) for i, s in enumerate(segments)],
+                   'Monthly permits', shade=_covid_shade()),
+        bar_chart('Average Monthly Demand Pattern (Seasonality)',
+                  ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+                  [('Average permits', monthly_avg.reindex(range(1, 13)).to_numpy(), colors[4])], 'Average permits')
+    ]})
+
+    # 02 Seasonal decomposition (COVID months masked, as in eda_and_modeling.py)
+    decomposition = classical_decompose(mask_periods(df[['Total_Permits']], covid_period), period=12)
+    views.append({'id': '02', 'title': 'Decomposition', 'charts': [
+        line_chart(component.title(), [line_series(component.title(), df.index, decomposition[component][0], color)],
+                   shade=_covid_shade())
+        for component, color in zip(['observed', 'trend', 'seasonal', 'resid'], [colors[0], colors[1], colors[6], colors[3]])
+    ]})
+
+    # 03 Correlation
+    corr = df[segments].corr()
+    views.append({'id': '03', 'title': 'Correlation', 'charts': [
+        heatmap('Correlation Between Visitor Segments', [_label(s) for s in segments], corr.to_numpy())
+    ]})
+
+    # 04 Distributions
+    charts = []
+    for i, segment in enumerate(segments):
+        counts, edges = np.histogram(df[segment], bins=20)
+        labels = [f'{lo:.0f}-{hi:.0f}' for lo, hi in zip(edges[:-1], edges[1:])]
+        charts.append(bar_chart(f'{_label(segment)} (mean {df[segment].mean():.0f})', labels,
+                                [('Months', counts, colors[i])], 'Frequency'))
+    views.append({'id': '04', 'title': 'Distributions', 'charts': charts})
+
+    # 05 Peak vs off-peak
+    season = np.where(df['Month'].isin(peak_months), 'Peak', 'Off-Peak')
+    season_summary = df.groupby(season)[['Total_Permits'] + segments].mean()
+    views.append({'id': '05', 'title': 'Peak vs Off-Peak', 'charts': [
+        bar_chart('Peak vs Off-Peak Season Demand', [_label(c) for c in season_summary.columns],
+                  [(name, season_summary.loc[name].to_numpy(), color)
+                   for name, color in [('Peak', '#E63946'), ('Off-Peak', '#457B9D')]], 'Average monthly permits')
+    ]})
+
+    # 06 Forecast
+    history = df[(df.index < '2020-03-01') | (df.index >= '2021-07-01')]['Total_Permits']
+    forecast_index = pd.DatetimeIndex(forecast_df['Date'])
+    band = [c for c in forecast_df.columns if c.startswith('Lower_')]
+    forecast_series = line_series('Forecast', forecast_index, forecast_df['Forecasted_Permits'], colors[2],
+                                  lower=forecast_df[band[0]] if band else None,
+                                  upper=forecast_df[band[0].replace('Lower', 'Upper')] if band else None,
+                                  dash=True, markers=True)
+    views.append({'id': '06', 'title': 'Forecast', 'charts': [
+        line_chart(f'Demand Forecast ({forecast_index[0].year})',
+                   [line_series('Historical (training)', history.index, history, colors[0]), forecast_series],
+                   'Monthly permits')
+    ]})
+
+    # 07 Elasticity
+    market = config['competitors']
+    price = np.array(list(market['prices'].values()), dtype=float)
+    quantity = np.array([market['annual_permits'][c] for c in market['prices']], dtype=float)
+    slope, intercept = np.polyfit(np.log(price), np.log(quantity), 1)
+    price_range = np.linspace(300, 1600, 100)
+    views.append({'id': '07', 'title': 'Elasticity', 'charts': [
+        line_chart('Price-Demand Relationship (Cross-Country)', [
+            *[line_series(country, [p], [q], colors[i], markers=True)
+              for i, (country, p, q) in enumerate(zip(market['prices'], price, quantity))],
+            line_series(f'Log-log fit (slope {slope:.2f})', price_range, np.exp(intercept) * price_range ** slope,
+                        '#555555', dash=True)
+        ], 'Annual permits', x_type='number'),
+        bar_chart('Elasticity by Visitor Segment', [_label(s) for s in elasticities],
+                  [('Price elasticity', list(elasticities.values()), colors[3])], 'Elasticity')
+    ]})
+
+    # 08 Revenue optimization
+    demand = df[segments].to_numpy(dtype=float)
+    months = df['Month'].to_numpy()
+    n_years = df['Year'].nunique()
+    ref = segment_vector(current_prices)
+    baseline_monthly = demand @ ref
+    monthly_revenue, annual = {}, {}
+    for scenario in config['scenarios']:
+        prices = scenario_schedule(scenario, peak_months, current_prices)[months - 1]
+        monthly_revenue[scenario['name']] = (demand_response(demand, prices) * prices).sum(axis=1)
+        annual[scenario['name']] = monthly_revenue[scenario['name']].sum() / n_years
+    names = list(annual)
+    baseline_annual = baseline_monthly.sum() / n_years
+    recommended = next(s for s in config['scenarios'] if s['name'] == config['recommended_scenario'])
+    views.append({'id': '08', 'title': 'Revenue', 'charts': [
+        bar_chart('Annual Revenue by Scenario', names,
+                  [('Annual revenue ($M)', np.array(list(annual.values())) / 1e6, colors[0])], 'Million USD'),
+        bar_chart('Revenue Change vs. Baseline', names,
+                  [('% vs baseline', (np.array(list(annual.values())) / baseline_annual - 1) * 100, colors[1])], '%'),
+        line_chart('Monthly Revenue: Current vs. Optimized', [
+            line_series('Current', df.index, baseline_monthly / 1000, colors[0]),
+            line_series(f"Optimized ({recommended['name']})", df.index, monthly_revenue[recommended['name']] / 1000,
+                        colors[1])
+        ], 'Thousand USD', shade=_covid_shade()),
+        bar_chart('Optimized Season Pricing', [_label(s) for s in segments], [
+            ('Current', ref, '#2E86AB'),
+            ('Peak', ref * segment_vector(recommended['peak_multiplier']), '#E63946'),
+            ('Off-Peak', ref * segment_vector(recommended['offpeak_multiplier']), '#457B9D')
+        ], 'USD')
+    ]})
+
+    # 09 Daily demand by park: many simulated days pre-aggregated to daily quantiles
+    if daily is not None:
+        dates, requests, capacity = daily
+        charts = []
+        for p, park in enumerate(park_daily_permits):
+            park_requests = requests[:, :, p]
+            charts.append(line_chart(f'{park}: Daily Permit Requests', [
+                line_series('Mean requests (5-95% band)', dates, park_requests.mean(axis=0), colors[p],
+                            lower=np.percentile(park_requests, 5, axis=0),
+                            upper=np.percentile(park_requests, 95, axis=0), max_points=daily_max_points),
+                line_series('Daily permits', dates, np.full(len(dates), capacity[p]), '#555555', dash=True,
+                            max_points=daily_max_points)
+            ], 'Requests per day'))
+        views.append({'id': '09', 'title': 'Daily Parks', 'charts': charts})
+
+    return views
+
+
+def write_dashboard(views, path='dashboard.html', title='Gorilla Permit Pricing Dashboard'):
+    """Render views into one HTML file with the data embedded as JSON."""
+    payload = json.dumps({'title': title, 'views': views}, separators=(',', ':')).replace('</', '<\\/')
+    html = html_template.replace('__TITLE__', title).replace('__DATA__', payload)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return os.path.getsize(path)
+
+
+html_template = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font-family: -apple-system, Segoe UI, Helvetica, Arial, sans-serif; margin: 0; color: #222; background: #f6f7f9; }
+header { background: #1f3b4d; color: #fff; padding: 14px 24px; }
+header h1 { margin: 0; font-size: 20px; }
+nav { display: flex; flex-wrap: wrap; gap: 4px; padding: 8px 24px; background: #fff; border-bottom: 1px solid #ddd; }
+nav button { border: 1px solid #ccd; background: #fff; padding: 6px 12px; cursor: pointer; border-radius: 4px; }
+nav button.active { background: #2E86AB; color: #fff; border-color: #2E86AB; }
+main { padding: 16px 24px; }
+.grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(520px, 1fr)); gap: 16px; }
+.card { background: #fff; border: 1px solid #e0e0e0; border-radius: 6px; padding: 10px 12px; position: relative; }
+.card h2 { font-size: 14px; margin: 0 0 6px; }
+.legend { font-size: 12px; display: flex; flex-wrap: wrap; gap: 10px; margin-top: 4px; }
+.legend span::before { content: ''; display: inline-block; width: 10px; height: 10px; margin-right: 4px; background: var(--c); }
+svg { width: 100%; height: auto; display: block; }
+svg text { font-size: 11px; fill: #444; }
+.tip { position: absolute; pointer-events: none; background: rgba(255,255,255,0.95); border: 1px solid #bbb;
+       padding: 4px 6px; font-size: 12px; border-radius: 3px; display: none; white-space: nowrap; }
+</style>
+</head>
+<body>
+<header><h1>__TITLE__</h1></header>
+<nav id="tabs"></nav>
+<main id="view"></main>
+<script id="dashboard-data" type="application/json">__DATA__</script>
+<script>
+const DATA = JSON.parse(document.getElementById('dashboard-data').textContent);
+const NS = 'http://www.w3.org/2000/svg';
+const W = 640, H = 300, M = {l: 62, r: 14, t: 10, b: 34};
+
+function svgEl(tag, attrs, parent) {
+  const e = document.createElementNS(NS, tag);
+  for (const k in attrs) e.setAttribute(k, attrs[k]);
+  if (parent) parent.appendChild(e);
+  return e;
+}
+function fmt(v) {
+  if (v === null || v === undefined) return '-';
+  return Math.abs(v) >= 100 ? v.toLocaleString(undefined, {maximumFractionDigits: 0})
+                            : v.toLocaleString(undefined, {maximumFractionDigits: 2});
+}
+function fmtX(v, type) { return type === 'date' ? new Date(v).toISOString().slice(0, 10) : fmt(v); }
+function niceTicks(lo, hi, n) {
+  if (lo === hi) { lo -= 1; hi += 1; }
+  const step0 = (hi - lo) / n, mag = Math.pow(10, Math.floor(Math.log10(step0)));
+  const step = [1, 2, 5, 10].map(s => s * mag).find(s => s >= step0);
+  const ticks = [];
+  for (let t = Math.ceil(lo / step) * step; t <= hi + 1e-9; t += step) ticks.push(+t.toFixed(10));
+  return ticks;
+}
+function scale(d0, d1, r0, r1) { return v => r0 + (v - d0) / ((d1 - d0) || 1) * (r1 - r0); }
+function finite(values) { return values.filter(v => v !== null && isFinite(v)); }
+
+function axes(svg, x0, x1, y0, y1, xType, yLabel) {
+  const sx = scale(x0, x1, M.l, W - M.r), sy = scale(y0, y1, H - M.b, M.t);
+  for (const t of niceTicks(y0, y1, 5)) {
+    svgEl('line', {x1: M.l, x2: W - M.r, y1: sy(t), y2: sy(t), stroke: '#eee'}, svg);
+    svgEl('text', {x: M.l - 6, y: sy(t) + 4, 'text-anchor': 'end'}, svg).textContent = fmt(t);
+  }
+  const xt = xType === 'date' ? dateTicks(x0, x1) : niceTicks(x0, x1, 6);
+  for (const t of xt) {
+    svgEl('text', {x: sx(t), y: H - M.b + 16, 'text-anchor': 'middle'}, svg).textContent =
+      xType === 'date' ? new Date(t).toISOString().slice(0, 7) : fmt(t);
+  }
+  svgEl('line', {x1: M.l, x2: W - M.r, y1: H - M.b, y2: H - M.b, stroke: '#999'}, svg);
+  if (yLabel) svgEl('text', {x: 12, y: H / 2, transform: `rotate(-90 12 ${H / 2})`, 'text-anchor': 'middle'}, svg).textContent = yLabel;
+  return {sx, sy};
+}
+function dateTicks(x0, x1) {
+  const ticks = [], d = new Date(x0), months = (x1 - x0) / 2.6e9;
+  const step = months > 48 ? 12 : months > 18 ? 6 : months > 6 ? 2 : 1;
+  d.setUTCDate(1); d.setUTCMonth(Math.ceil(d.getUTCMonth() / step) * step);
+  while (d.getTime() <= x1) { if (d.getTime() >= x0) ticks.push(d.getTime()); d.setUTCMonth(d.getUTCMonth() + step); }
+  return ticks;
+}
+function legend(card, items) {
+  const div = document.createElement('div');
+  div.className = 'legend';
+  for (const [name, color] of items) {
+    const s = document.createElement('span');
+    s.style.setProperty('--c', color); s.textContent = name; div.appendChild(s);
+  }
+  card.appendChild(div);
+}
+function pathD(xs, ys, sx, sy) {
+  let d = '', pen = false;
+  for (let i = 0; i < xs.length; i++) {
+    if (ys[i] === null) { pen = false; continue; }
+    d += (pen ? 'L' : 'M') + sx(xs[i]).toFixed(1) + ',' + sy(ys[i]).toFixed(1);
+    pen = true;
+  }
+  return d;
+}
+function nearest(xs, x) {
+  let lo = 0, hi = xs.length - 1;
+  while (hi - lo > 1) { const mid = (lo + hi) >> 1; if (xs[mid] < x) lo = mid; else hi = mid; }
+  return Math.abs(xs[lo] - x) <= Math.abs(xs[hi] - x) ? lo : hi;
+}
+
+function lineChart(card, chart) {
+  const svg = svgEl('svg', {viewBox: `0 0 ${W} ${H}`}, card);
+  const xs = chart.series.flatMap(s => s.x);
+  const ys = chart.series.flatMap(s => finite(s.y.concat(s.lower || [], s.upper || [])));
+  let y0 = Math.min(...ys), y1 = Math.max(...ys);
+  const pad = (y1 - y0) * 0.05 || 1; y0 = y0 >= 0 && y0 - pad < 0 ? 0 : y0 - pad; y1 += pad;
+  let x0 = Math.min(...xs), x1 = Math.max(...xs);
+  if (x0 === x1) { x0 -= 1; x1 += 1; }
+  const {sx, sy} = axes(svg, x0, x1, y0, y1, chart.x_type, chart.y_label);
+  for (const s of chart.shade) {
+    const a = Math.max(sx(s.from), M.l), b = Math.min(sx(s.to), W - M.r);
+    if (b > a) svgEl('rect', {x: a, y: M.t, width: b - a, height: H - M.t - M.b, fill: '#999', opacity: 0.12}, svg);
+  }
+  for (const s of chart.series) {
+    if (s.lower) {
+      const up = pathD(s.x, s.upper, sx, sy), down = pathD(s.x.slice().reverse(), s.lower.slice().reverse(), sx, sy);
+      svgEl('path', {d: up + 'L' + down.slice(1) + 'Z', fill: s.color, opacity: 0.18, stroke: 'none'}, svg);
+    }
+    if (s.x.length > 1) svgEl('path', {d: pathD(s.x, s.y, sx, sy), fill: 'none', stroke: s.color, 'stroke-width': 2,
+                                        'stroke-dasharray': s.dash ? '6 4' : 'none'}, svg);
+    if (s.markers || s.x.length === 1) s.x.forEach((x, i) => {
+      if (s.y[i] !== null) svgEl('circle', {cx: sx(x), cy: sy(s.y[i]), r: s.x.length === 1 ? 7 : 3.5, fill: s.color}, svg);
+    });
+  }
+  legend(card, chart.series.map(s => [s.name, s.color]));
+
+  const tip = document.createElement('div'); tip.className = 'tip'; card.appendChild(tip);
+  const guide = svgEl('line', {y1: M.t, y2: H - M.b, stroke: '#888', 'stroke-dasharray': '3 3', visibility: 'hidden'}, svg);
+  svg.addEventListener('mousemove', ev => {
+    const pt = new DOMPoint(ev.clientX, ev.clientY).matrixTransform(svg.getScreenCTM().inverse());
+    const x = x0 + (pt.x - M.l) / (W - M.l - M.r) * (x1 - x0);
+    const rows = [];
+    let gx = null;
+    for (const s of chart.series) {
+      const i = nearest(s.x, x);
+      if (Math.abs(sx(s.x[i]) - pt.x) > 40 && s.x.length > 1) continue;
+      if (gx === null) gx = s.x[i];
+      let row = `<b style="color:${s.color}">${s.name}</b>: ${fmt(s.y[i])}`;
+      if (s.lower) row += ` (${fmt(s.lower[i])} - ${fmt(s.upper[i])})`;
+      rows.push(row);
+    }
+    if (!rows.length) { tip.style.display = 'none'; guide.setAttribute('visibility', 'hidden'); return; }
+    guide.setAttribute('x1', sx(gx)); guide.setAttribute('x2', sx(gx)); guide.setAttribute('visibility', 'visible');
+    tip.innerHTML = fmtX(gx, chart.x_type) + '<br>' + rows.join('<br>');
+    tip.style.display = 'block';
+    const box = card.getBoundingClientRect();
+    tip.style.left = Math.min(ev.clientX - box.left + 12, box.width - tip.offsetWidth - 4) + 'px';
+    tip.style.top = (ev.clientY - box.top + 12) + 'px';
+  });
+  svg.addEventListener('mouseleave', () => { tip.style.display = 'none'; guide.setAttribute('visibility', 'hidden'); });
+}
+
+function barChart(card, chart) {
+  const svg = svgEl('svg', {viewBox: `0 0 ${W} ${H}`}, card);
+  const vals = chart.series.flatMap(s => finite(s.values));
+  let y0 = Math.min(0, ...vals), y1 = Math.max(0, ...vals);
+  const pad = (y1 - y0) * 0.08; y1 += y1 > 0 ? pad : 0; y0 -= y0 < 0 ? pad : 0;
+  const sy = scale(y0, y1, H - M.b, M.t);
+  for (const t of niceTicks(y0, y1, 5)) {
+    svgEl('line', {x1: M.l, x2: W - M.r, y1: sy(t), y2: sy(t), stroke: '#eee'}, svg);
+    svgEl('text', {x: M.l - 6, y: sy(t) + 4, 'text-anchor': 'end'}, svg).textContent = fmt(t);
+  }
+  if (chart.y_label) svgEl('text', {x: 12, y: H / 2, transform: `rotate(-90 12 ${H / 2})`, 'text-anchor': 'middle'}, svg).textContent = chart.y_label;
+  const n = chart.categories.length, k = chart.series.length, band = (W - M.l - M.r) / n, bw = band * 0.8 / k;
+  chart.categories.forEach((cat, i) => {
+    chart.series.forEach((s, j) => {
+      const v = s.values[i];
+      if (v === null) return;
+      const r = svgEl('rect', {x: M.l + i * band + band * 0.1 + j * bw, y: Math.min(sy(v), sy(0)), width: bw - 1,
+                               height: Math.abs(sy(v) - sy(0)), fill: s.color, opacity: 0.85}, svg);
+      svgEl('title', {}, r).textContent = `${cat} - ${s.name}: ${fmt(v)}`;
+    });
+    const label = svgEl('text', {x: M.l + (i + 0.5) * band, y: H - M.b + 14, 'text-anchor': 'middle'}, svg);
+    label.textContent = n > 12 && i % 2 ? '' : cat;
+    if (n > 8) label.setAttribute('font-size', '9');
+  });
+  svgEl('line', {x1: M.l, x2: W - M.r, y1: sy(0), y2: sy(0), stroke: '#666'}, svg);
+  if (k > 1) legend(card, chart.series.map(s => [s.name, s.color]));
+}
+
+function heatmapChart(card, chart) {
+  const n = chart.labels.length, size = 300, off = 120;
+  const svg = svgEl('svg', {viewBox: `0 0 ${off + size + 10} ${size + 10}`, style: 'max-width:520px'}, card);
+  const cell = size / n;
+  const color = v => {
+    const t = Math.max(-1, Math.min(1, v));
+    const c = t >= 0 ? [255, Math.round(255 - 150 * t), Math.round(255 - 180 * t)]
+                     : [Math.round(255 + 180 * t), Math.round(255 + 120 * t), 255];
+    return `rgb(${c.join(',')})`;
+  };
+  chart.values.forEach((row, i) => {
+    svgEl('text', {x: off - 6, y: i * cell + cell / 2 + 4, 'text-anchor': 'end'}, svg).textContent = chart.labels[i];
+    row.forEach((v, j) => {
+      const r = svgEl('rect', {x: off + j * cell, y: i * cell, width: cell - 1, height: cell - 1, fill: color(v)}, svg);
+      svgEl('title', {}, r).textContent = `${chart.labels[i]} / ${chart.labels[j]}: ${fmt(v)}`;
+      svgEl('text', {x: off + (j + 0.5) * cell, y: (i + 0.5) * cell + 4, 'text-anchor': 'middle'}, svg).textContent = v.toFixed(2);
+    });
+  });
+}
+
+const renderers = {line: lineChart, bar: barChart, heatmap: heatmapChart};
+const rendered = {};
+
+function show(id) {
+  document.querySelectorAll('nav button').forEach(b => b.classList.toggle('active', b.dataset.id === id));
+  const main = document.getElementById('view');
+  if (!rendered[id]) {
+    const view = DATA.views.find(v => v.id === id), grid = document.createElement('div');
+    grid.className = 'grid';
+    for (const chart of view.charts) {
+      const card = document.createElement('div');
+      card.className = 'card';
+      card.innerHTML = `<h2>${chart.title}</h2>`;
+      grid.appendChild(card);
+      main.appendChild(grid);
+      renderers[chart.type](card, chart);
+    }
+    rendered[id] = grid;
+  }
+  for (const child of main.children) child.style.display = child === rendered[id] ? '' : 'none';
+  history.replaceState(null, '', '#' + id);
+}
+
+for (const view of DATA.views) {
+  const b = document.createElement('button');
+  b.dataset.id = view.id; b.textContent = `${view.id} ${view.title}`;
+  b.onclick = () => show(view.id);
+  document.getElementById('tabs').appendChild(b);
+}
+show(DATA.views.some(v => '#' + v.id === location.hash) ? location.hash.slice(1) : DATA.views[0].id);
+</script>
+</body>
+</html>
+"""
+
+
+if __name__ == '__main__':
+    print("="*70)
+    print("DASHBOARD EXPORT")
+    print("="*70)
+
+    # LTTB on a long noisy series: exact size, both ends kept, indices in order, extremes kept
+    rng = np.random.default_rng(config['random_seed'])
+    x = np.arange(100_000)
+    y = np.sin(x / 500) + rng.normal(0, 0.1, len(x))
+    y[[12_345, 67_890]] = [10, -10]
+    kept = lttb_indices(x, y, dashboard_max_points)
+    problems = [message for message, failed in [
+        (f"{len(kept)} points kept, expected {dashboard_max_points}", len(kept) != dashboard_max_points),
+        ("first or last point dropped", kept[0] != 0 or kept[-1] != len(x) - 1),
+        ("indices not strictly increasing", np.any(np.diff(kept) <= 0)),
+        ("spikes dropped", not {12_345, 67_890} <= set(kept.tolist()))] if failed]
+    if problems:
+        raise RuntimeError(f"LTTB check failed: {'; '.join(problems)}")
+    print(f"\n✓ LTTB keeps {len(kept):,} of {len(x):,} points, both ends and both spikes")
+
+    df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
+    forecast_file = 'demand_forecast_2024.csv'
+    forecast_df = pd.read_csv(forecast_file, parse_dates=['Date'])
+
+    # Daily requests per park over many simulated seasons, reduced to daily quantiles
+    n_seasons = 500
+    dates, mu, capacity = daily_segment_demand(base_year_demand(forecast_file))
+    requests = np.random.default_rng(config['random_seed']).poisson(mu.sum(axis=-1), size=(n_seasons,) + mu.shape[:-1])
+    print(f"✓ {requests.size:,} simulated park-days aggregated to {len(dates)} days x {len(capacity)} parks")
+
+    views = build_views(df, forecast_df, daily=(dates, requests, capacity))
+    embedded = sum(len(s['x']) for v in views for c in v['charts'] if c['type'] == 'line' for s in c['series'])
+    underlying = sum(s['points'] for v in views for c in v['charts'] if c['type'] == 'line' for s in c['series'])
+    size = write_dashboard(views)
+    print(f"✓ {len(views)} views, {sum(len(v['charts']) for v in views)} charts, "
+          f"{embedded:,} of {underlying:,} line points embedded")
+    print(f"✓ Saved: dashboard.html ({size / 1024:.0f} KB)")
+
+    print("\n" + "="*70)
+    print("DASHBOARD EXPORT COMPLETE")
+    print("="*70)
@@ -7,7 +7,10 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from statsmodels.tsa.seasonal import seasonal_decompose
+from batch_decomposition import stl_decompose, mask_periods
+from scheduler import Stage, run_stages
+from report_builder import Report, render_text
+from config import load_config
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import warnings
@@ -16,187 +19,223 @@ warnings.filterwarnings('ignore')
 plt.style.use('seaborn-v0_8-whitegrid')
 sns.set_palette("Set2")
 
-print("="*70)
-print("EXPLORATORY DATA ANALYSIS & MODELING")
-print("="*70)
-
-# Load processed data
-df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
-print(f"\n✓ Loaded {len(df)} months of data")
-print(f"  Period: {df.index[0]} to {df.index[-1]}")
-
-# ============================================================================
-# PART 1: EXPLORATORY DATA ANALYSIS
-# ============================================================================
-print("\n" + "="*70)
-print("PART 1: EXPLORATORY DATA ANALYSIS")
-print("="*70)
-
-# 1.1 Summary Statistics
-print("\n[1.1] SUMMARY STATISTICS")
-print("-" * 70)
-print("\nMonthly Permit Sales by Segment:")
-segments = ['Foreign_NonResident', 'Foreign_Resident', 'Rest_of_Africa', 'East_African']
-summary_stats = df[segments].describe()
-print(summary_stats.round(0))
-
-print("\n\nAnnual Totals:")
-df['Year_Only'] = df['Year']
-annual = df.groupby('Year_Only')[segments + ['Total_Permits']].sum()
-print(annual)
+config = load_config()
+segments = config['segments']
+peak_months = config['peak_months']  # Jun-Sep, Dec-Feb by default
+covid_period = [('2020-03-01', '2021-12-31')]
+
 
 # 1.2 Time Series Visualization
-print("\n[1.2] CREATING TIME SERIES VISUALIZATIONS...")
-fig, axes = plt.subplots(3, 1, figsize=(14, 10))
-
-# Overall trend
-axes[0].plot(df.index, df['Total_Permits'], linewidth=2, color='#2E86AB')
-axes[0].fill_between(df.index, df['Total_Permits'], alpha=0.3, color='#2E86AB')
-axes[0].set_title('Total Gorilla Permit Sales (2019-2023)', fontsize=14, fontweight='bold')
-axes[0].set_ylabel('Monthly Permits')
-axes[0].grid(True, alpha=0.3)
-axes[0].axvline(pd.Timestamp('2020-03-01'), color='red', linestyle='--', alpha=0.5, label='COVID-19')
-axes[0].legend()
-
-# By segment
-for segment in segments:
-    axes[1].plot(df.index, df[segment], label=segment.replace('_', ' '), linewidth=1.5)
-axes[1].set_title('Permit Sales by Visitor Category', fontsize=14, fontweight='bold')
-axes[1].set_ylabel('Monthly Permits')
-axes[1].legend(loc='upper left')
-axes[1].grid(True, alpha=0.3)
-
-# Seasonality (exclude COVID period)
-df_no_covid = df[(df.index < '2020-03-01') | (df.index >= '2022-01-01')].copy()
-monthly_avg = df_no_covid.groupby('Month')['Total_Permits'].mean()
-months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-axes[2].bar(range(1, 13), monthly_avg.values, color='#A23B72', alpha=0.7)
-axes[2].set_title('Average Monthly Demand Pattern (Seasonality)', fontsize=14, fontweight='bold')
-axes[2].set_xlabel('Month')
-axes[2].set_ylabel('Average Permits')
-axes[2].set_xticks(range(1, 13))
-axes[2].set_xticklabels(months)
-axes[2].grid(True, alpha=0.3, axis='y')
-
-plt.tight_layout()
-plt.savefig('01_time_series_analysis.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: 01_time_series_analysis.png")
-plt.close()
+def time_series_analysis(df):
+    print("\n[1.2] CREATING TIME SERIES VISUALIZATIONS...")
+    fig, axes = plt.subplots(3, 1, figsize=(14, 10))
+
+    # Overall trend
+    axes[0].plot(df.index, df['Total_Permits'], linewidth=2, color='#2E86AB')
+    axes[0].fill_between(df.index, df['Total_Permits'], alpha=0.3, color='#2E86AB')
+    axes[0].set_title('Total Gorilla Permit Sales (2019-2023)', fontsize=14, fontweight='bold')
+    axes[0].set_ylabel('Monthly Permits')
+    axes[0].grid(True, alpha=0.3)
+    axes[0].axvline(pd.Timestamp('2020-03-01'), color='red', linestyle='--', alpha=0.5, label='COVID-19')
+    axes[0].legend()
+
+    # By segment
+    for segment in segments:
+        axes[1].plot(df.index, df[segment], label=segment.replace('_', ' '), linewidth=1.5)
+    axes[1].set_title('Permit Sales by Visitor Category', fontsize=14, fontweight='bold')
+    axes[1].set_ylabel('Monthly Permits')
+    axes[1].legend(loc='upper left')
+    axes[1].grid(True, alpha=0.3)
+
+    # Seasonality (exclude COVID period)
+    df_no_covid = df[(df.index < '2020-03-01') | (df.index >= '2022-01-01')].copy()
+    monthly_avg = df_no_covid.groupby('Month')['Total_Permits'].mean()
+    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    axes[2].bar(range(1, 13), monthly_avg.values, color='#A23B72', alpha=0.7)
+    axes[2].set_title('Average Monthly Demand Pattern (Seasonality)', fontsize=14, fontweight='bold')
+    axes[2].set_xlabel('Month')
+    axes[2].set_ylabel('Average Permits')
+    axes[2].set_xticks(range(1, 13))
+    axes[2].set_xticklabels(months)
+    axes[2].grid(True, alpha=0.3, axis='y')
+
+    plt.tight_layout()
+    plt.savefig('01_time_series_analysis.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved: 01_time_series_analysis.png")
+    plt.close()
+
 
 # 1.3 Seasonal Decomposition
-print("\n[1.3] SEASONAL DECOMPOSITION...")
-# Use pre-COVID + recovery data for better decomposition
-decomposition = seasonal_decompose(df_no_covid['Total_Permits'], model='additive', period=12)
+def seasonal_decomposition(df):
+    print("\n[1.3] SEASONAL DECOMPOSITION...")
+    # Decompose on the full calendar with the COVID months masked as gaps rather
+    # than concatenating 2019 onto 2022. STL's smoothers shrink at the gap edges,
+    # so it keeps a trend where the classical 2 x 12 average would need a full year
+    decomposition = stl_decompose(mask_periods(df[['Total_Permits']], covid_period), period=12)
+
+    fig, axes = plt.subplots(4, 1, figsize=(14, 10))
+    axes[0].plot(df.index, decomposition['observed'][0], color='#2E86AB')
+    axes[0].set_ylabel('Observed')
+    axes[0].set_title('Time Series Decomposition of Gorilla Permit Demand', fontsize=14, fontweight='bold')
 
-fig, axes = plt.subplots(4, 1, figsize=(14, 10))
-decomposition.observed.plot(ax=axes[0], color='#2E86AB')
-axes[0].set_ylabel('Observed')
-axes[0].set_title('Time Series Decomposition of Gorilla Permit Demand', fontsize=14, fontweight='bold')
+    axes[1].plot(df.index, decomposition['trend'][0], color='#F18F01')
+    axes[1].set_ylabel('Trend')
 
-decomposition.trend.plot(ax=axes[1], color='#F18F01')
-axes[1].set_ylabel('Trend')
+    axes[2].plot(df.index, decomposition['seasonal'][0], color='#C73E1D')
+    axes[2].set_ylabel('Seasonal')
 
-decomposition.seasonal.plot(ax=axes[2], color='#C73E1D')
-axes[2].set_ylabel('Seasonal')
+    axes[3].plot(df.index, decomposition['resid'][0], color='#6A994E')
+    axes[3].set_ylabel('Residual')
 
-decomposition.resid.plot(ax=axes[3], color='#6A994E')
-axes[3].set_ylabel('Residual')
+    for ax in axes:
+        ax.axvspan(pd.Timestamp(covid_period[0][0]), pd.Timestamp(covid_period[0][1]), color='grey', alpha=0.15)
+
+    plt.tight_layout()
+    plt.savefig('02_seasonal_decomposition.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved: 02_seasonal_decomposition.png")
+    plt.close()
 
-plt.tight_layout()
-plt.savefig('02_seasonal_decomposition.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: 02_seasonal_decomposition.png")
-plt.close()
 
 # 1.4 Correlation Analysis
-print("\n[1.4] CORRELATION ANALYSIS...")
-corr_data = df[segments].corr()
-plt.figure(figsize=(8, 6))
-sns.heatmap(corr_data, annot=True, fmt='.2f', cmap='coolwarm', center=0, 
-            square=True, linewidths=1, cbar_kws={"shrink": 0.8})
-plt.title('Correlation Between Visitor Segments', fontsize=14, fontweight='bold', pad=20)
-plt.tight_layout()
-plt.savefig('03_correlation_matrix.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: 03_correlation_matrix.png")
-plt.close()
+def correlation_analysis(df):
+    print("\n[1.4] CORRELATION ANALYSIS...")
+    corr_data = df[segments].corr()
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(corr_data, annot=True, fmt='.2f', cmap='coolwarm', center=0, 
+                square=True, linewidths=1, cbar_kws={"shrink": 0.8})
+    plt.title('Correlation Between Visitor Segments', fontsize=14, fontweight='bold', pad=20)
+    plt.tight_layout()
+    plt.savefig('03_correlation_matrix.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved: 03_correlation_matrix.png")
+    plt.close()
+
 
 # 1.5 Distribution Analysis
-print("\n[1.5] DISTRIBUTION ANALYSIS...")
-fig, axes = plt.subplots(2, 2, figsize=(12, 8))
-axes = axes.flatten()
-
-for idx, segment in enumerate(segments):
-    axes[idx].hist(df[segment], bins=20, color=sns.color_palette("Set2")[idx], alpha=0.7, edgecolor='black')
-    axes[idx].axvline(df[segment].mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: {df[segment].mean():.0f}')
-    axes[idx].set_title(segment.replace('_', ' '), fontsize=12, fontweight='bold')
-    axes[idx].set_xlabel('Monthly Permits')
-    axes[idx].set_ylabel('Frequency')
-    axes[idx].legend()
-    axes[idx].grid(True, alpha=0.3)
-
-plt.suptitle('Distribution of Monthly Permits by Segment', fontsize=14, fontweight='bold', y=1.00)
-plt.tight_layout()
-plt.savefig('04_distribution_analysis.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: 04_distribution_analysis.png")
-plt.close()
+def distribution_analysis(df):
+    print("\n[1.5] DISTRIBUTION ANALYSIS...")
+    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+    axes = axes.flatten()
+
+    for idx, segment in enumerate(segments):
+        axes[idx].hist(df[segment], bins=20, color=sns.color_palette("Set2")[idx], alpha=0.7, edgecolor='black')
+        axes[idx].axvline(df[segment].mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: {df[segment].mean():.0f}')
+        axes[idx].set_title(segment.replace('_', ' '), fontsize=12, fontweight='bold')
+        axes[idx].set_xlabel('Monthly Permits')
+        axes[idx].set_ylabel('Frequency')
+        axes[idx].legend()
+        axes[idx].grid(True, alpha=0.3)
+
+    plt.suptitle('Distribution of Monthly Permits by Segment', fontsize=14, fontweight='bold', y=1.00)
+    plt.tight_layout()
+    plt.savefig('04_distribution_analysis.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved: 04_distribution_analysis.png")
+    plt.close()
+
 
 # 1.6 Peak vs Off-Peak Analysis
-print("\n[1.6] PEAK VS OFF-PEAK ANALYSIS...")
-# Define seasons
-peak_months = [6, 7, 8, 9, 12, 1, 2]  # Jun-Sep, Dec-Feb
-df['Season'] = df['Month'].apply(lambda x: 'Peak' if x in peak_months else 'Off-Peak')
-
-season_summary = df.groupby('Season')[['Total_Permits'] + segments].mean()
-print("\nAverage Monthly Permits by Season:")
-print(season_summary.round(0))
-
-# Visualization
-fig, ax = plt.subplots(1, 1, figsize=(10, 6))
-season_summary.T.plot(kind='bar', ax=ax, color=['#E63946', '#457B9D'], alpha=0.8)
-ax.set_title('Peak vs Off-Peak Season Demand', fontsize=14, fontweight='bold')
-ax.set_ylabel('Average Monthly Permits')
-ax.set_xlabel('Visitor Category')
-ax.legend(title='Season')
-ax.grid(True, alpha=0.3, axis='y')
-plt.xticks(rotation=45, ha='right')
-plt.tight_layout()
-plt.savefig('05_peak_offpeak_comparison.png', dpi=300, bbox_inches='tight')
-print("✓ Saved: 05_peak_offpeak_comparison.png")
-plt.close()
-
-print("\n" + "="*70)
-print("EXPLORATORY DATA ANALYSIS COMPLETE")
-print("="*70)
-
-# Save EDA summary
-with open('eda_summary.txt', 'w') as f:
-    f.write("="*70 + "\n")
-    f.write("EXPLORATORY DATA ANALYSIS SUMMARY\n")
-    f.write("="*70 + "\n\n")
-    
-    f.write("1. SUMMARY STATISTICS\n")
-    f.write("-"*70 + "\n")
-    f.write(summary_stats.to_string())
-    f.write("\n\n")
-    
-    f.write("2. ANNUAL TOTALS\n")
-    f.write("-"*70 + "\n")
-    f.write(annual.to_string())
-    f.write("\n\n")
-    
-    f.write("3. SEASONALITY INSIGHTS\n")
-    f.write("-"*70 + "\n")
-    f.write(f"Peak Months: June-September, December-February\n")
-    f.write(f"Average Peak Season Demand: {season_summary.loc['Peak', 'Total_Permits']:.0f} permits/month\n")
-    f.write(f"Average Off-Peak Demand: {season_summary.loc['Off-Peak', 'Total_Permits']:.0f} permits/month\n")
-    f.write(f"Peak/Off-Peak Ratio: {season_summary.loc['Peak', 'Total_Permits'] / season_summary.loc['Off-Peak', 'Total_Permits']:.2f}x\n")
-    f.write("\n\n")
-    
-    f.write("4. KEY FINDINGS\n")
-    f.write("-"*70 + "\n")
-    f.write("• Strong seasonality with 40-50% higher demand in peak months\n")
-    f.write("• COVID-19 caused 90% reduction in 2020, gradual recovery 2021-2023\n")
-    f.write("• Foreign non-residents dominate (65% of permits)\n")
-    f.write("• High correlation between all segments (visitors move together)\n")
-    f.write("• Significant untapped revenue potential in peak seasons\n")
-
-print("✓ Saved: eda_summary.txt")
+def peak_offpeak_analysis(df):
+    print("\n[1.6] PEAK VS OFF-PEAK ANALYSIS...")
+    df['Season'] = df['Month'].apply(lambda x: 'Peak' if x in peak_months else 'Off-Peak')
+
+    season_summary = df.groupby('Season')[['Total_Permits'] + segments].mean()
+    print("\nAverage Monthly Permits by Season:")
+    print(season_summary.round(0))
+
+    # Visualization
+    fig, ax = plt.subplots(1, 1, figsize=(10, 6))
+    season_summary.T.plot(kind='bar', ax=ax, color=['#E63946', '#457B9D'], alpha=0.8)
+    ax.set_title('Peak vs Off-Peak Season Demand', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Average Monthly Permits')
+    ax.set_xlabel('Visitor Category')
+    ax.legend(title='Season')
+    ax.grid(True, alpha=0.3, axis='y')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig('05_peak_offpeak_comparison.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved: 05_peak_offpeak_comparison.png")
+    plt.close()
+
+    return season_summary
+
+
+if __name__ == '__main__':
+    print("="*70)
+    print("EXPLORATORY DATA ANALYSIS & MODELING")
+    print("="*70)
+
+    # Load processed data
+    df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
+    print(f"\n✓ Loaded {len(df)} months of data")
+    print(f"  Period: {df.index[0]} to {df.index[-1]}")
+
+    # ============================================================================
+    # PART 1: EXPLORATORY DATA ANALYSIS
+    # ============================================================================
+    print("\n" + "="*70)
+    print("PART 1: EXPLORATORY DATA ANALYSIS")
+    print("="*70)
+
+    # 1.1 Summary Statistics
+    print("\n[1.1] SUMMARY STATISTICS")
+    print("-" * 70)
+    print("\nMonthly Permit Sales by Segment:")
+    summary_stats = df[segments].describe()
+    print(summary_stats.round(0))
+
+    print("\n\nAnnual Totals:")
+    df['Year_Only'] = df['Year']
+    annual = df.groupby('Year_Only')[segments + ['Total_Permits']].sum()
+    print(annual)
+
+    # 1.2-1.6 are independent of each other; run them concurrently and
+    # replay their output in section order
+    stages = [
+        Stage('1.2', time_series_analysis, args=(df,)),
+        Stage('1.3', seasonal_decomposition, args=(df,)),
+        Stage('1.4', correlation_analysis, args=(df,)),
+        Stage('1.5', distribution_analysis, args=(df,)),
+        Stage('1.6', peak_offpeak_analysis, args=(df,))
+    ]
+    outcomes = run_stages(stages)
+    failed = [name for name, outcome in outcomes.items() if outcome['error']]
+    if failed:
+        raise RuntimeError(f"EDA sections failed: {', '.join(failed)}")
+    season_summary = outcomes['1.6']['result']
+
+    print("\n" + "="*70)
+    print("EXPLORATORY DATA ANALYSIS COMPLETE")
+    print("="*70)
+
+    # Save EDA summary (structured results for report_builder.py, plus the text report)
+    peak_mean = season_summary.loc['Peak', 'Total_Permits']
+    offpeak_mean = season_summary.loc['Off-Peak', 'Total_Permits']
+    report = Report('Exploratory Data Analysis Summary', facts={
+        'months': len(df), 'start': df.index[0], 'end': df.index[-1],
+        'total_permits': int(df['Total_Permits'].sum()),
+        'annual_permits': annual['Total_Permits'].to_dict(),
+        'peak_mean': peak_mean, 'offpeak_mean': offpeak_mean, 'peak_offpeak_ratio': peak_mean / offpeak_mean
+    })
+    report.section('1. Summary Statistics')
+    report.table(summary_stats.rename_axis('Statistic'), formats={s: '{:,.0f}' for s in segments}, index=True)
+    report.section('2. Annual Totals')
+    report.table(annual.rename_axis('Year'), index=True)
+    report.section('3. Seasonality Insights')
+    report.metrics({
+        'Peak Months': 'June-September, December-February',
+        'Average Peak Season Demand': f"{peak_mean:.0f} permits/month",
+        'Average Off-Peak Demand': f"{offpeak_mean:.0f} permits/month",
+        'Peak/Off-Peak Ratio': f"{peak_mean / offpeak_mean:.2f}x"
+    })
+    report.section('4. Key Findings')
+    report.bullets([
+        "Strong seasonality with 40-50% higher demand in peak months",
+        "COVID-19 caused 90% reduction in 2020, gradual recovery 2021-2023",
+        "Foreign non-residents dominate (65% of permits)",
+        "High correlation between all segments (visitors move together)",
+        "Significant untapped revenue potential in peak seasons"
+    ])
+    report.save('eda_summary.json')
+    with open('eda_summary.txt', 'w') as f:
+        f.write(render_text(report))
+
+    print("✓ Saved: eda_summary.txt, eda_summary.json")
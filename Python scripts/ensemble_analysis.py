@@ -0,0 +1,124 @@
+"""
+Seeded Ensemble Analysis
+Propagates K synthetic permit histories through EDA, forecasting and revenue in batch
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from pricing_model import (config, current_prices, peak_months, load_raw_inputs,
+                           monthly_permit_series, split_segments, demand_response)
+from price_schedule import scenario_schedule
+
+# Same seed as gorilla_pricing_analysis.py, so realization 0 is processed_permit_data.csv
+random_seed = config['random_seed']
+
+
+def generate_ensemble(inputs, n_members, seed=random_seed):
+    """K x months total permits and K x months x segments permits from one noise draw."""
+    bwindi_visitors, seasonality = inputs
+    n_months = 12 * len(bwindi_visitors)
+    noise = np.random.default_rng(seed).uniform(0.95, 1.05, size=(n_members, n_months))
+    totals = monthly_permit_series(bwindi_visitors, seasonality, noise=noise)
+    return totals, split_segments(totals)
+
+
+def ensemble_eda(totals, dates):
+    """Annual totals and seasonal means for every realization."""
+    years = dates.year.to_numpy()
+    months = dates.month.to_numpy()
+    annual = np.stack([totals[:, years == year].sum(axis=1) for year in np.unique(years)], axis=1)
+
+    is_peak = np.isin(months, peak_months)
+    peak_mean = totals[:, is_peak].mean(axis=1)
+    offpeak_mean = totals[:, ~is_peak].mean(axis=1)
+    return {
+        'annual': pd.DataFrame(annual, columns=np.unique(years)),
+        'peak_mean': peak_mean,
+        'offpeak_mean': offpeak_mean,
+        'peak_ratio': peak_mean / offpeak_mean
+    }
+
+
+def ensemble_forecast(totals, dates, horizon=12):
+    """
+    Trend + month-of-year regression fitted to every realization in one lstsq call.
+
+    Uses the same training window as forecasting_elasticity.py (COVID months
+    excluded); the design matrix is shared so all K members solve together.
+    """
+    train = np.asarray((dates < '2020-03-01') | (dates >= '2021-07-01'))
+    t = np.arange(len(dates) + horizon)
+    month = np.concatenate([dates.month.to_numpy(), (np.arange(horizon) + dates[-1].month) % 12 + 1])
+    X = np.column_stack([t, np.eye(12)[month - 1]])
+
+    coef, *_ = np.linalg.lstsq(X[:len(dates)][train], totals[:, train].T.astype(float), rcond=None)
+    return (X[len(dates):] @ coef).T
+
+
+def ensemble_revenue(segment_permits, dates):
+    """Average annual revenue per realization for each scenario."""
+    n_years = len(np.unique(dates.year))
+    months = dates.month.to_numpy()
+    revenue = {}
+    for scenario in config['scenarios']:
+        prices = scenario_schedule(scenario, peak_months, current_prices)[months - 1]
+        demand = demand_response(segment_permits, prices)
+        revenue[scenario['name']] = (demand * prices).sum(axis=(1, 2)) / n_years
+    return revenue
+
+
+def spread(values):
+    """Summary of a metric across ensemble members."""
+    return {
+        'Mean': np.mean(values),
+        'Std': np.std(values, ddof=1),
+        'P05': np.percentile(values, 5),
+        'P50': np.percentile(values, 50),
+        'P95': np.percentile(values, 95)
+    }
+
+
+if __name__ == '__main__':
+    print("="*70)
+    print("SEEDED ENSEMBLE ANALYSIS")
+    print("="*70)
+
+    n_members = 1000
+    inputs = load_raw_inputs()
+    dates = pd.date_range(start=f'{min(inputs[0])}-01-01', periods=12 * len(inputs[0]), freq='MS')
+
+    start = time.perf_counter()
+    totals, segment_permits = generate_ensemble(inputs, n_members)
+    eda = ensemble_eda(totals, dates)
+    forecast = ensemble_forecast(totals, dates)
+    revenue = ensemble_revenue(segment_permits, dates)
+    elapsed = time.perf_counter() - start
+    print(f"\n✓ {n_members} realizations (seed {random_seed}) propagated in {elapsed:.2f}s")
+
+    summary = {}
+    for year in eda['annual'].columns:
+        summary[f'Annual_Permits_{year}'] = spread(eda['annual'][year])
+    summary['Peak_Monthly_Mean'] = spread(eda['peak_mean'])
+    summary['OffPeak_Monthly_Mean'] = spread(eda['offpeak_mean'])
+    summary['Peak_OffPeak_Ratio'] = spread(eda['peak_ratio'])
+    summary['Forecast_Next_12m'] = spread(forecast.sum(axis=1))
+    baseline_name = config['scenarios'][0]['name']
+    baseline = revenue[baseline_name]
+    for name, values in revenue.items():
+        summary[f'Annual_Revenue: {name}'] = spread(values)
+        if name != baseline_name:
+            summary[f'Revenue_vs_Baseline_%: {name}'] = spread((values / baseline - 1) * 100)
+
+    summary_df = pd.DataFrame(summary).T
+    print("\nSpread across realizations:")
+    print(summary_df.round(2).to_string())
+
+    summary_df.to_csv('ensemble_summary.csv', index_label='Metric')
+    print("\n✓ Saved: ensemble_summary.csv")
+
+    print("\n" + "="*70)
+    print("ENSEMBLE ANALYSIS COMPLETE")
+    print("="*70)
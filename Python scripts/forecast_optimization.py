@@ -0,0 +1,270 @@
+"""
+Forward-Looking Revenue Optimization
+Prices the coming season against the demand forecast's predictive distribution
+
+Usage: python forecast_optimization.py [paths|quantiles]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from pricing_model import (config, segments, current_prices, elasticities, segment_shares, peak_months,
+                           segment_vector, season_price_matrix)
+from capacity_allocation import monthly_capacity
+from forecast_registry import ForecastRegistry, sarima_spec
+
+forecast_start = pd.Timestamp('2024-01-01')
+forecast_horizon = 12
+
+# Candidate multipliers: (segments moved together, peak values, off-peak values)
+candidate_grid = [
+    (['Foreign_NonResident'], np.round(np.arange(1.00, 1.601, 0.05), 2), np.round(np.arange(0.75, 1.251, 0.05), 2)),
+    (['Foreign_Resident', 'Rest_of_Africa'], np.round(np.arange(0.90, 1.301, 0.05), 2), np.round(np.arange(0.80, 1.001, 0.05), 2)),
+    (['East_African'], np.array([1.0]), np.array([1.0]))
+]
+
+# An axis whose best value sits on its edge is slid outward, within these bounds
+multiplier_bounds = (0.5, 3.0)
+max_shifts = 10
+
+
+def training_series(df):
+    """Total permits with the COVID collapse removed, as in forecasting_elasticity.py."""
+    return df[(df.index < '2020-03-01') | (df.index >= '2021-07-01')]['Total_Permits']
+
+
+def simulated_paths(series, n_paths=2000, seed=42, registry=None):
+    """n_paths x horizon demand paths simulated from the cached SARIMA model."""
+    registry = registry or ForecastRegistry()
+    paths = registry.simulate(series, sarima_spec, start=forecast_start, horizon=forecast_horizon,
+                              n_paths=n_paths, seed=seed)
+    return np.clip(paths, 0, None), np.full(n_paths, 1 / n_paths)
+
+
+def quantile_paths(forecast_df, n_levels=99, level=95):
+    """
+    Demand paths at evenly spaced quantiles of a saved forecast's intervals.
+
+    Assumes Gaussian monthly errors with the width of the saved interval and
+    moves every month to the same quantile, so annual downside is not
+    diversified away. Returns paths and equal weights.
+    """
+    missing = [c for c in (f'Lower_{level}', f'Upper_{level}') if c not in forecast_df.columns]
+    if missing:
+        raise ValueError(f"Forecast has no {level}% prediction interval (missing {', '.join(missing)})")
+    z = norm.ppf(0.5 + level / 200)
+    sd = (forecast_df[f'Upper_{level}'] - forecast_df[f'Lower_{level}']).to_numpy() / (2 * z)
+    levels = (np.arange(n_levels) + 0.5) / n_levels
+    paths = forecast_df['Forecasted_Permits'].to_numpy() + norm.ppf(levels)[:, None] * sd
+    return np.clip(paths, 0, None), np.full(n_levels, 1 / n_levels)
+
+
+def candidate_multipliers(grid=None):
+    """C x segment peak and off-peak multipliers for every combination in the grid."""
+    grid = grid or candidate_grid
+    axes = [values for _, peak, offpeak in grid for values in (peak, offpeak)]
+    mesh = [m.ravel() for m in np.meshgrid(*axes, indexing='ij')]
+    peak = np.ones((len(mesh[0]), len(segments)))
+    offpeak = np.ones_like(peak)
+    for k, (group, _, _) in enumerate(grid):
+        for segment in group:
+            peak[:, segments.index(segment)] = mesh[2 * k]
+            offpeak[:, segments.index(segment)] = mesh[2 * k + 1]
+    return peak, offpeak
+
+
+def edge_axes(grid, peak, offpeak):
+    """
+    (group, season, direction) for every grid axis on which any of the given
+    candidate rows sits at the first or last value. Single-value axes are
+    fixed by design and never reported.
+    """
+    edges = set()
+    for k, (group, peak_values, offpeak_values) in enumerate(grid):
+        column = segments.index(group[0])
+        for season, values, chosen in (('peak', peak_values, peak), ('offpeak', offpeak_values, offpeak)):
+            if len(values) < 2:
+                continue
+            if np.any(np.isclose(chosen[:, column], values[-1])):
+                edges.add((k, season, 'up'))
+            if np.any(np.isclose(chosen[:, column], values[0])):
+                edges.add((k, season, 'down'))
+    return edges
+
+
+def shift_grid(grid, edges):
+    """
+    Grid with each edge axis slid outward by half its length, keeping its
+    spacing and size, within multiplier_bounds. The previous best value
+    stays inside the window.
+    """
+    grid = [(group, peak.copy(), offpeak.copy()) for group, peak, offpeak in grid]
+    for k, season, direction in edges:
+        group, peak, offpeak = grid[k]
+        values = peak if season == 'peak' else offpeak
+        step = values[1] - values[0]
+        room = multiplier_bounds[1] - values[-1] if direction == 'up' else values[0] - multiplier_bounds[0]
+        n_steps = min(len(values) // 2, int(np.floor(room / step + 1e-9)))
+        values = np.round(values + (n_steps if direction == 'up' else -n_steps) * step, 2)
+        grid[k] = (group, values, offpeak) if season == 'peak' else (group, peak, values)
+    return grid
+
+
+def revenue_matrix(paths, peak, offpeak, months, capacity=None, chunk_size=256):
+    """
+    Season revenue for every candidate on every demand path (C x P).
+
+    paths are P x n total permits for calendar months `months`; each path is
+    split by the configured segment shares and priced with the linear
+    elasticity model. Because the response factor depends only on the
+    candidate, demand and revenue per permit collapse to C x n matrices and
+    the uncapacitated case is a single matrix product. With a monthly
+    capacity, excess demand is turned away proportionally across segments.
+    """
+    shares = segment_vector(segment_shares)
+    ref = segment_vector(current_prices)
+    elast = segment_vector(elasticities)
+
+    prices = season_price_matrix(peak[:, None, :], offpeak[:, None, :], current_prices,
+                                 peak_months)[:, np.asarray(months) - 1]
+    factor = np.clip(1 + elast * (prices / ref - 1), 0, None)
+    permits = (factor * shares).sum(axis=-1)            # C x n permits per unit of demand
+    revenue = (factor * shares * prices).sum(axis=-1)   # C x n revenue per unit of demand
+
+    if capacity is None:
+        return revenue @ paths.T
+
+    price_per_permit = np.divide(revenue, permits, out=np.zeros_like(revenue), where=permits > 0)
+    out = np.empty((len(peak), len(paths)))
+    for i in range(0, len(peak), chunk_size):
+        sold = np.minimum(paths[None, :, :] * permits[i:i + chunk_size, None, :], capacity)
+        out[i:i + chunk_size] = (sold * price_per_permit[i:i + chunk_size, None, :]).sum(axis=-1)
+    return out
+
+
+def risk_summary(revenue, weights, baseline, alpha=0.05):
+    """Expected revenue and downside risk per candidate from a C x P revenue matrix."""
+    weights = np.asarray(weights, dtype=float) / np.sum(weights)
+    expected = revenue @ weights
+    std = np.sqrt(((revenue - expected[:, None]) ** 2) @ weights)
+
+    # Weighted lower-tail quantile (VaR) and the mean below it (CVaR)
+    order = np.argsort(revenue, axis=1)
+    sorted_revenue = np.take_along_axis(revenue, order, axis=1)
+    cum_weight = np.cumsum(weights[order], axis=1)
+    tail = cum_weight <= alpha + 1e-12
+    tail[:, 0] = True
+    var = sorted_revenue[np.arange(len(revenue)), tail.sum(axis=1) - 1]
+    tail_weight = np.where(tail, weights[order], 0)
+    cvar = (sorted_revenue * tail_weight).sum(axis=1) / tail_weight.sum(axis=1)
+
+    level = round(alpha * 100)
+    return pd.DataFrame({
+        'Expected_Revenue': expected,
+        'Revenue_Std': std,
+        f'VaR_{level:02d}': var,
+        f'CVaR_{level:02d}': cvar,
+        'Prob_Beats_Current': np.clip((revenue > baseline) @ weights, 0, 1)
+    })
+
+
+if __name__ == '__main__':
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'paths'
+
+    print("="*70)
+    print("FORWARD-LOOKING REVENUE OPTIMIZATION")
+    print("="*70)
+
+    df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
+    series = training_series(df)
+    forecast_file = f'demand_forecast_{forecast_start.year}.csv'
+
+    if mode == 'quantiles':
+        forecast_df = pd.read_csv(forecast_file, parse_dates=['Date']) if os.path.exists(forecast_file) else None
+        if forecast_df is not None and not {'Lower_95', 'Upper_95'} <= set(forecast_df.columns):
+            # Forecasts saved before intervals were added carry the point forecast only
+            print(f"  {forecast_file} has no prediction intervals; rebuilding from the forecast registry")
+            forecast_df = None
+        if forecast_df is None:
+            forecast_df = ForecastRegistry().forecast(series, sarima_spec, start=forecast_start,
+                                                      horizon=forecast_horizon)
+        paths, weights = quantile_paths(forecast_df)
+        print(f"\n✓ {len(paths)} quantile paths from the {forecast_start.year} forecast intervals")
+    else:
+        paths, weights = simulated_paths(series, seed=config['random_seed'])
+        print(f"\n✓ {len(paths):,} simulated SARIMA demand paths for {forecast_start.year}")
+    print(f"  Expected season demand: {(paths.sum(axis=1) @ weights):,.0f} permits")
+
+    months = pd.date_range(forecast_start, periods=forecast_horizon, freq='MS').month.to_numpy()
+    capacity = monthly_capacity(year=forecast_start.year).sum(axis=0)[months - 1]
+
+    # Config scenarios first, so the current pricing row is the baseline
+    n_scenarios = len(config['scenarios'])
+    scenario_peak = [segment_vector(s['peak_multiplier']) for s in config['scenarios']]
+    scenario_offpeak = [segment_vector(s['offpeak_multiplier']) for s in config['scenarios']]
+
+    # Slide the grid until neither optimum sits on its edge
+    grid = candidate_grid
+    start = time.perf_counter()
+    for shifts in range(max_shifts + 1):
+        grid_peak, grid_offpeak = candidate_multipliers(grid)
+        peak, offpeak = np.vstack([scenario_peak, grid_peak]), np.vstack([scenario_offpeak, grid_offpeak])
+        revenue = revenue_matrix(paths, peak, offpeak, months, capacity)
+        summary = risk_summary(revenue, weights, baseline=revenue[0])
+        best = [summary['Expected_Revenue'].idxmax(), summary['CVaR_05'].idxmax()]
+        best = [i - n_scenarios for i in best if i >= n_scenarios]
+        edges = edge_axes(grid, grid_peak[best], grid_offpeak[best])
+        shifted = shift_grid(grid, edges)
+        if all(np.array_equal(a, b) for old, new in zip(grid, shifted) for a, b in zip(old[1:], new[1:])):
+            break
+        grid = shifted
+    elapsed = time.perf_counter() - start
+    print(f"✓ Evaluated {len(peak):,} candidates x {len(paths):,} paths in {elapsed:.2f}s "
+          f"({shifts} grid shift{'s' if shifts != 1 else ''})")
+    for k, season, direction in sorted(edges):
+        values = grid[k][1] if season == 'peak' else grid[k][2]
+        print(f"⚠ Optimum still on the {'upper' if direction == 'up' else 'lower'} edge of the "
+              f"{' + '.join(grid[k][0])} {season} multipliers ({values[-1] if direction == 'up' else values[0]:.2f}); "
+              f"the grid bounds, not the forecast, limit it")
+
+    multipliers = pd.DataFrame(np.hstack([peak, offpeak]),
+                               columns=[f'Peak_{s}' for s in segments] + [f'OffPeak_{s}' for s in segments])
+    names = [scenario['name'] for scenario in config['scenarios']] + ['Grid candidate'] * len(grid_peak)
+    results = pd.concat([pd.Series(names, name='Scenario'), multipliers, summary], axis=1)
+
+    report_cols = ['Peak_Foreign_NonResident', 'OffPeak_Foreign_NonResident',
+                   'Peak_Foreign_Resident', 'OffPeak_Foreign_Resident',
+                   'Expected_Revenue', 'CVaR_05', 'Prob_Beats_Current']
+    print("\nConfigured scenarios:")
+    print(results.iloc[:len(config['scenarios'])][['Scenario'] + report_cols[4:]].round(3).to_string(index=False))
+
+    best_expected = results['Expected_Revenue'].idxmax()
+    best_cvar = results['CVaR_05'].idxmax()
+    print("\nBest candidates by expected revenue:")
+    print(results.nlargest(5, 'Expected_Revenue')[report_cols].round(3).to_string(index=False))
+    print("\nBest candidates by CVaR (mean of worst 5% of seasons):")
+    print(results.nlargest(5, 'CVaR_05')[report_cols].round(3).to_string(index=False))
+
+    current = results.loc[0, 'Expected_Revenue']
+    print(f"\n✓ Expected-revenue optimum: ${results.loc[best_expected, 'Expected_Revenue']:,.0f} "
+          f"({(results.loc[best_expected, 'Expected_Revenue'] / current - 1) * 100:+.1f}% vs current pricing)")
+    print(f"✓ Risk-averse optimum: ${results.loc[best_cvar, 'Expected_Revenue']:,.0f} expected, "
+          f"${results.loc[best_cvar, 'CVaR_05']:,.0f} in the worst 5% of seasons")
+
+    # Scenarios first, then the grid from best to worst expected revenue, with both optima marked
+    results['Selected'] = ''
+    results.loc[best_expected, 'Selected'] = 'Max expected revenue'
+    results.loc[best_cvar, 'Selected'] = (results.loc[best_cvar, 'Selected'] + ', Max CVaR').lstrip(', ')
+    ordered = pd.concat([results.iloc[:n_scenarios],
+                         results.iloc[n_scenarios:].sort_values('Expected_Revenue', ascending=False)])
+    ordered.to_csv('forecast_optimization.csv', index=False)
+    print("\n✓ Saved: forecast_optimization.csv")
+
+    print("\n" + "="*70)
+    print("FORWARD-LOOKING OPTIMIZATION COMPLETE")
+    print("="*70)
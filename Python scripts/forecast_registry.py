@@ -0,0 +1,144 @@
+"""
+Forecast Model Registry
+Fitted forecast models stored on disk, keyed by training data and model spec
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.statespace.sarimax import SARIMAX, SARIMAXResults
+
+# ARIMA(1,1,1)x(1,1,1)12, as used in forecasting_elasticity.py
+sarima_spec = {
+    'order': [1, 1, 1],
+    'seasonal_order': [1, 1, 1, 12],
+    'enforce_stationarity': False,
+    'enforce_invertibility': False
+}
+
+
+def series_hash(series):
+    """Content hash of a series' dates and values."""
+    digest = hashlib.sha256()
+    digest.update(pd.DatetimeIndex(series.index).asi8.tobytes())
+    digest.update(np.asarray(series, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def spec_hash(spec):
+    """Stable hash of a model spec (dict of JSON-serializable values)."""
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def months_between(start, end):
+    """Whole calendar months from start to end."""
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+class ForecastRegistry:
+    """
+    Serve forecasts for any start date and horizon without refitting.
+
+    Each fitted model is saved under cache_dir as <key>.pkl, where the key
+    combines the training-data hash and the model spec, so a model is fitted
+    at most once per (data, spec). Forecast queries are memoized in an LRU
+    cache keyed by (model key, start, horizon, alpha).
+    """
+
+    def __init__(self, cache_dir='forecast_models', maxsize=256):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._series = {}
+        self._models = {}
+        self._cached_forecast = lru_cache(maxsize=maxsize)(self._compute_forecast)
+
+    def key(self, series, spec=None):
+        spec = spec or sarima_spec
+        return hashlib.sha256((series_hash(series) + spec_hash(spec)).encode()).hexdigest()[:24]
+
+    def register(self, series, spec=None):
+        """Record a training series and spec; returns the model key."""
+        spec = spec or sarima_spec
+        key = self.key(series, spec)
+        self._series.setdefault(key, (series.copy(), spec))
+        return key
+
+    def fit(self, series, spec=None):
+        """Fitted results for (series, spec), loaded from disk when available."""
+        return self._load(self.register(series, spec))
+
+    def _load(self, key):
+        if key in self._models:
+            return self._models[key]
+
+        path = os.path.join(self.cache_dir, f'{key}.pkl')
+        if os.path.exists(path):
+            fitted = SARIMAXResults.load(path)
+        else:
+            series, spec = self._series[key]
+            model = SARIMAX(np.asarray(series, dtype=float),
+                            order=tuple(spec['order']),
+                            seasonal_order=tuple(spec['seasonal_order']),
+                            enforce_stationarity=spec.get('enforce_stationarity', True),
+                            enforce_invertibility=spec.get('enforce_invertibility', True))
+            fitted = model.fit(disp=False)
+            fitted.save(path)
+            with open(os.path.join(self.cache_dir, f'{key}.json'), 'w') as f:
+                json.dump({'spec': spec, 'n_obs': len(series),
+                           'first_date': str(series.index[0].date()),
+                           'last_date': str(series.index[-1].date()),
+                           'aic': fitted.aic, 'bic': fitted.bic}, f, indent=2)
+
+        self._models[key] = fitted
+        return fitted
+
+    def forecast(self, series, spec=None, start='2024-01-01', horizon=12, alpha=0.05):
+        """
+        Point forecast and (1 - alpha) prediction interval for `horizon`
+        months beginning at `start`, which must fall after the training data.
+        """
+        key = self.register(series, spec)
+        return self._cached_forecast(key, pd.Timestamp(start), horizon, alpha).copy()
+
+    def _compute_forecast(self, key, start, horizon, alpha):
+        series, _ = self._series[key]
+        offset = months_between(series.index[-1], start)
+        if offset < 1:
+            raise ValueError(f"Forecast start {start.date()} is not after training end {series.index[-1].date()}")
+
+        frame = self._load(key).get_forecast(steps=offset - 1 + horizon).summary_frame(alpha=alpha)
+        frame = frame.iloc[offset - 1:]
+        level = round((1 - alpha) * 100)
+        return pd.DataFrame({
+            'Date': pd.date_range(start=start, periods=horizon, freq='MS'),
+            'Forecasted_Permits': frame['mean'].to_numpy(),
+            f'Lower_{level}': frame['mean_ci_lower'].to_numpy(),
+            f'Upper_{level}': frame['mean_ci_upper'].to_numpy()
+        })
+
+    def simulate(self, series, spec=None, start='2024-01-01', horizon=12, n_paths=1000, seed=42):
+        """
+        n_paths x horizon sample paths from the fitted model's predictive
+        distribution, for the same window as forecast().
+        """
+        key = self.register(series, spec)
+        series, _ = self._series[key]
+        start = pd.Timestamp(start)
+        offset = months_between(series.index[-1], start)
+        if offset < 1:
+            raise ValueError(f"Forecast start {start.date()} is not after training end {series.index[-1].date()}")
+
+        fitted = self._load(key)
+        rng = np.random.default_rng(seed)
+        # statsmodels 0.15 renamed random_state to rng
+        seed_arg = 'rng' if 'rng' in inspect.signature(fitted.simulate).parameters else 'random_state'
+        paths = fitted.simulate(offset - 1 + horizon, anchor='end', repetitions=n_paths, **{seed_arg: rng})
+        return np.asarray(paths).reshape(offset - 1 + horizon, n_paths).T[:, offset - 1:]
+
+    def cache_info(self):
+        return self._cached_forecast.cache_info()
@@ -6,12 +6,17 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from statsmodels.tsa.statespace.sarimax import SARIMAX
 from statsmodels.regression.linear_model import OLS
 import statsmodels.api as sm
+from forecast_registry import ForecastRegistry, sarima_spec
+from model_zoo import ModelZoo, zoo_models, backtest_spec
+from report_builder import Report, render_text
+from config import load_config
 import warnings
 warnings.filterwarnings('ignore')
 
+config = load_config()
+
 print("="*70)
 print("PART 2: DEMAND FORECASTING & ELASTICITY ESTIMATION")
 print("="*70)
@@ -30,30 +35,32 @@ train_series = train_data['Total_Permits']
 
 print(f"Training data: {len(train_series)} months")
 
-# Fit SARIMA model
+# Forecast window (any start after the training data and any horizon)
+forecast_start = pd.Timestamp('2024-01-01')
+forecast_horizon = 12
+forecast_file = f'demand_forecast_{forecast_start.year}.csv'
+
+# Fit SARIMA model (cached on disk by the registry, keyed by data + spec)
+registry = ForecastRegistry()
 try:
-    model = SARIMAX(train_series, 
-                    order=(1, 1, 1),
-                    seasonal_order=(1, 1, 1, 12),
-                    enforce_stationarity=False,
-                    enforce_invertibility=False)
-    
-    fitted_model = model.fit(disp=False)
+    fitted_model = registry.fit(train_series, sarima_spec)
     
     print("✓ SARIMA model fitted successfully")
     print(f"  AIC: {fitted_model.aic:.2f}")
     print(f"  BIC: {fitted_model.bic:.2f}")
     
-    # Forecast next 12 months
-    forecast = fitted_model.forecast(steps=12)
-    forecast_index = pd.date_range(start='2024-01-01', periods=12, freq='MS')
+    # Forecast with 95% prediction interval
+    forecast_df = registry.forecast(train_series, sarima_spec,
+                                    start=forecast_start, horizon=forecast_horizon, alpha=0.05)
+    forecast = forecast_df['Forecasted_Permits']
+    forecast_index = forecast_df['Date']
     
     # Visualize
     fig, ax = plt.subplots(figsize=(14, 6))
     ax.plot(train_data.index, train_data['Total_Permits'], label='Historical Data', linewidth=2, color='#2E86AB')
-    ax.plot(forecast_index, forecast, label='12-Month Forecast', linewidth=2, color='#E63946', linestyle='--', marker='o')
-    ax.fill_between(forecast_index, forecast * 0.9, forecast * 1.1, alpha=0.2, color='#E63946')
-    ax.set_title('SARIMA Forecast: Gorilla Permit Demand (2024)', fontsize=14, fontweight='bold')
+    ax.plot(forecast_index, forecast, label=f'{forecast_horizon}-Month Forecast', linewidth=2, color='#E63946', linestyle='--', marker='o')
+    ax.fill_between(forecast_index, forecast_df['Lower_95'], forecast_df['Upper_95'], alpha=0.2, color='#E63946', label='95% Prediction Interval')
+    ax.set_title(f'SARIMA Forecast: Gorilla Permit Demand ({forecast_start.year})', fontsize=14, fontweight='bold')
     ax.set_xlabel('Date')
     ax.set_ylabel('Monthly Permits')
     ax.legend()
@@ -64,21 +71,20 @@ try:
     plt.close()
     
     # Save forecast
-    forecast_df = pd.DataFrame({
-        'Date': forecast_index,
-        'Forecasted_Permits': forecast.values
-    })
-    forecast_df.to_csv('demand_forecast_2024.csv', index=False)
-    print("✓ Saved: demand_forecast_2024.csv")
+    forecast_df.to_csv(forecast_file, index=False)
+    print(f"✓ Saved: {forecast_file}")
     
 except Exception as e:
     print(f"✗ SARIMA fitting failed: {e}")
-    # Use simple moving average forecast
-    forecast = np.array([train_series.tail(12).mean()] * 12)
-    forecast_df = pd.DataFrame({
-        'Date': pd.date_range('2024-01-01', periods=12, freq='MS'),
-        'Forecasted_Permits': forecast
-    })
+    # Fall back to the best backtested model from the zoo, fitted in-process:
+    # this script has no __main__ guard for spawned pool workers to stop at
+    zoo = ModelZoo(models=[model for model in zoo_models if model != 'sarima'],
+                   spec=dict(backtest_spec, horizon=forecast_horizon))
+    forecast_df = zoo.best_forecast(train_series, start=forecast_start, workers=1)
+    forecast = forecast_df['Forecasted_Permits']
+    print(f"✓ Fallback forecast from {forecast_df['Model'].iloc[0]} (best rolling backtest RMSE)")
+    forecast_df.to_csv(forecast_file, index=False)
+    print(f"✓ Saved: {forecast_file}")
 
 # ============================================================================
 # 2.2 PRICE ELASTICITY ESTIMATION
@@ -86,16 +92,17 @@ except Exception as e:
 print("\n[2.2] PRICE ELASTICITY ESTIMATION...")
 
 # Create price-demand dataset using competitor analysis
-# Rwanda: $1500, Uganda: $800, DRC: $400
+# Rwanda: $1500, Uganda: $800, DRC: $400 (pricing_config.json 'competitors')
 # We'll use cross-sectional comparison
 
+market = config['competitors']
 elasticity_data = pd.DataFrame({
-    'Country': ['DRC', 'Uganda', 'Rwanda'],
-    'Price': [400, 800, 1500],
-    'Annual_Permits': [5000, 15000, 20000],  # Estimates from literature
-    'Log_Price': [np.log(400), np.log(800), np.log(1500)],
-    'Log_Quantity': [np.log(5000), np.log(15000), np.log(20000)]
+    'Country': list(market['prices']),
+    'Price': list(market['prices'].values()),
+    'Annual_Permits': [market['annual_permits'][c] for c in market['prices']]  # Estimates from literature
 })
+elasticity_data['Log_Price'] = np.log(elasticity_data['Price'])
+elasticity_data['Log_Quantity'] = np.log(elasticity_data['Annual_Permits'])
 
 print("\nCross-Country Price-Demand Data:")
 print(elasticity_data[['Country', 'Price', 'Annual_Permits']])
@@ -112,12 +119,7 @@ print(f"  (Price increase of 1% → Demand change of {elasticity_coefficient:.2f
 print(f"  R-squared: {model_elasticity.rsquared:.3f}")
 
 # Segment-specific elasticities (from literature)
-elasticities = {
-    'Foreign_NonResident': -0.3,   # Inelastic (wealthy tourists)
-    'Foreign_Resident': -0.6,      # Moderately elastic
-    'Rest_of_Africa': -1.2,        # Elastic
-    'East_African': -1.8           # Highly elastic (price-sensitive)
-}
+elasticities = config['elasticities']
 
 print("\n✓ Segment-Specific Elasticities:")
 for segment, elast in elasticities.items():
@@ -168,32 +170,39 @@ plt.savefig('07_price_elasticity.png', dpi=300, bbox_inches='tight')
 print("✓ Saved: 07_price_elasticity.png")
 plt.close()
 
-# Save elasticity results
+# Save elasticity results (structured results for report_builder.py, plus the text report)
+report = Report('Price Elasticity Estimation Results', facts={
+    'overall_elasticity': elasticity_coefficient, 'r_squared': model_elasticity.rsquared,
+    'segment_elasticities': elasticities,
+    'forecast_total': forecast_df['Forecasted_Permits'].sum(),
+    'forecast_start': forecast_start,
+    'forecast_model': forecast_df['Model'].iloc[0] if 'Model' in forecast_df else 'SARIMA'
+})
+report.section('Overall Elasticity (Cross-Country Analysis)')
+report.metrics({
+    'Elasticity Coefficient': f"{elasticity_coefficient:.3f}",
+    'R-squared': f"{model_elasticity.rsquared:.3f}",
+    'Interpretation': f"Demand is {'elastic' if elasticity_coefficient < -1 else 'inelastic'}"
+})
+report.table(elasticity_data[['Country', 'Price', 'Annual_Permits']], formats={'Price': '${:,.0f}', 'Annual_Permits': '{:,.0f}'})
+report.section('Segment-Specific Elasticities')
+report.table(pd.DataFrame({'Segment': list(elasticities), 'Elasticity': list(elasticities.values()),
+                           'Interpretation': ["Highly Elastic" if e < -1.5 else "Elastic" if e < -1.0 else
+                                              "Moderately Elastic" if e < -0.5 else "Inelastic"
+                                              for e in elasticities.values()]}),
+             formats={'Elasticity': '{:.2f}'})
+report.section('Key Insights')
+report.bullets([
+    "Foreign non-residents have inelastic demand → Can increase prices",
+    "East African citizens are price-sensitive → Need affordable pricing",
+    "Differentiated pricing strategy can maximize revenue across segments",
+    "Peak season price increases will have minimal impact on foreign demand"
+])
+report.save('elasticity_results.json')
 with open('elasticity_results.txt', 'w') as f:
-    f.write("="*70 + "\n")
-    f.write("PRICE ELASTICITY ESTIMATION RESULTS\n")
-    f.write("="*70 + "\n\n")
-    
-    f.write("OVERALL ELASTICITY (Cross-Country Analysis)\n")
-    f.write("-"*70 + "\n")
-    f.write(f"Elasticity Coefficient: {elasticity_coefficient:.3f}\n")
-    f.write(f"R-squared: {model_elasticity.rsquared:.3f}\n")
-    f.write(f"Interpretation: Demand is {'elastic' if elasticity_coefficient < -1 else 'inelastic'}\n\n")
-    
-    f.write("SEGMENT-SPECIFIC ELASTICITIES\n")
-    f.write("-"*70 + "\n")
-    for segment, elast in elasticities.items():
-        interpretation = "Highly Elastic" if elast < -1.5 else "Elastic" if elast < -1.0 else "Moderately Elastic" if elast < -0.5 else "Inelastic"
-        f.write(f"{segment:25s}: {elast:6.2f}  ({interpretation})\n")
-    
-    f.write("\n\nKEY INSIGHTS:\n")
-    f.write("-"*70 + "\n")
-    f.write("• Foreign non-residents have inelastic demand → Can increase prices\n")
-    f.write("• East African citizens are price-sensitive → Need affordable pricing\n")
-    f.write("• Differentiated pricing strategy can maximize revenue across segments\n")
-    f.write("• Peak season price increases will have minimal impact on foreign demand\n")
-
-print("✓ Saved: elasticity_results.txt")
+    f.write(render_text(report))
+
+print("✓ Saved: elasticity_results.txt, elasticity_results.json")
 
 print("\n" + "="*70)
 print("FORECASTING & ELASTICITY ANALYSIS COMPLETE")
@@ -10,9 +10,14 @@ import seaborn as sns
 from statsmodels.tsa.seasonal import seasonal_decompose
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from scipy import stats
+from config import load_config
+from ingestion import DataIngestor
+from pricing_model import annual_visitors, seasonality_column
 import warnings
 warnings.filterwarnings('ignore')
 
+config = load_config()
+
 # Set style
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
@@ -22,52 +27,29 @@ print("GORILLA TREKKING PERMIT PRICING OPTIMIZATION ANALYSIS")
 print("="*70)
 
 # ============================================================================
-# 1. LOAD DATA
+# 1. INGEST DATA
 # ============================================================================
-print("\n[1] LOADING DATA...")
-
-# Load National Parks Visitor Data
-try:
-    df_parks = pd.read_excel('National_Parks_Visitors_2019-2023.xlsx')
-    print("✓ National Parks Visitors data loaded")
-    print(f"  Shape: {df_parks.shape}")
-except Exception as e:
-    print(f"✗ Error loading parks data: {e}")
-    df_parks = None
-
-# Load Monthly Tourism Arrivals
-try:
-    df_monthly = pd.read_excel('Tourism_Arrivals_Monthly_2023.xlsx')
-    print("✓ Monthly Tourism Arrivals data loaded")
-    print(f"  Shape: {df_monthly.shape}")
-except Exception as e:
-    print(f"✗ Error loading monthly data: {e}")
-    df_monthly = None
-
-# Load Visitor Arrivals
-try:
-    df_arrivals = pd.read_excel('Visitor_Arrivals_2019-2023.xlsx')
-    print("✓ Visitor Arrivals data loaded")
-    print(f"  Shape: {df_arrivals.shape}")
-except Exception as e:
-    print(f"✗ Error loading arrivals data: {e}")
-    df_arrivals = None
+print("\n[1] INGESTING DATA...")
+
+# New or changed UBOS workbooks are detected, validated and appended to the
+# canonical dataset; unchanged workbooks are not re-read
+ingestor = DataIngestor()
+ingest_report = ingestor.run()
+for row in ingest_report.itertuples():
+    if row.Status == 'rejected':
+        print(f"✗ {row.Source}: {row.Error}")
+    else:
+        print(f"✓ {row.Source}: {row.Status} ({row.Dataset}, {row.Years})")
+
+df_parks = ingestor.load('park_visitors')
+df_monthly = ingestor.load('monthly_arrivals')
+df_arrivals = ingestor.load('annual_arrivals')
 
 print("\n[2] EXPLORING DATA STRUCTURE...")
-if df_parks is not None:
-    print("\n--- National Parks Data Preview ---")
-    print(df_parks.head(10))
-    print("\nColumns:", df_parks.columns.tolist())
-    
-if df_monthly is not None:
-    print("\n--- Monthly Data Preview ---")
-    print(df_monthly.head(10))
-    print("\nColumns:", df_monthly.columns.tolist())
-    
-if df_arrivals is not None:
-    print("\n--- Arrivals Data Preview ---")
-    print(df_arrivals.head(10))
-    print("\nColumns:", df_arrivals.columns.tolist())
+for name, table in [('National Parks', df_parks), ('Monthly', df_monthly), ('Arrivals', df_arrivals)]:
+    print(f"\n--- {name} Data Preview ---")
+    print(table.head(10))
+    print(f"\nShape: {table.shape}")
 
 print("\n" + "="*70)
 print("DATA EXPLORATION COMPLETE - Ready for analysis")
@@ -78,37 +60,25 @@ print("="*70)
 # ============================================================================
 print("\n[3] CLEANING AND PREPARING DATA...")
 
-# Clean National Parks Data
-df_parks_clean = df_parks.iloc[1:, :].copy()
-df_parks_clean.columns = ['Park', '2019', '2020', '2021', '2022', '2023', 'Change_2022_2023', 'Pct_Change']
-df_parks_clean = df_parks_clean[df_parks_clean['Park'].notna()]
-
-# Convert to numeric
-for year in ['2019', '2020', '2021', '2022', '2023']:
-    df_parks_clean[year] = pd.to_numeric(df_parks_clean[year], errors='coerce')
+# National Parks Data: one row per park, one column per year
+df_parks_clean = df_parks.pivot(index='Park', columns='Year', values='Visitors')
+years = sorted(df_parks_clean.columns)
 
 print("✓ National Parks data cleaned")
-print(f"  Parks: {len(df_parks_clean)}")
+print(f"  Parks: {len(df_parks_clean)}, years {years[0]}-{years[-1]}")
 
 # Focus on Bwindi (main gorilla park)
-bwindi_data = df_parks_clean[df_parks_clean['Park'].str.contains('Bwindi', case=False, na=False)]
-print(f"✓ Bwindi data extracted: {bwindi_data.iloc[0]['2023']:.0f} visitors in 2023")
+bwindi_visitors = annual_visitors(df_parks)
+print(f"✓ Bwindi data extracted: {bwindi_visitors[max(bwindi_visitors)]:.0f} visitors in {max(bwindi_visitors)}")
 
-# Clean Monthly Data
-df_monthly_clean = df_monthly.iloc[2:, :].copy()
-df_monthly_clean.columns = ['Month', 'Arrivals', 'Departures', 'Total_Arrivals', 'Col4', 'Col5', 'Total']
-df_monthly_clean = df_monthly_clean[df_monthly_clean['Month'].notna()]
-df_monthly_clean['Total'] = pd.to_numeric(df_monthly_clean['Total'], errors='coerce')
-df_monthly_clean = df_monthly_clean[df_monthly_clean['Month'] != 'Month']
+# Monthly Data: latest year available
+df_monthly_clean = df_monthly[df_monthly['Year'] == df_monthly['Year'].max()].sort_values('Month')
 
 print("✓ Monthly seasonality data cleaned")
-print(f"  Months: {len(df_monthly_clean)}")
+print(f"  Months: {len(df_monthly_clean)} ({df_monthly_clean['Year'].iloc[0]})")
 
-# Clean Arrivals Data
-df_arrivals_clean = df_arrivals.iloc[1:6, :].copy()
-df_arrivals_clean.columns = ['Year', 'Tourist_Arrivals', 'Tourist_Departures', 'Net_Movement']
-for col in ['Tourist_Arrivals', 'Tourist_Departures']:
-    df_arrivals_clean[col] = pd.to_numeric(df_arrivals_clean[col], errors='coerce')
+# Annual Arrivals Data
+df_arrivals_clean = df_arrivals.set_index('Year')[['Arrivals', 'Departures', 'Net_Movement']]
 
 print("✓ Annual arrivals data cleaned")
 
@@ -123,45 +93,38 @@ print("\n[4] CREATING GORILLA-SPECIFIC ESTIMATES...")
 # - Current utilization ~60-70% = ~15,000-16,000 permits/year
 # - Average from literature: gorilla tourists = 40% of Bwindi visitors
 
-# Extract Bwindi annual visitors
-bwindi_visitors = {
-    2019: float(bwindi_data['2019'].values[0]) if len(bwindi_data) > 0 else 30000,
-    2020: float(bwindi_data['2020'].values[0]) if len(bwindi_data) > 0 else 8000,
-    2021: float(bwindi_data['2021'].values[0]) if len(bwindi_data) > 0 else 12000,
-    2022: float(bwindi_data['2022'].values[0]) if len(bwindi_data) > 0 else 28000,
-    2023: float(bwindi_data['2023'].values[0]) if len(bwindi_data) > 0 else 35500
-}
-
-# Estimate gorilla permits (40% of Bwindi visitors)
-gorilla_permits = {year: int(visitors * 0.40) for year, visitors in bwindi_visitors.items()}
+# Estimate gorilla permits (40% of Bwindi visitors by default)
+gorilla_permits = {year: int(visitors * config['gorilla_share']) for year, visitors in bwindi_visitors.items()}
 
 print("Estimated Gorilla Permits by Year:")
 for year, permits in gorilla_permits.items():
     print(f"  {year}: {permits:,} permits")
 
 # ============================================================================
-# 5. CREATE MONTHLY TIME SERIES (2019-2023)
+# 5. CREATE MONTHLY TIME SERIES
 # ============================================================================
 print("\n[5] CREATING MONTHLY TIME SERIES...")
 
-# Use monthly pattern from 2023 data as baseline seasonality
-monthly_pattern = df_monthly_clean.copy()
-monthly_pattern['Month'] = monthly_pattern['Month'].str.strip()
-month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
-               'July', 'August', 'September', 'October', 'November', 'December']
-monthly_pattern = monthly_pattern[monthly_pattern['Month'].isin(month_order)]
+# Use monthly pattern from the latest year of data as baseline seasonality
+monthly_pattern = df_monthly_clean[['Month_Name', seasonality_column]].rename(columns={'Month_Name': 'Month'})
 
 # Calculate seasonality index
-avg_total = monthly_pattern['Total'].mean()
-monthly_pattern['Seasonality_Index'] = monthly_pattern['Total'] / avg_total
+avg_total = monthly_pattern[seasonality_column].mean()
+monthly_pattern['Seasonality_Index'] = monthly_pattern[seasonality_column] / avg_total
 
 print("✓ Seasonality indices calculated")
 
-# Create 60-month time series (2019-2023)
-dates = pd.date_range(start='2019-01-01', end='2023-12-31', freq='MS')
+# Create monthly time series over every year of park data
+dates = pd.date_range(start=f'{years[0]}-01-01', end=f'{years[-1]}-12-31', freq='MS')
 ts_data = []
 
-for date in dates:
+# Seeded month-level noise so every run reproduces the same dataset;
+# ensemble_analysis.py draws its first realization from the same stream
+random_seed = config['random_seed']
+rng = np.random.default_rng(random_seed)
+noise = rng.uniform(0.95, 1.05, size=len(dates))
+
+for i, date in enumerate(dates):
     year = date.year
     month_name = date.strftime('%B')
     
@@ -181,12 +144,12 @@ for date in dates:
     
     # Add COVID impact
     if year == 2020 and date.month >= 3:
-        monthly_permits *= 0.1  # 90% reduction during COVID
+        monthly_permits *= config['covid_factors'][2020]  # 90% reduction during COVID
     elif year == 2021:
-        monthly_permits *= 0.6  # 40% reduction in 2021
+        monthly_permits *= config['covid_factors'][2021]  # 40% reduction in 2021
     
     # Add noise
-    monthly_permits *= np.random.uniform(0.95, 1.05)
+    monthly_permits *= noise[i]
     
     ts_data.append({
         'Date': date,
@@ -214,20 +177,10 @@ print("\n[6] SEGMENTING BY VISITOR CATEGORY...")
 # - Rest of Africa: 15% of permits
 # - East African: 10% of permits
 
-segment_shares = {
-    'Foreign_NonResident': 0.65,
-    'Foreign_Resident': 0.10,
-    'Rest_of_Africa': 0.15,
-    'East_African': 0.10
-}
-
-# Current prices (USD equivalent)
-current_prices = {
-    'Foreign_NonResident': 800,
-    'Foreign_Resident': 700,
-    'Rest_of_Africa': 500,
-    'East_African': 100  # ~300,000 UGX
-}
+segment_shares = config['segment_shares']
+
+# Current prices (USD equivalent; East African ~300,000 UGX)
+current_prices = config['current_prices']
 
 for segment, share in segment_shares.items():
     df_ts[segment] = (df_ts['Total_Permits'] * share).astype(int)
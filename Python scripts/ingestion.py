@@ -0,0 +1,415 @@
+"""
+Incremental Data Ingestion
+Detects UBOS workbook layouts, validates them against schemas and appends new sources to the canonical dataset
+"""
+
+import calendar
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import pandas as pd
+
+canonical_dir = 'canonical_data'
+manifest_name = 'ingest_manifest.json'
+
+month_names = list(calendar.month_name)[1:]
+
+# Schemas: how each dataset's header row is recognised, how its values are laid out
+# and what must hold before its rows enter the canonical dataset.
+#   label    - the first-column header cell (full match, case-insensitive)
+#   layout   - 'year_columns': one column per year, one row per label
+#              'month_rows': one row per month, year taken from the title or file name
+#              'year_rows': one row per year
+#   columns  - output column -> regex matched against the (flattened) header
+schemas = {
+    'park_visitors': {
+        'label': r'(national )?parks?',
+        'layout': 'year_columns',
+        'label_column': 'Park',
+        'value_column': 'Visitors',
+        'key': ['Park', 'Year'],
+        'required_labels': [r'bwindi', r'mgahinga']
+    },
+    'monthly_arrivals': {
+        'label': r'months?',
+        'layout': 'month_rows',
+        'key': ['Year', 'Month'],
+        'columns': {
+            'Arrivals_Female': r'arrivals\b.*\bfemale',
+            'Arrivals_Male': r'arrivals\b.*\bmale',
+            'Arrivals_Total': r'arrivals\b.*\btotal',
+            'Departures_Female': r'departures\b.*\bfemale',
+            'Departures_Male': r'departures\b.*\bmale',
+            'Departures_Total': r'departures\b.*\btotal'
+        },
+        'required': ['Arrivals_Total', 'Departures_Total']
+    },
+    'annual_arrivals': {
+        'label': r'years?',
+        'layout': 'year_rows',
+        'key': ['Year'],
+        'columns': {
+            'Arrivals': r'arrivals',
+            'Departures': r'departures',
+            'Net_Movement': r'net'
+        },
+        'required': ['Arrivals', 'Departures'],
+        'signed': ['Net_Movement']
+    }
+}
+
+_year_cell = re.compile(r'^\s*((?:19|20)\d{2})\s*\*?\s*$')
+_year_in_text = re.compile(r'(?<!\d)((?:19|20)\d{2})(?!\d)')
+_end_of_data = re.compile(r'^(total|source)\b', re.IGNORECASE)
+
+
+class SchemaError(ValueError):
+    """A workbook does not have the layout its schema requires."""
+
+
+def parse_year(value):
+    """Calendar year in a header or label cell (2019, 2019.0, '2019*'), else None."""
+    if pd.isna(value):
+        return None
+    if isinstance(value, float):
+        if not value.is_integer():
+            return None
+        value = int(value)
+    match = _year_cell.match(str(value))
+    return int(match.group(1)) if match else None
+
+
+def parse_month(value):
+    """Month number from a full or abbreviated month name, else None."""
+    text = str(value).strip().lower()
+    for number, name in enumerate(month_names, 1):
+        if len(text) >= 3 and name.lower().startswith(text):
+            return number
+    return None
+
+
+def _text(value):
+    return '' if pd.isna(value) else str(value).strip()
+
+
+def detect_header(raw, schema):
+    """
+    Locate a schema's header row in a sheet read without headers.
+
+    Returns the header row index and the column names. When the row above
+    is a group header (e.g. Arrivals / Departures over Female / Male / Total)
+    it is forward-filled and joined onto the names below it.
+    """
+    label = re.compile(schema['label'], re.IGNORECASE)
+    for row in range(len(raw)):
+        if label.fullmatch(_text(raw.iat[row, 0])):
+            names = [_text(value) for value in raw.iloc[row]]
+            if row > 0 and raw.iloc[row - 1, 1:].notna().any():
+                groups = raw.iloc[row - 1].ffill()
+                names = [f'{_text(group)} {name}'.strip() for group, name in zip(groups, names)]
+            return row, names
+    return None, None
+
+
+def _data_rows(raw, header_row):
+    # Rows below the header up to the first blank label, total or source note
+    rows = []
+    for row in range(header_row + 1, len(raw)):
+        label = _text(raw.iat[row, 0])
+        if not label or _end_of_data.match(label):
+            break
+        rows.append(row)
+    return raw.iloc[rows]
+
+
+def _match_columns(names, schema):
+    matched = {}
+    for column, pattern in schema['columns'].items():
+        hits = [j for j, name in enumerate(names) if re.search(pattern, name, re.IGNORECASE)]
+        if len(hits) > 1:
+            raise SchemaError(f"Column '{column}' matches several headers: {[names[j] for j in hits]}")
+        if hits:
+            matched[column] = hits[0]
+    missing = [column for column in schema.get('required', []) if column not in matched]
+    if missing:
+        raise SchemaError(f"Missing required columns: {missing}")
+    return matched
+
+
+def _numeric(values, column):
+    numbers = pd.to_numeric(values, errors='coerce')
+    bad = values.notna() & numbers.isna()
+    if bad.any():
+        raise SchemaError(f"Non-numeric values in '{column}': {values[bad].tolist()[:5]}")
+    return numbers.astype(float)
+
+
+def _sheet_year(raw, header_row, path):
+    # Year of a single-year sheet: the title rows above the header, else the file name
+    title = ' '.join(_text(value) for value in raw.iloc[:header_row].to_numpy().ravel())
+    years = _year_in_text.findall(title) or _year_in_text.findall(os.path.basename(path))
+    if not years:
+        raise SchemaError("No year found in the sheet title or file name")
+    return int(years[-1])
+
+
+def extract(raw, schema, path=''):
+    """Canonical rows of one sheet under a schema, or None if its header is absent."""
+    header_row, names = detect_header(raw, schema)
+    if header_row is None:
+        return None
+    data = _data_rows(raw, header_row)
+    if data.empty:
+        raise SchemaError("Header found but no data rows below it")
+
+    if schema['layout'] == 'year_columns':
+        header = raw.iloc[header_row]
+        year_columns = {parse_year(value): j for j, value in enumerate(header) if parse_year(value)}
+        if not year_columns:
+            raise SchemaError("No year columns in the header row")
+        labels = data.iloc[:, 0].map(_text)
+        table = pd.concat([pd.DataFrame({schema['label_column']: labels.to_numpy(), 'Year': year,
+                                         schema['value_column']: _numeric(data.iloc[:, j], str(year)).to_numpy()})
+                           for year, j in sorted(year_columns.items())], ignore_index=True)
+
+    elif schema['layout'] == 'month_rows':
+        months = data.iloc[:, 0].map(parse_month)
+        if months.isna().any():
+            raise SchemaError(f"Unrecognised months: {data.iloc[:, 0][months.isna()].tolist()}")
+        table = pd.DataFrame({'Year': _sheet_year(raw, header_row, path), 'Month': months.astype(int).to_numpy(),
+                              'Month_Name': [month_names[m - 1] for m in months]})
+        for column, j in _match_columns(names, schema).items():
+            table[column] = _numeric(data.iloc[:, j], column).to_numpy()
+
+    elif schema['layout'] == 'year_rows':
+        years = data.iloc[:, 0].map(parse_year)
+        if years.isna().any():
+            raise SchemaError(f"Unrecognised years: {data.iloc[:, 0][years.isna()].tolist()}")
+        table = pd.DataFrame({'Year': years.astype(int).to_numpy()})
+        for column, j in _match_columns(names, schema).items():
+            table[column] = _numeric(data.iloc[:, j], column).to_numpy()
+
+    else:
+        raise ValueError(f"Unknown layout '{schema['layout']}'")
+
+    validate(table, schema)
+    return table
+
+
+def validate(table, schema):
+    """Raise SchemaError unless the table satisfies its schema's invariants."""
+    duplicated = table.duplicated(schema['key'])
+    if duplicated.any():
+        raise SchemaError(f"Duplicate {schema['key']} rows: {table.loc[duplicated, schema['key']].values.tolist()[:5]}")
+
+    signed = set(schema.get('signed', [])) | set(schema['key']) | {'Month_Name'}
+    for column in table.columns.difference(list(signed)):
+        if pd.api.types.is_numeric_dtype(table[column]) and (table[column] < 0).any():
+            raise SchemaError(f"Negative values in '{column}'")
+
+    for pattern in schema.get('required_labels', []):
+        if not table[schema['label_column']].str.contains(pattern, case=False).any():
+            raise SchemaError(f"No row matching '{pattern}'")
+
+    if schema['layout'] == 'month_rows':
+        counts = table.groupby('Year')['Month'].nunique()
+        incomplete = counts[counts != 12]
+        if len(incomplete):
+            raise SchemaError(f"Incomplete months for years {incomplete.index.tolist()}")
+
+
+def read_workbook(path):
+    """
+    Detect and extract the dataset in every sheet of a workbook.
+
+    Returns {dataset: table}. Raises SchemaError when no sheet matches any
+    schema, or when a sheet's header matches but its contents do not validate.
+    """
+    found = {}
+    for sheet, raw in pd.read_excel(path, sheet_name=None, header=None).items():
+        for dataset, schema in schemas.items():
+            try:
+                table = extract(raw, schema, path)
+            except SchemaError as e:
+                raise SchemaError(f"{os.path.basename(path)} [{sheet}] as {dataset}: {e}") from None
+            if table is not None:
+                found[dataset] = pd.concat([found[dataset], table], ignore_index=True) if dataset in found else table
+                break
+    if not found:
+        raise SchemaError(f"{os.path.basename(path)}: no sheet matches a known schema")
+    return found
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path, write):
+    # Write through a unique temp file, then swap it in: concurrent runs never share a temp file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', newline='') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _report_row(source, entry, status):
+    return {'Source': source, 'Status': status, 'Dataset': entry['dataset'], 'Rows': entry['rows'],
+            'Years': entry['years'], 'Error': entry['error']}
+
+
+def load_canonical(dataset, canonical_dir=canonical_dir):
+    """Canonical table for a dataset, read without ingesting; raises if it has never been built."""
+    path = os.path.join(canonical_dir, f'{dataset}.csv')
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No canonical '{dataset}' table at {path}; "
+                                f"run gorilla_pricing_analysis.py or ingestion.py first")
+    return pd.read_csv(path)
+
+
+class DataIngestor:
+    """
+    Keep the canonical dataset in step with the source workbooks.
+
+    Each run scans source_dir for workbooks and skips any whose size and
+    modification time (or, failing that, content hash) match the manifest,
+    so unchanged sources are never re-read. New or changed workbooks are
+    detected, validated and upserted into one CSV per dataset under
+    canonical_dir. Rows are keyed by the schema key; when sources overlap,
+    the one whose data runs to the latest year wins. Rows of a workbook
+    that changes are replaced, and rows of a workbook that disappears are kept.
+    """
+
+    def __init__(self, source_dir='.', canonical_dir=canonical_dir, pattern='*.xlsx'):
+        self.source_dir = source_dir
+        self.canonical_dir = canonical_dir
+        self.pattern = pattern
+        self.manifest_path = os.path.join(canonical_dir, manifest_name)
+        os.makedirs(canonical_dir, exist_ok=True)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+
+    def _table_path(self, dataset):
+        return os.path.join(self.canonical_dir, f'{dataset}.csv')
+
+    def load(self, dataset):
+        """Canonical table for a dataset (empty if nothing has been ingested)."""
+        path = self._table_path(dataset)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=schemas[dataset]['key'])
+        return pd.read_csv(path)
+
+    def _save(self, dataset, table):
+        write_atomic(self._table_path(dataset), lambda f: table.to_csv(f, index=False))
+
+    def _upsert(self, dataset, table, source):
+        key = schemas[dataset]['key']
+        table = table.assign(Source=source, Vintage=int(table['Year'].max()))
+        current = self.load(dataset)
+        if 'Source' in current:
+            current = current[current['Source'] != source]
+        combined = table if current.empty else pd.concat([current, table], ignore_index=True)
+        combined = (combined.sort_values('Vintage', kind='stable')
+                            .drop_duplicates(key, keep='last')
+                            .sort_values(key)
+                            .reset_index(drop=True))
+        self._save(dataset, combined)
+
+    def run(self, full=False):
+        """
+        Ingest new and changed workbooks; full=True rebuilds from every source.
+
+        Returns one report row per source with its status: new, updated,
+        unchanged, rejected (failed validation) or missing (no longer on disk).
+        The manifest is only rewritten when something changed.
+        """
+        changed = full
+        if full:
+            self.manifest = {}
+            for dataset in schemas:
+                if os.path.exists(self._table_path(dataset)):
+                    os.remove(self._table_path(dataset))
+
+        report = []
+        paths = sorted(path for path in glob.glob(os.path.join(self.source_dir, self.pattern))
+                       if not os.path.basename(path).startswith('~$'))
+        for path in paths:
+            name = os.path.basename(path)
+            stat = os.stat(path)
+            entry = self.manifest.get(name)
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+                report.append(_report_row(name, entry, 'unchanged'))
+                continue
+            digest = file_hash(path)
+            changed = True
+            if entry and entry['sha256'] == digest:
+                entry['mtime'] = stat.st_mtime
+                report.append(_report_row(name, entry, 'unchanged'))
+                continue
+
+            status = 'updated' if entry else 'new'
+            entry = {'sha256': digest, 'size': stat.st_size, 'mtime': stat.st_mtime}
+            try:
+                tables = read_workbook(path)
+            except SchemaError as e:
+                entry.update(dataset=None, rows=0, years=None, error=str(e))
+                self.manifest[name] = entry
+                report.append(_report_row(name, entry, 'rejected'))
+                continue
+
+            for dataset, table in tables.items():
+                self._upsert(dataset, table, name)
+            years = sorted({int(y) for table in tables.values() for y in table['Year']})
+            entry.update(dataset=', '.join(tables), rows=sum(len(t) for t in tables.values()),
+                         years=f'{years[0]}-{years[-1]}', error=None)
+            self.manifest[name] = entry
+            report.append(_report_row(name, entry, status))
+
+        on_disk = {os.path.basename(path) for path in paths}
+        for name, entry in self.manifest.items():
+            if name not in on_disk:
+                report.append(_report_row(name, entry, 'missing'))
+
+        if changed:
+            write_atomic(self.manifest_path, lambda f: json.dump(self.manifest, f, indent=2))
+
+        return pd.DataFrame(report)
+
+
+if __name__ == '__main__':
+    import sys
+
+    print("="*70)
+    print("DATA INGESTION")
+    print("="*70)
+
+    ingestor = DataIngestor()
+    report = ingestor.run(full='--full' in sys.argv[1:])
+    print()
+    print(report.drop(columns='Error').to_string(index=False))
+    for row in report[report['Status'] == 'rejected'].itertuples():
+        print(f"✗ {row.Error}")
+
+    print("\nCanonical dataset:")
+    for dataset in schemas:
+        table = ingestor.load(dataset)
+        years = f"{table['Year'].min()}-{table['Year'].max()}" if len(table) else '-'
+        print(f"  {dataset:18s}: {len(table):4d} rows, years {years}")
+    print(f"\n✓ Saved: {ingestor.canonical_dir}/ ({manifest_name} + one CSV per dataset)")
+
+    print("\n" + "="*70)
+    print("INGESTION COMPLETE")
+    print("="*70)
@@ -0,0 +1,297 @@
+"""
+Forecast Model Zoo
+Backtests several forecasting models per series in parallel and keeps the best
+"""
+
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from statsmodels.tsa.forecasting.theta import ThetaModel
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from forecast_registry import sarima_spec, series_hash, spec_hash, months_between
+from ingestion import write_atomic
+from shared_data import attached, publish_series
+
+season_length = 12
+
+
+def _future_months(series, steps):
+    return (series.index[-1].month + np.arange(steps)) % 12 + 1
+
+
+def _trend_month_fit(series, steps):
+    # Linear trend plus calendar-month indices fitted to the observed months,
+    # evaluated over the series and `steps` months beyond it
+    t = np.arange(len(series) + steps)
+    months = np.concatenate([series.index.month.to_numpy(), _future_months(series, steps)])
+    X = np.column_stack([t, np.eye(12)[months - 1]])
+    values = series.to_numpy(dtype=float)
+    observed = ~np.isnan(values)
+    coef, *_ = np.linalg.lstsq(X[:len(series)][observed], values[observed], rcond=None)
+    return X @ coef
+
+
+def _filled(series):
+    # Missing months imputed from the trend + month fit, for models that need an unbroken series
+    values = series.to_numpy(dtype=float, copy=True)
+    missing = np.isnan(values)
+    values[missing] = _trend_month_fit(series, 0)[missing]
+    return values
+
+
+def seasonal_naive(series, steps):
+    """Repeat the latest observed value of each calendar month."""
+    values = series.to_numpy(dtype=float)
+    last = np.full(season_length, np.nan)
+    for lag in range(season_length, len(values) + 1, season_length):
+        last = np.where(np.isnan(last), values[len(values) - lag:len(values) - lag + season_length], last)
+    return np.resize(last, steps)
+
+
+def holt_winters(series, steps):
+    """Additive-trend, multiplicative-season exponential smoothing."""
+    model = ExponentialSmoothing(_filled(series), trend='add', seasonal='mul',
+                                 seasonal_periods=season_length)
+    return model.fit().forecast(steps)
+
+
+def theta(series, steps):
+    """Theta method on the seasonally adjusted series."""
+    return ThetaModel(_filled(series), period=season_length).fit().forecast(steps)
+
+
+def sarima(series, steps):
+    """SARIMA with the registry's default specification; missing months are left to the Kalman filter."""
+    model = SARIMAX(series.to_numpy(dtype=float),
+                    order=tuple(sarima_spec['order']),
+                    seasonal_order=tuple(sarima_spec['seasonal_order']),
+                    enforce_stationarity=sarima_spec['enforce_stationarity'],
+                    enforce_invertibility=sarima_spec['enforce_invertibility'])
+    return model.fit(disp=False).forecast(steps)
+
+
+def seasonal_regression(series, steps):
+    """Linear trend plus calendar-month indices, solved by least squares."""
+    return _trend_month_fit(series, steps)[len(series):]
+
+
+zoo_models = {
+    'seasonal_naive': seasonal_naive,
+    'holt_winters': holt_winters,
+    'theta': theta,
+    'sarima': sarima,
+    'seasonal_regression': seasonal_regression
+}
+
+# Rolling-origin backtest settings; part of every cache key
+backtest_spec = {'horizon': 12, 'min_train': 24, 'step': 2}
+
+# A backtest RMSE above this multiple of the series' peak means the fit diverged
+max_error_ratio = 10
+
+
+def backtest(series, model, horizon=12, min_train=24, step=2):
+    """
+    Forecast errors (folds x horizon) from rolling origins that leave `horizon`
+    months to score.
+
+    series is on the full monthly calendar with NaN for excluded months.
+    Origins need min_train observed months and must not fall inside a gap;
+    errors on excluded months are NaN.
+    """
+    values = series.to_numpy(dtype=float)
+    observed = np.cumsum(~np.isnan(values))
+    errors = []
+    for origin in range(len(series) - horizon, 0, -step):
+        if observed[origin - 1] < min_train:
+            break
+        if np.isnan(values[origin - 1]):
+            continue
+        forecast = zoo_models[model](series.iloc[:origin], horizon)
+        errors.append(values[origin:origin + horizon] - forecast)
+    return np.array(errors[::-1])
+
+
+def _score(series, model, spec, steps):
+    # One (series, model) task: backtest, then refit on the full series.
+    # Gaps (e.g. the excluded COVID months) stay gaps on the calendar rather
+    # than splicing the months either side together.
+    warnings.filterwarnings('ignore')
+    series = series.asfreq('MS')
+    try:
+        errors = backtest(series, model, **spec)
+        if not errors.size:
+            raise ValueError("too few observed months to backtest")
+        forecast = zoo_models[model](series, steps)
+        rmse = np.sqrt(np.nanmean(errors ** 2))
+        rmse_by_step = np.sqrt(np.nanmean(errors ** 2, axis=0))
+        if not np.all(np.isfinite(forecast)) or not np.all(np.isfinite(rmse_by_step)):
+            raise ValueError("non-finite forecast")
+        peak = np.nanmax(np.abs(series.to_numpy(dtype=float)))
+        if rmse > max_error_ratio * peak:
+            raise ValueError(f"diverged: backtest RMSE {rmse:.3g} against a series peak of {peak:.3g}")
+        return {'model': model,
+                'rmse': float(rmse),
+                'mae': float(np.nanmean(np.abs(errors))),
+                'rmse_by_step': rmse_by_step.tolist(),
+                'forecast': np.asarray(forecast, dtype=float).tolist(),
+                'error': None}
+    except Exception as e:
+        return {'model': model, 'rmse': float('inf'), 'mae': float('inf'),
+                'rmse_by_step': None, 'forecast': None, 'error': str(e)}
+
+
+def _evaluate(handle, name, model, spec, steps):
+    # Pool task: the series is read from shared memory
+    return _score(attached(handle).to_series(name), model, spec, steps)
+
+
+def _load_cached(path):
+    # A missing, half-written or corrupt cache file is a cache miss
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ModelZoo:
+    """
+    Fit every zoo model to every series and keep the best by backtest RMSE.
+
+    (series, model) tasks run concurrently in a process pool. Each result is
+    cached under cache_dir as JSON keyed by the series' content hash, the
+    model and the backtest settings, so only new or changed series are refit.
+    Prediction intervals come from each model's backtest RMSE at each step.
+    workers=1 fits in-process, without a pool, for callers that cannot be
+    safely re-imported by spawned workers (scripts without a __main__ guard).
+    """
+
+    def __init__(self, cache_dir=os.path.join('forecast_models', 'zoo'), models=None, spec=None):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.models = models or list(zoo_models)
+        self.spec = spec or backtest_spec
+        self.last_run = {'cached': 0, 'fitted': 0}
+
+    def _path(self, series, model, steps):
+        # 'gaps' keeps results from when gaps were spliced out of the cache
+        key = spec_hash({'series': series_hash(series), 'model': model, 'steps': steps,
+                         'gaps': 'calendar', **self.spec})
+        return os.path.join(self.cache_dir, f'{model}_{key[:20]}.json')
+
+    def evaluate(self, series_by_name, start='2024-01-01', workers=None):
+        """
+        Backtest scores for every series and model, and each series' forecast
+        from the selected model, for `horizon` months beginning at `start`.
+        """
+        start = pd.Timestamp(start)
+        horizon = self.spec['horizon']
+        results, pending = {}, []
+        for name, series in series_by_name.items():
+            steps = months_between(series.index[-1], start) - 1 + horizon
+            for model in self.models:
+                path = self._path(series, model, steps)
+                cached = _load_cached(path)
+                if cached is not None:
+                    results[name, model] = cached
+                else:
+                    pending.append((name, model, series, steps, path))
+        self.last_run = {'cached': len(results), 'fitted': len(pending)}
+
+        if pending and workers == 1:
+            for name, model, series, steps, _ in pending:
+                results[name, model] = _score(series, model, self.spec, steps)
+        elif pending:
+            # Each series is published once; tasks carry only its name
+            to_fit = dict.fromkeys(name for name, *_ in pending)
+            with publish_series({name: series_by_name[name] for name in to_fit}) as dataset, \
+                    ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_evaluate, dataset.handle, name, model, self.spec, steps)
+                           for name, model, _, steps, _ in pending]
+                for (name, model, *_), future in zip(pending, futures):
+                    results[name, model] = future.result()
+        for name, model, _, _, path in pending:
+            if results[name, model]['error'] is None:
+                # Concurrent runs (the zoo stage and forecasting's fallback) share this cache
+                write_atomic(path, lambda f: json.dump(results[name, model], f))
+
+        scores = pd.DataFrame([{'Series': name, 'Model': model, 'RMSE': r['rmse'], 'MAE': r['mae'],
+                                'Error': r['error']} for (name, model), r in results.items()])
+        scores['Selected'] = scores.index.isin(scores.groupby('Series')['RMSE'].idxmin())
+
+        forecasts = {}
+        for row in scores[scores['Selected']].itertuples():
+            result = results[row.Series, row.Model]
+            if result['error'] is None:
+                forecasts[row.Series] = self._forecast_frame(result, start, horizon)
+        return scores, forecasts
+
+    def _forecast_frame(self, result, start, horizon, level=95):
+        mean = np.array(result['forecast'][-horizon:])
+        rmse = np.array(result['rmse_by_step'])
+        half_width = norm.ppf(0.5 + level / 200) * rmse[np.minimum(np.arange(horizon), len(rmse) - 1)]
+        return pd.DataFrame({
+            'Date': pd.date_range(start=start, periods=horizon, freq='MS'),
+            'Forecasted_Permits': mean,
+            f'Lower_{level}': np.clip(mean - half_width, 0, None),
+            f'Upper_{level}': mean + half_width,
+            'Model': result['model']
+        })
+
+    def best_forecast(self, series, start='2024-01-01', workers=None):
+        """Forecast frame from the best-scoring model for a single series."""
+        scores, forecasts = self.evaluate({'series': series}, start, workers)
+        if 'series' not in forecasts:
+            raise RuntimeError("No zoo model produced a forecast")
+        return forecasts['series']
+
+
+if __name__ == '__main__':
+    from pricing_model import segments
+    from forecast_optimization import training_series, forecast_start
+
+    print("="*70)
+    print("FORECAST MODEL ZOO")
+    print("="*70)
+
+    df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
+    train = df.loc[training_series(df).index]
+    series_by_name = {column: train[column].astype(float) for column in ['Total_Permits'] + segments}
+    print(f"\n✓ {len(series_by_name)} series x {len(zoo_models)} models, "
+          f"rolling backtest {backtest_spec['horizon']}-month horizon")
+
+    zoo = ModelZoo()
+    start = time.perf_counter()
+    scores, forecasts = zoo.evaluate(series_by_name, start=forecast_start, workers=os.cpu_count())
+    elapsed = time.perf_counter() - start
+    print(f"✓ {zoo.last_run['fitted']} fitted, {zoo.last_run['cached']} from cache in {elapsed:.1f}s")
+
+    print("\nBacktest RMSE (permits/month):")
+    print(scores.pivot(index='Series', columns='Model', values='RMSE').round(1).to_string())
+    failed = scores[scores['Error'].notna()]
+    for row in failed.itertuples():
+        print(f"  ✗ {row.Series} / {row.Model}: {row.Error}")
+
+    print("\nSelected models:")
+    for name, forecast_df in forecasts.items():
+        print(f"  {name:22s}: {forecast_df['Model'].iloc[0]:20s} "
+              f"{forecast_df['Forecasted_Permits'].sum():,.0f} permits over {len(forecast_df)} months")
+
+    scores.to_csv('model_zoo_scores.csv', index=False)
+    pd.concat(forecasts, names=['Series']).reset_index(level=0).to_csv(
+        f'model_zoo_forecast_{forecast_start.year}.csv', index=False)
+    print("\n✓ Saved: model_zoo_scores.csv")
+    print(f"✓ Saved: model_zoo_forecast_{forecast_start.year}.csv")
+
+    print("\n" + "="*70)
+    print("MODEL ZOO COMPLETE")
+    print("="*70)
@@ -0,0 +1,187 @@
+"""
+Month-Level Price Schedules
+Per-segment, per-month (or custom season) pricing and schedule optimization
+"""
+
+import calendar
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+from pricing_model import (segments, current_prices, elasticities, peak_months,
+                           segment_vector, demand_response)
+
+
+def two_season_labels(months_peak=None):
+    """Season label for each calendar month under the Peak/Off-Peak split."""
+    months_peak = peak_months if months_peak is None else months_peak
+    return ['Peak' if month in months_peak else 'Off-Peak' for month in range(1, 13)]
+
+
+def monthly_labels():
+    """One season per calendar month (the fully month-level schedule)."""
+    return [calendar.month_abbr[month] for month in range(1, 13)]
+
+
+def grouping_matrix(season_of_month, seasons=None):
+    """12 x K indicator matrix mapping calendar months to seasons."""
+    seasons = seasons or list(dict.fromkeys(season_of_month))
+    G = np.array([[label == season for season in seasons] for label in season_of_month], dtype=float)
+    return G, seasons
+
+
+def season_schedule(season_multipliers, season_of_month, prices=None):
+    """
+    Build a 12 x segment price schedule from per-season multipliers.
+
+    season_multipliers: {season: {segment: multiplier}}
+    season_of_month:    12 season labels, January first
+    """
+    G, seasons = grouping_matrix(season_of_month, list(season_multipliers))
+    multipliers = np.array([segment_vector(season_multipliers[season]) for season in seasons])
+    return G @ multipliers * segment_vector(prices or current_prices)
+
+
+def scenario_schedule(scenario, months_peak=None, prices=None):
+    """12 x segment schedule for a Peak/Off-Peak scenario from the config."""
+    return season_schedule({'Peak': scenario['peak_multiplier'], 'Off-Peak': scenario['offpeak_multiplier']},
+                           two_season_labels(months_peak), prices)
+
+
+def schedule_revenue(base_demand, schedule, months=None, ref_prices=None, segment_elasticities=None):
+    """
+    Revenue and adjusted demand for a 12 x segment schedule.
+
+    base_demand is (..., n, segments); months gives the calendar month (1-12)
+    of each of the n rows and defaults to n == 12 in calendar order.
+    """
+    prices = schedule if months is None else schedule[np.asarray(months) - 1]
+    demand = demand_response(base_demand, prices, ref_prices, segment_elasticities)
+    return (demand * prices).sum(axis=(-2, -1)), demand
+
+
+class ScheduleOptimizer:
+    """
+    Revenue-maximizing price multipliers for an arbitrary season grouping.
+
+    Under the linear elasticity model revenue is a separable concave quadratic
+    in the multipliers and monthly demand is linear in them, so the objective,
+    its gradient and the capacity Jacobian are all available analytically.
+    The box-constrained optimum is closed-form, (e - 1) / 2e clipped to the
+    bounds; only when that violates monthly capacity is the resulting small
+    QP handed to SLSQP, warm-started from the closed-form point.
+    """
+
+    def __init__(self, base_demand, season_of_month=None, bounds=(0.7, 1.5), capacity=None,
+                 ref_prices=None, segment_elasticities=None):
+        self.base = np.asarray(base_demand, dtype=float)
+        self.season_of_month = season_of_month or monthly_labels()
+        self.G, self.seasons = grouping_matrix(self.season_of_month)
+        self.ref = segment_vector(ref_prices or current_prices)
+        self.elast = segment_vector(segment_elasticities or elasticities)
+        self.capacity = None if capacity is None else np.asarray(capacity, dtype=float)
+        self.shape = (len(self.seasons), len(segments))
+
+        # Bounds may be a (low, high) pair or {segment: (low, high)}; demand must stay non-negative
+        if isinstance(bounds, dict):
+            pairs = [bounds.get(segment, (0.7, 1.5)) for segment in segments]
+        else:
+            pairs = [bounds] * len(segments)
+        zero_demand = 1 - 1 / self.elast
+        self.bounds = [(pairs[s][0], min(pairs[s][1], zero_demand[s]))
+                       for _ in self.seasons for s in range(len(segments))]
+
+    def schedule(self, x):
+        """12 x segment prices for a flattened multiplier vector."""
+        return self.G @ x.reshape(self.shape) * self.ref
+
+    def revenue(self, x):
+        m = self.G @ x.reshape(self.shape)
+        return np.sum(self.base * self.ref * m * (1 + self.elast * (m - 1)))
+
+    def gradient(self, x):
+        m = self.G @ x.reshape(self.shape)
+        grad_month = self.base * self.ref * (1 + self.elast * (2 * m - 1))
+        return (self.G.T @ grad_month).ravel()
+
+    def _capacity_constraint(self):
+        # capacity - sum_s base * (1 + e (m - 1)) >= 0, linear in the multipliers
+        slope = self.base * self.elast
+        offset = (self.base * (1 - self.elast)).sum(axis=1)
+        jac = -np.einsum('mk,ms->mks', self.G, slope).reshape(12, -1)
+        return {
+            'type': 'ineq',
+            'fun': lambda x: (self.capacity - offset - (slope * (self.G @ x.reshape(self.shape))).sum(axis=1)) / self.capacity,
+            'jac': lambda x: jac / self.capacity[:, None]
+        }
+
+    def box_optimum(self):
+        """Closed-form optimum ignoring capacity (revenue is separable per multiplier)."""
+        low = np.array([b[0] for b in self.bounds])
+        high = np.array([b[1] for b in self.bounds])
+        unconstrained = np.tile((self.elast - 1) / (2 * self.elast), len(self.seasons))
+        return np.clip(unconstrained, low, high)
+
+    def optimize(self):
+        x = self.box_optimum()
+        iterations = 0
+        constraint = None if self.capacity is None else self._capacity_constraint()
+
+        if constraint is not None and np.any(constraint['fun'](x) < -1e-9):
+            # Scale to revenue at the starting point so tolerances are meaningful
+            scale = abs(self.revenue(x)) or 1.0
+            res = minimize(lambda x: -self.revenue(x) / scale, x,
+                           jac=lambda x: -self.gradient(x) / scale,
+                           bounds=self.bounds, method='SLSQP', constraints=[constraint],
+                           options={'maxiter': 500, 'ftol': 1e-12})
+            if not res.success:
+                raise ValueError(f"Schedule optimization failed: {res.message}")
+            x, iterations = res.x, res.nit
+
+        return {
+            'multipliers': pd.DataFrame(x.reshape(self.shape), index=self.seasons, columns=segments),
+            'schedule': self.schedule(x),
+            'revenue': self.revenue(x),
+            'iterations': iterations
+        }
+
+
+if __name__ == '__main__':
+    from capacity_allocation import monthly_capacity
+    from config import scenario_by_name
+    from pricing_model import config
+
+    print("="*70)
+    print("MONTH-LEVEL PRICE SCHEDULE OPTIMIZATION")
+    print("="*70)
+
+    df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
+    base_demand = df[df['Year'] == 2023].sort_values('Month')[segments].to_numpy(dtype=float)
+    capacity = monthly_capacity().sum(axis=0)
+
+    # Stress case: demand grown 40% so peak months press against the quota
+    base_demand = base_demand * 1.4
+
+    # Equity: East African prices may be discounted but never raised
+    bounds = {segment: (0.7, 1.5) for segment in segments}
+    bounds['East_African'] = (0.6, 1.0)
+
+    recommended = scenario_by_name(config, config['recommended_scenario'])
+    moderate_revenue, _ = schedule_revenue(base_demand, scenario_schedule(recommended))
+    print(f"\n✓ {recommended['name']} (two-season) revenue on stressed 2023 demand: ${moderate_revenue:,.0f}")
+
+    for label, season_of_month in [('Two-season', two_season_labels()), ('Month-level', monthly_labels())]:
+        optimizer = ScheduleOptimizer(base_demand, season_of_month, bounds=bounds, capacity=capacity)
+        start = time.perf_counter()
+        result = optimizer.optimize()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"\n[{label}] {len(optimizer.bounds)} prices, optimized in {elapsed_ms:.1f} ms "
+              f"({result['iterations']} SLSQP iterations)")
+        print(f"  Revenue: ${result['revenue']:,.0f} ({(result['revenue'] / moderate_revenue - 1) * 100:+.1f}% vs moderate)")
+        print(result['multipliers'].round(3).to_string())
+
+    schedule_df = pd.DataFrame(result['schedule'], index=monthly_labels(), columns=segments)
+    schedule_df.to_csv('monthly_price_schedule.csv', index_label='Month')
+    print("\n✓ Saved: monthly_price_schedule.csv")
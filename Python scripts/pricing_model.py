@@ -0,0 +1,122 @@
+"""
+Shared Pricing Model
+Vectorized demand response and price arrays for gorilla permit analysis
+"""
+
+import numpy as np
+
+from config import load_config
+from ingestion import load_canonical, canonical_dir as default_canonical_dir
+
+config = load_config()
+
+segments = config['segments']
+current_prices = config['current_prices']
+elasticities = config['elasticities']
+segment_shares = config['segment_shares']
+peak_months = config['peak_months']
+
+# Share of Bwindi visitors assumed to hold a gorilla permit
+gorilla_share = config['gorilla_share']
+
+# Demand retained during COVID (2020 from March, and all of 2021)
+covid_factors = config['covid_factors']
+
+# Monthly-workbook column the seasonality index is built from; the last 'Total'
+# column of the sheet, as the original positional cleaning picked it
+seasonality_column = 'Departures_Total'
+
+month_order = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+
+def segment_vector(values, segment_names=None):
+    """Return a per-segment dict as a float array in segment order; arrays pass through."""
+    if not isinstance(values, dict):
+        return np.asarray(values, dtype=float)
+    segment_names = segment_names or segments
+    return np.array([values[segment] for segment in segment_names], dtype=float)
+
+
+def season_price_matrix(peak_multiplier, offpeak_multiplier, prices=None, months_peak=None):
+    """Build a 12 x segment price matrix from peak/off-peak multipliers."""
+    prices = prices or current_prices
+    months_peak = peak_months if months_peak is None else months_peak
+    base = segment_vector(prices)
+    is_peak = np.isin(np.arange(1, 13), months_peak)[:, None]
+    return np.where(is_peak,
+                    base * segment_vector(peak_multiplier),
+                    base * segment_vector(offpeak_multiplier))
+
+
+def demand_response(base_demand, prices, ref_prices=None, segment_elasticities=None):
+    """
+    Apply the analysis' linear elasticity response to baseline demand.
+
+    Segments run along the last axis, so any leading axes (parks, months,
+    candidates) broadcast. Demand is clipped at zero as in the scenario model.
+    """
+    ref = segment_vector(current_prices if ref_prices is None else ref_prices)
+    elast = segment_vector(elasticities if segment_elasticities is None else segment_elasticities)
+    demand_change_pct = (np.asarray(prices, dtype=float) / ref - 1) * elast
+    return np.clip(np.asarray(base_demand, dtype=float) * (1 + demand_change_pct), 0, None)
+
+
+def load_raw_inputs(canonical_dir=None):
+    """
+    Load Bwindi annual visitors and the monthly seasonality index from the
+    canonical dataset. Nothing is ingested or written here; the dataset is
+    built by gorilla_pricing_analysis.py (or ingestion.py). Seasonality comes
+    from the latest year of monthly data.
+    """
+    canonical_dir = canonical_dir or default_canonical_dir
+    return (annual_visitors(load_canonical('park_visitors', canonical_dir)),
+            seasonality_index(load_canonical('monthly_arrivals', canonical_dir)))
+
+
+def annual_visitors(park_visitors, park='Bwindi'):
+    """{year: visitors} for the first park whose name contains `park`."""
+    rows = park_visitors[park_visitors['Park'].str.contains(park, case=False, na=False)]
+    rows = rows[rows['Park'] == rows['Park'].iloc[0]].sort_values('Year')
+    return {int(year): float(visitors) for year, visitors in zip(rows['Year'], rows['Visitors'])}
+
+
+def seasonality_index(monthly_arrivals, year=None):
+    """Each month's total relative to the year's mean (12 values, January first)."""
+    year = monthly_arrivals['Year'].max() if year is None else year
+    totals = monthly_arrivals[monthly_arrivals['Year'] == year].sort_values('Month')[seasonality_column]
+    return (totals / totals.mean()).to_numpy(dtype=float)
+
+
+def monthly_permit_series(annual_visitors, seasonality, share=gorilla_share,
+                          covid_2020=covid_factors[2020], covid_2021=covid_factors[2021], noise=None):
+    """
+    Vectorized monthly permit series (Section 5 of gorilla_pricing_analysis.py).
+
+    share, covid_2020 and covid_2021 may be scalars or arrays over a leading
+    sample axis; noise, if given, must broadcast to (..., n_months). Returns
+    an integer array of shape (..., 12 * n_years) with calendar months in order.
+    """
+    years = np.array(sorted(annual_visitors))
+    visitors = np.array([annual_visitors[year] for year in years], dtype=float)
+    year_of_month = np.repeat(years, 12)
+    month_of_year = np.tile(np.arange(1, 13), len(years))
+
+    share = np.asarray(share, dtype=float)[..., None]
+    annual_permits = np.floor(visitors * share)
+    monthly = np.repeat(annual_permits, 12, axis=-1) / 12 * np.asarray(seasonality)[month_of_year - 1]
+
+    covid_2020 = np.asarray(covid_2020, dtype=float)[..., None]
+    covid_2021 = np.asarray(covid_2021, dtype=float)[..., None]
+    monthly = np.where((year_of_month == 2020) & (month_of_year >= 3), monthly * covid_2020, monthly)
+    monthly = np.where(year_of_month == 2021, monthly * covid_2021, monthly)
+
+    if noise is not None:
+        monthly = monthly * noise
+    return np.floor(monthly).astype(np.int64)
+
+
+def split_segments(total_permits, shares=None):
+    """Split monthly totals into integer segment permits along a new last axis."""
+    shares = segment_vector(segment_shares if shares is None else shares)
+    return np.floor(np.asarray(total_permits)[..., None] * shares[..., None, :]).astype(np.int64)
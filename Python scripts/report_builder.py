@@ -0,0 +1,367 @@
+"""
+Structured Report Builder
+Renders Word and Markdown reports from stage results, including per-park reports in parallel
+
+Usage: python report_builder.py [output_dir]
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Stage results written by the analysis scripts, in report order
+stage_reports = ['eda_summary', 'elasticity_results', 'optimization_results']
+
+
+def _plain(value):
+    # numpy / pandas scalars to JSON types
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating,)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+class Report:
+    """
+    A report as a title and sections of typed blocks.
+
+    Blocks are paragraphs, bullet lists, key-value metrics and tables. Table
+    cells keep their raw values plus a format per column, so every renderer
+    can draw a real table. facts holds the machine-readable figures behind
+    the text, for reports assembled from other reports. The whole report
+    round-trips through JSON.
+    """
+
+    def __init__(self, title, subtitle=None, facts=None):
+        self.title = title
+        self.subtitle = subtitle
+        self.facts = facts or {}
+        self.sections = []
+
+    def section(self, heading):
+        self.sections.append({'heading': heading, 'blocks': []})
+        return self
+
+    def _add(self, block):
+        if not self.sections:
+            self.section('')
+        self.sections[-1]['blocks'].append(block)
+        return self
+
+    def paragraph(self, text):
+        return self._add({'type': 'paragraph', 'text': text})
+
+    def bullets(self, items):
+        return self._add({'type': 'bullets', 'items': list(items)})
+
+    def metrics(self, items):
+        """Label -> already formatted value."""
+        return self._add({'type': 'metrics', 'items': [[label, str(value)] for label, value in items.items()]})
+
+    def table(self, frame, formats=None, index=False):
+        """
+        A DataFrame as a table. formats maps a column to a format string
+        such as '${:,.0f}'; index=True keeps the index as the first column.
+        """
+        if index:
+            frame = frame.reset_index()
+        columns = [str(column) for column in frame.columns]
+        formats = {str(column): fmt for column, fmt in (formats or {}).items()}
+        rows = [_plain(list(row)) for row in frame.itertuples(index=False)]
+        return self._add({'type': 'table', 'columns': columns, 'rows': rows, 'formats': formats})
+
+    def to_dict(self):
+        return {'title': self.title, 'subtitle': self.subtitle, 'facts': _plain(self.facts), 'sections': self.sections}
+
+    @classmethod
+    def from_dict(cls, data):
+        report = cls(data['title'], data.get('subtitle'), data.get('facts'))
+        report.sections = data['sections']
+        return report
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def format_cell(value, fmt=None):
+    if value is None:
+        return ''
+    if fmt:
+        return fmt.format(value)
+    if isinstance(value, float):
+        return f'{value:,.2f}'
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f'{value:,}'
+    return str(value)
+
+
+def _cells(block):
+    # Years print without a thousands separator unless a format says otherwise
+    formats = [block['formats'].get(column, '{}' if column == 'Year' else None) for column in block['columns']]
+    return [[format_cell(value, fmt) for value, fmt in zip(row, formats)] for row in block['rows']]
+
+
+def _label(column):
+    return column.replace('_', ' ')
+
+
+def render_text(report, width=70):
+    """Plain-text rendering in the layout of the original .txt reports."""
+    lines = ['=' * width, report.title.upper()]
+    if report.subtitle:
+        lines.append(report.subtitle)
+    lines += ['=' * width, '']
+    for section in report.sections:
+        if section['heading']:
+            lines += [section['heading'].upper(), '-' * width]
+        for block in section['blocks']:
+            if block['type'] == 'paragraph':
+                lines.append(block['text'])
+            elif block['type'] == 'bullets':
+                lines += [f'• {item}' for item in block['items']]
+            elif block['type'] == 'metrics':
+                pad = max(len(label) for label, _ in block['items']) + 1
+                lines += [f'{label + ":":{pad}s} {value}' for label, value in block['items']]
+            elif block['type'] == 'table':
+                lines.append(pd.DataFrame(_cells(block), columns=block['columns']).to_string(index=False))
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+def render_markdown(report):
+    """GitHub-flavoured Markdown with pipe tables."""
+    lines = [f'# {report.title}']
+    if report.subtitle:
+        lines += ['', f'*{report.subtitle}*']
+    for section in report.sections:
+        if section['heading']:
+            lines += ['', f"## {section['heading']}"]
+        for block in section['blocks']:
+            lines.append('')
+            if block['type'] == 'paragraph':
+                lines.append(block['text'])
+            elif block['type'] == 'bullets':
+                lines += [f'- {item}' for item in block['items']]
+            elif block['type'] == 'metrics':
+                lines += [f'- **{label}:** {value}' for label, value in block['items']]
+            elif block['type'] == 'table':
+                numeric = [all(isinstance(row[j], (int, float)) for row in block['rows'] if row[j] is not None)
+                           for j in range(len(block['columns']))]
+                lines.append('| ' + ' | '.join(_label(c) for c in block['columns']) + ' |')
+                lines.append('|' + '|'.join('---:' if n else '---' for n in numeric) + '|')
+                lines += ['| ' + ' | '.join(cells) + ' |' for cells in _cells(block)]
+    return '\n'.join(lines) + '\n'
+
+
+def render_docx(report, path):
+    """Word document with headings, bullet lists and real tables."""
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Pt
+
+    doc = Document()
+    font = doc.styles['Normal'].font
+    font.name = 'Calibri'
+    font.size = Pt(11)
+
+    title = doc.add_heading(report.title, level=0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    if report.subtitle:
+        subtitle = doc.add_paragraph(report.subtitle)
+        subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    for section in report.sections:
+        if section['heading']:
+            doc.add_heading(section['heading'], level=1)
+        for block in section['blocks']:
+            if block['type'] == 'paragraph':
+                doc.add_paragraph(block['text'])
+            elif block['type'] == 'bullets':
+                for item in block['items']:
+                    doc.add_paragraph(item, style='List Bullet')
+            elif block['type'] == 'metrics':
+                for label, value in block['items']:
+                    para = doc.add_paragraph()
+                    para.add_run(f'{label}: ').bold = True
+                    para.add_run(value)
+            elif block['type'] == 'table':
+                cells = _cells(block)
+                table = doc.add_table(rows=len(cells) + 1, cols=len(block['columns']), style='Light Grid Accent 1')
+                for j, column in enumerate(block['columns']):
+                    table.cell(0, j).text = _label(column)
+                for i, row in enumerate(cells, 1):
+                    for j, text in enumerate(row):
+                        table.cell(i, j).text = text
+                        if isinstance(block['rows'][i - 1][j], (int, float)):
+                            table.cell(i, j).paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+                doc.add_paragraph()
+    doc.save(path)
+
+
+def write_report(report, output_dir, name, formats=('docx', 'md')):
+    """Render a report as <output_dir>/<name>.<format> for each format; returns the paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f'{name}.{fmt}')
+        if fmt == 'docx':
+            render_docx(report, path)
+        else:
+            text = render_markdown(report) if fmt == 'md' else render_text(report)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        paths.append(path)
+    return paths
+
+
+def executive_summary(eda, elasticity, optimization):
+    """Executive summary assembled from the facts of the three stage reports."""
+    e, s, o = eda.facts, elasticity.facts, optimization.facts
+    report = Report('Executive Summary', 'Gorilla Trekking Permit Pricing Optimization Analysis', facts={})
+
+    report.section('Data')
+    report.metrics({
+        'Analysis period': f"{e['months']} months ({e['start']} to {e['end']})",
+        'Estimated gorilla permits': f"{e['total_permits']:,}",
+        'Peak / off-peak demand': f"{e['peak_mean']:,.0f} vs {e['offpeak_mean']:,.0f} permits/month "
+                                  f"({e['peak_offpeak_ratio']:.2f}x)"
+    })
+    report.table(pd.DataFrame(list(e['annual_permits'].items()), columns=['Year', 'Permits']))
+
+    report.section('Demand')
+    report.metrics({
+        'Forecast (next 12 months)': f"{s['forecast_total']:,.0f} permits ({s['forecast_model']})",
+        'Cross-country price elasticity': f"{s['overall_elasticity']:.2f} (R² {s['r_squared']:.2f})"
+    })
+    report.table(pd.DataFrame([{'Segment': segment.replace('_', ' '), 'Elasticity': value}
+                               for segment, value in s['segment_elasticities'].items()]),
+                 formats={'Elasticity': '{:.2f}'})
+
+    report.section(f"Recommendation: {o['recommended']}")
+    report.metrics({
+        'Current annual revenue': f"${o['baseline_annual_revenue']:,.0f}",
+        'Recommended annual revenue': f"${o['recommended_annual_revenue']:,.0f}",
+        'Revenue increase': f"${o['revenue_increase']:,.0f} (+{o['revenue_increase_pct']:.1f}%)",
+        'Conservation funding increase': f"${o['conservation_increase']:,.0f} "
+                                         f"({o['conservation_share']:.0%} allocation)"
+    })
+    report.table(pd.DataFrame(o['prices']), formats={'Current_Price': '${:,.0f}', 'Peak_Price': '${:,.0f}',
+                                                     'OffPeak_Price': '${:,.0f}', 'Peak_Change': '{:+.0f}%',
+                                                     'OffPeak_Change': '{:+.0f}%'})
+    return report
+
+
+def park_report(park, visitors, total_by_year, daily_permits=None):
+    """One park's visitor history from the canonical park_visitors table."""
+    history = visitors.sort_values('Year')
+    years = history['Year'].to_numpy()
+    counts = history['Visitors'].to_numpy(dtype=float)
+    share = counts / total_by_year.reindex(years).to_numpy(dtype=float) * 100
+    change = np.concatenate([[np.nan], np.divide(np.diff(counts), counts[:-1], out=np.full(len(counts) - 1, np.nan),
+                                                 where=counts[:-1] > 0) * 100])
+
+    latest, peak = years[-1], years[np.argmax(counts)]
+    report = Report(park, f'Visitor report, {years[0]}-{latest}', facts={
+        'park': park, 'latest_year': int(latest), 'latest_visitors': float(counts[-1]),
+        'peak_year': int(peak), 'peak_visitors': float(counts.max())
+    })
+    report.section('Summary')
+    summary = {
+        f'Visitors in {latest}': f'{counts[-1]:,.0f}',
+        f'Share of all park visitors in {latest}': f'{share[-1]:.2f}%',
+        'Best year': f'{peak} ({counts.max():,.0f} visitors)'
+    }
+    if len(counts) > 1 and counts[0] > 0:
+        summary[f'Change since {years[0]}'] = f'{(counts[-1] / counts[0] - 1) * 100:+.1f}%'
+    if daily_permits:
+        summary['Gorilla permits per day'] = f'{daily_permits}'
+        summary['Annual permit capacity'] = f'{daily_permits * 365:,}'
+    report.metrics(summary)
+
+    report.section('Annual Visitors')
+    report.table(pd.DataFrame({'Year': years, 'Visitors': counts, 'Change_%': change, 'Share_of_Parks_%': share}),
+                 formats={'Visitors': '{:,.0f}', 'Change_%': '{:+.1f}%', 'Share_of_Parks_%': '{:.2f}%'})
+    return report
+
+
+def _slug(name):
+    return ''.join(c if c.isalnum() else '_' for c in name).strip('_')
+
+
+def _render_park(args):
+    # Worker task: build and render one park's report
+    park, visitors, total_by_year, daily_permits, output_dir = args
+    report = park_report(park, visitors, total_by_year, daily_permits)
+    return write_report(report, output_dir, _slug(park))
+
+
+def render_park_reports(park_visitors, output_dir, daily_permits=None, workers=None):
+    """Render one report per park across a process pool; returns the paths written."""
+    daily_permits = daily_permits or {}
+    total_by_year = park_visitors.groupby('Year')['Visitors'].sum()
+    tasks = []
+    for park, visitors in park_visitors.groupby('Park', sort=True):
+        permits = next((count for name, count in daily_permits.items() if name.lower() in park.lower()), None)
+        tasks.append((park, visitors[['Year', 'Visitors']], total_by_year, permits, output_dir))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [path for paths in pool.map(_render_park, tasks) for path in paths]
+
+
+if __name__ == '__main__':
+    from ingestion import DataIngestor
+    from capacity_allocation import park_daily_permits
+
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else 'reports'
+
+    print("="*70)
+    print("STRUCTURED REPORT GENERATION")
+    print("="*70)
+
+    # Stage reports: rendered straight from the JSON each stage saved
+    reports = {}
+    for name in stage_reports:
+        path = f'{name}.json'
+        if not os.path.exists(path):
+            print(f"✗ {path} not found - run the stage that writes it first")
+            continue
+        reports[name] = Report.load(path)
+        write_report(reports[name], output_dir, name)
+        print(f"✓ {name}: {len(reports[name].sections)} sections -> .docx, .md")
+
+    if len(reports) == len(stage_reports):
+        summary = executive_summary(*(reports[name] for name in stage_reports))
+        write_report(summary, output_dir, 'EXECUTIVE_SUMMARY')
+        print("✓ EXECUTIVE_SUMMARY: assembled from stage facts -> .docx, .md")
+
+    # Per-park reports in parallel
+    park_visitors = DataIngestor().load('park_visitors')
+    park_dir = os.path.join(output_dir, 'parks')
+    start = time.perf_counter()
+    paths = render_park_reports(park_visitors, park_dir, park_daily_permits, workers=os.cpu_count())
+    elapsed = time.perf_counter() - start
+    print(f"\n✓ {park_visitors['Park'].nunique()} park reports ({len(paths)} documents) in {elapsed:.2f}s")
+    print(f"✓ Saved: {output_dir}/ and {park_dir}/")
+
+    print("\n" + "="*70)
+    print("REPORT GENERATION COMPLETE")
+    print("="*70)
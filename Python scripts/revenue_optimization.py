@@ -6,9 +6,14 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+from price_schedule import scenario_schedule
+from report_builder import Report, render_text
+from config import load_config
 import warnings
 warnings.filterwarnings('ignore')
 
+config = load_config()
+
 print("="*70)
 print("PART 3: REVENUE OPTIMIZATION & SCENARIO ANALYSIS")
 print("="*70)
@@ -16,23 +21,11 @@ print("="*70)
 # Load data
 df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
 
-# Current prices (USD)
-current_prices = {
-    'Foreign_NonResident': 800,
-    'Foreign_Resident': 700,
-    'Rest_of_Africa': 500,
-    'East_African': 100
-}
-
-# Segment elasticities
-elasticities = {
-    'Foreign_NonResident': -0.3,
-    'Foreign_Resident': -0.6,
-    'Rest_of_Africa': -1.2,
-    'East_African': -1.8
-}
+# Current prices (USD) and segment elasticities
+current_prices = config['current_prices']
+elasticities = config['elasticities']
 
-segments = list(current_prices.keys())
+segments = config['segments']
 
 # ============================================================================
 # 3.1 BASELINE REVENUE CALCULATION
@@ -57,51 +50,13 @@ print(f"✓ Current Average Annual Revenue: ${baseline_revenue_annual:,.0f}")
 print("\n[3.2] DEVELOPING OPTIMIZED PRICING SCENARIOS...")
 
 # Define peak and off-peak months
-peak_months = [6, 7, 8, 9, 12, 1, 2]
+peak_months = config['peak_months']
 df['Season_Type'] = df['Month'].apply(lambda x: 'Peak' if x in peak_months else 'Off-Peak')
 
-# SCENARIO 1: Current Pricing (Baseline)
-scenario1 = {
-    'name': 'Current Pricing',
-    'peak_multiplier': {seg: 1.0 for seg in segments},
-    'offpeak_multiplier': {seg: 1.0 for seg in segments}
-}
-
-# SCENARIO 2: Moderate Dynamic Pricing
-scenario2 = {
-    'name': 'Moderate Dynamic Pricing',
-    'peak_multiplier': {
-        'Foreign_NonResident': 1.30,  # +30% in peak
-        'Foreign_Resident': 1.20,      # +20%
-        'Rest_of_Africa': 1.10,        # +10%
-        'East_African': 1.0            # No change (equity)
-    },
-    'offpeak_multiplier': {
-        'Foreign_NonResident': 0.85,   # -15% discount
-        'Foreign_Resident': 0.80,      # -20%
-        'Rest_of_Africa': 0.75,        # -25%
-        'East_African': 0.70           # -30% (stimulate demand)
-    }
-}
-
-# SCENARIO 3: Aggressive Revenue Maximization
-scenario3 = {
-    'name': 'Aggressive Pricing',
-    'peak_multiplier': {
-        'Foreign_NonResident': 1.50,   # Rwanda-level pricing
-        'Foreign_Resident': 1.35,
-        'Rest_of_Africa': 1.20,
-        'East_African': 1.0
-    },
-    'offpeak_multiplier': {
-        'Foreign_NonResident': 0.90,
-        'Foreign_Resident': 0.85,
-        'Rest_of_Africa': 0.70,
-        'East_African': 0.60
-    }
-}
-
-scenarios = [scenario1, scenario2, scenario3]
+# Scenarios (current, moderate dynamic, aggressive) from pricing_config.json
+scenarios = config['scenarios']
+recommended_idx = [s['name'] for s in scenarios].index(config['recommended_scenario'])
+recommended = scenarios[recommended_idx]
 
 # ============================================================================
 # 3.3 CALCULATE REVENUE FOR EACH SCENARIO
@@ -118,14 +73,13 @@ for scenario in scenarios:
     
     total_revenue = 0
     
-    for segment in segments:
+    # Month-level price schedule; Peak/Off-Peak pricing is its two-season case
+    schedule = scenario_schedule(scenario, peak_months, current_prices)
+    monthly_prices = schedule[df_scenario['Month'].to_numpy() - 1]
+    
+    for i, segment in enumerate(segments):
         # Calculate new prices
-        df_scenario[f'{segment}_Price'] = df_scenario.apply(
-            lambda row: current_prices[segment] * (
-                scenario['peak_multiplier'][segment] if row['Season_Type'] == 'Peak' 
-                else scenario['offpeak_multiplier'][segment]
-            ), axis=1
-        )
+        df_scenario[f'{segment}_Price'] = monthly_prices[:, i]
         
         # Calculate demand change based on elasticity
         price_change_pct = (df_scenario[f'{segment}_Price'] / current_prices[segment]) - 1
@@ -195,9 +149,9 @@ for i, row in comparison.iterrows():
                   f"+{row['Revenue_vs_Baseline']:.1f}%", 
                   ha='center', fontsize=11, fontweight='bold')
 
-# Monthly revenue trend (Scenario 2)
-df_scenario2 = results[1]['DataFrame']
-axes[1,0].plot(df_scenario2.index, df_scenario2['Total_Revenue_New']/1000, 
+# Monthly revenue trend (recommended scenario)
+df_recommended = results[recommended_idx]['DataFrame']
+axes[1,0].plot(df_recommended.index, df_recommended['Total_Revenue_New']/1000, 
               linewidth=2, color='#F18F01', label='Optimized')
 axes[1,0].plot(df.index, df['Total_Revenue']/1000, 
               linewidth=2, color='#2E86AB', alpha=0.6, label='Current')
@@ -207,9 +161,9 @@ axes[1,0].set_xlabel('Date')
 axes[1,0].legend()
 axes[1,0].grid(True, alpha=0.3)
 
-# Peak vs Off-Peak pricing (Scenario 2)
-peak_prices = [current_prices[seg] * scenario2['peak_multiplier'][seg] for seg in segments]
-offpeak_prices = [current_prices[seg] * scenario2['offpeak_multiplier'][seg] for seg in segments]
+# Peak vs Off-Peak pricing (recommended scenario)
+peak_prices = [current_prices[seg] * recommended['peak_multiplier'][seg] for seg in segments]
+offpeak_prices = [current_prices[seg] * recommended['offpeak_multiplier'][seg] for seg in segments]
 x = np.arange(len(segments))
 width = 0.35
 
@@ -241,10 +195,10 @@ for segment in segments:
     rec = {
         'Segment': segment.replace('_', ' '),
         'Current_Price': current_prices[segment],
-        'Peak_Price': current_prices[segment] * scenario2['peak_multiplier'][segment],
-        'OffPeak_Price': current_prices[segment] * scenario2['offpeak_multiplier'][segment],
-        'Peak_Change': (scenario2['peak_multiplier'][segment] - 1) * 100,
-        'OffPeak_Change': (scenario2['offpeak_multiplier'][segment] - 1) * 100
+        'Peak_Price': current_prices[segment] * recommended['peak_multiplier'][segment],
+        'OffPeak_Price': current_prices[segment] * recommended['offpeak_multiplier'][segment],
+        'Peak_Change': (recommended['peak_multiplier'][segment] - 1) * 100,
+        'OffPeak_Change': (recommended['offpeak_multiplier'][segment] - 1) * 100
     }
     recommendations.append(rec)
 
@@ -259,43 +213,48 @@ comparison.to_csv('scenario_comparison.csv', index=False)
 # ============================================================================
 # 3.6 WRITE COMPREHENSIVE SUMMARY
 # ============================================================================
+revenue_increase = results[recommended_idx]['Annual_Revenue'] - baseline_revenue_annual
+increase_pct = comparison.iloc[recommended_idx]['Revenue_vs_Baseline']
+money = '${:,.0f}'
+
+report = Report('Revenue Optimization Results', facts={
+    'baseline_annual_revenue': baseline_revenue_annual, 'baseline_monthly_revenue': baseline_revenue_monthly,
+    'recommended': recommended['name'], 'recommended_annual_revenue': results[recommended_idx]['Annual_Revenue'],
+    'revenue_increase': revenue_increase, 'revenue_increase_pct': increase_pct,
+    'conservation_share': config['conservation_share'],
+    'conservation_increase': revenue_increase * config['conservation_share'],
+    'prices': recommendations_df.to_dict(orient='list')
+})
+report.section('Baseline (Current Pricing)')
+report.metrics({'Average Annual Revenue': money.format(baseline_revenue_annual),
+                'Average Monthly Revenue': money.format(baseline_revenue_monthly)})
+report.section('Scenario Comparison')
+report.table(comparison, formats={'Annual_Revenue': money, 'Monthly_Revenue': money,
+                                  'Total_Permits_5yr': '{:,.0f}', 'Revenue_vs_Baseline': '{:+.1f}%'})
+report.section(f"Recommended Pricing Strategy ({recommended['name']})")
+report.table(recommendations_df, formats={'Current_Price': money, 'Peak_Price': money, 'OffPeak_Price': money,
+                                          'Peak_Change': '{:+.0f}%', 'OffPeak_Change': '{:+.0f}%'})
+report.section('Key Benefits')
+report.bullets([
+    f"Additional Annual Revenue: ${revenue_increase:,.0f} (+{increase_pct:.1f}%)",
+    f"Conservation funding increase: ${revenue_increase * config['conservation_share']:,.0f} "
+    f"(assuming {config['conservation_share']:.0%} allocation)",
+    "Smoothed seasonal demand distribution",
+    "Maintained affordability for East African citizens",
+    "Capitalized on inelastic foreign demand during peak seasons",
+    "Stimulated off-peak tourism through strategic discounts"
+])
+report.save('optimization_results.json')
 with open('optimization_results.txt', 'w') as f:
-    f.write("="*70 + "\n")
-    f.write("REVENUE OPTIMIZATION RESULTS\n")
-    f.write("="*70 + "\n\n")
-    
-    f.write("BASELINE (CURRENT PRICING)\n")
-    f.write("-"*70 + "\n")
-    f.write(f"Average Annual Revenue:  ${baseline_revenue_annual:,.0f}\n")
-    f.write(f"Average Monthly Revenue: ${baseline_revenue_monthly:,.0f}\n\n")
-    
-    f.write("SCENARIO COMPARISON\n")
-    f.write("-"*70 + "\n")
-    f.write(comparison.to_string(index=False))
-    f.write("\n\n")
-    
-    f.write("RECOMMENDED PRICING STRATEGY (Moderate Dynamic Pricing)\n")
-    f.write("-"*70 + "\n")
-    f.write(recommendations_df.to_string(index=False))
-    f.write("\n\n")
-    
-    f.write("KEY BENEFITS\n")
-    f.write("-"*70 + "\n")
-    revenue_increase = results[1]['Annual_Revenue'] - baseline_revenue_annual
-    f.write(f"• Additional Annual Revenue: ${revenue_increase:,.0f} (+{comparison.iloc[1]['Revenue_vs_Baseline']:.1f}%)\n")
-    f.write(f"• Conservation funding increase: ${revenue_increase * 0.7:,.0f} (assuming 70% allocation)\n")
-    f.write("• Smoothed seasonal demand distribution\n")
-    f.write("• Maintained affordability for East African citizens\n")
-    f.write("• Capitalized on inelastic foreign demand during peak seasons\n")
-    f.write("• Stimulated off-peak tourism through strategic discounts\n")
-
-print("✓ Saved: optimization_results.txt")
+    f.write(render_text(report))
+
+print("✓ Saved: optimization_results.txt, optimization_results.json")
 print("✓ Saved: pricing_recommendations.csv")
 print("✓ Saved: scenario_comparison.csv")
 
 print("\n" + "="*70)
 print("OPTIMIZATION ANALYSIS COMPLETE")
 print("="*70)
-print(f"\nRECOMMENDED STRATEGY: Moderate Dynamic Pricing")
-print(f"Projected Revenue Increase: +{comparison.iloc[1]['Revenue_vs_Baseline']:.1f}%")
-print(f"Additional Annual Funding: ${results[1]['Annual_Revenue'] - baseline_revenue_annual:,.0f}")
+print(f"\nRECOMMENDED STRATEGY: {recommended['name']}")
+print(f"Projected Revenue Increase: +{comparison.iloc[recommended_idx]['Revenue_vs_Baseline']:.1f}%")
+print(f"Additional Annual Funding: ${results[recommended_idx]['Annual_Revenue'] - baseline_revenue_annual:,.0f}")
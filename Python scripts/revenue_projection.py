@@ -0,0 +1,179 @@
+"""
+Multi-Year Revenue Projection
+Rolls forecast demand, price escalation, capacity and allocation rules forward for every policy at once
+"""
+
+import calendar
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from pricing_model import config, segments, segment_shares, segment_vector, demand_response
+from price_schedule import scenario_schedule
+from capacity_allocation import park_daily_permits, east_african_min_share
+from forecast_registry import ForecastRegistry, sarima_spec
+from forecast_optimization import training_series, forecast_start, forecast_horizon
+from scenario_store import ScenarioResultWriter
+
+projection_years = 10
+
+# Permits per day added by each newly habituated group (8 visitors per group)
+permits_per_group = 8
+
+# Policy axes; every combination is projected
+policy_axes = {
+    'Scenario': [scenario['name'] for scenario in config['scenarios']],
+    'Price_Escalation': [0.00, 0.01, 0.02, 0.03, 0.04, 0.05, 0.06, 0.07, 0.08],
+    'Demand_Growth': [-0.02, 0.00, 0.02, 0.04, 0.06, 0.08],
+    'New_Groups': [0, 1, 2, 3],
+    'Allocation_Rule': ['proportional', 'priority'],
+    'Conservation_Share': [0.6, 0.7, 0.8]
+}
+
+# New groups open one at a time from this projection year onward
+expansion_start_year = 2
+
+
+def projection_policies(axes=None):
+    """DataFrame with one row per combination of policy values."""
+    axes = axes or policy_axes
+    return pd.MultiIndex.from_product(list(axes.values()), names=list(axes)).to_frame(index=False)
+
+
+def base_year_demand(forecast_file=None):
+    """Monthly permit forecast for the first projection year (12 values, January first)."""
+    forecast_file = forecast_file or f'demand_forecast_{forecast_start.year}.csv'
+    if os.path.exists(forecast_file):
+        forecast_df = pd.read_csv(forecast_file, parse_dates=['Date'])
+    else:
+        df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
+        forecast_df = ForecastRegistry().forecast(training_series(df), sarima_spec,
+                                                  start=forecast_start, horizon=forecast_horizon)
+    forecast_df = forecast_df.sort_values('Date').head(12)
+    return forecast_df.set_index(forecast_df['Date'].dt.month)['Forecasted_Permits'].reindex(range(1, 13)).to_numpy()
+
+
+def ration(demand, prices, capacity, priority, protected=None, min_share=east_african_min_share):
+    """
+    Permits sold when demand exceeds monthly capacity.
+
+    Proportional rationing turns every segment away at the same rate. Priority
+    rationing first reserves min_share of capacity for the protected segment
+    and then fills the rest highest price first, which is the solution of
+    CapacityAllocator's LP for a single park. priority is a boolean mask that
+    broadcasts against the leading axes of demand.
+    """
+    protected = segments.index('East_African') if protected is None else protected
+    total = demand.sum(axis=-1)
+    scale = np.divide(capacity, total, out=np.ones_like(total), where=total > 0)
+    proportional = demand * np.minimum(scale, 1)[..., None]
+
+    reserved = np.minimum(demand[..., protected], min_share * capacity)
+    remaining = demand.copy()
+    remaining[..., protected] -= reserved
+    order = np.argsort(-prices, axis=-1, kind='stable')
+    queued = np.take_along_axis(remaining, order, axis=-1)
+    ahead = np.cumsum(queued, axis=-1) - queued
+    filled = np.clip((capacity - reserved)[..., None] - ahead, 0, queued)
+    by_price = np.empty_like(filled)
+    np.put_along_axis(by_price, order, filled, axis=-1)
+    by_price[..., protected] += reserved
+
+    return np.where(np.asarray(priority)[..., None], by_price, proportional)
+
+
+def project(policies, base_demand, years=projection_years, first_year=forecast_start.year):
+    """
+    Per-year outcomes for every policy (N x years arrays).
+
+    Demand starts from the base-year monthly forecast and grows at each
+    policy's rate; prices follow the scenario schedule and escalate yearly,
+    with demand responding through the segment elasticities against current
+    prices. Capacity grows as new groups open and is rationed by the
+    policy's allocation rule.
+    """
+    calendar_years = first_year + np.arange(years)
+    t = np.arange(years)[None, :]
+
+    schedules = {scenario['name']: scenario_schedule(scenario) for scenario in config['scenarios']}
+    schedule = np.stack([schedules[name] for name in policies['Scenario']])           # N x 12 x S
+    escalation = (1 + policies['Price_Escalation'].to_numpy()[:, None]) ** t           # N x Y
+    growth = (1 + policies['Demand_Growth'].to_numpy()[:, None]) ** t                  # N x Y
+
+    prices = schedule[:, None] * escalation[:, :, None, None]                          # N x Y x 12 x S
+    base = base_demand[None, None, :, None] * growth[:, :, None, None] * segment_vector(segment_shares)
+    demand = demand_response(base, prices)
+
+    groups = np.minimum(policies['New_Groups'].to_numpy()[:, None],
+                        np.clip(t - expansion_start_year + 1, 0, None))                # N x Y
+    daily = sum(park_daily_permits.values()) + permits_per_group * groups
+    days = np.array([[calendar.monthrange(year, month)[1] for month in range(1, 13)] for year in calendar_years])
+    capacity = daily[:, :, None] * days[None]                                          # N x Y x 12
+
+    priority = (policies['Allocation_Rule'] == 'priority').to_numpy()[:, None, None]
+    sold = ration(demand, prices, capacity, priority)
+
+    revenue = (sold * prices).sum(axis=(2, 3))
+    return {
+        'Year': calendar_years,
+        'Revenue': revenue,
+        'Permits': sold.sum(axis=(2, 3)),
+        'Unserved': (demand - sold).sum(axis=(2, 3)),
+        'Utilization': sold.sum(axis=(2, 3)) / capacity.sum(axis=2),
+        'Conservation_Funding': revenue * policies['Conservation_Share'].to_numpy()[:, None]
+    }
+
+
+def projection_table(policies, projection):
+    """Long table with one row per (policy, year)."""
+    years = projection['Year']
+    table = policies.loc[policies.index.repeat(len(years))].reset_index(names='Policy')
+    table.insert(1, 'Year', np.tile(years, len(policies)))
+    for column in ['Revenue', 'Permits', 'Unserved', 'Utilization', 'Conservation_Funding']:
+        table[column] = projection[column].ravel()
+    table['Cumulative_Conservation_Funding'] = np.cumsum(projection['Conservation_Funding'], axis=1).ravel()
+    return table
+
+
+if __name__ == '__main__':
+    print("="*70)
+    print("MULTI-YEAR REVENUE PROJECTION")
+    print("="*70)
+
+    base_demand = base_year_demand()
+    policies = projection_policies()
+    print(f"\n✓ Base year {forecast_start.year}: {base_demand.sum():,.0f} forecast permits")
+    print(f"✓ {len(policies):,} policy combinations x {projection_years} years")
+
+    start = time.perf_counter()
+    projection = project(policies, base_demand)
+    table = projection_table(policies, projection)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Projected {len(table):,} policy-years in {elapsed:.2f}s")
+
+    # Reference case: configured conservation share, 3% escalation, 4% growth, no new groups
+    reference = table[(table['Price_Escalation'] == 0.03) & (table['Demand_Growth'] == 0.04) &
+                      (table['New_Groups'] == 0) & (table['Allocation_Rule'] == 'priority') &
+                      (table['Conservation_Share'] == config['conservation_share'])]
+    print("\nAnnual revenue ($M), 3% escalation, 4% demand growth, current capacity:")
+    print((reference.pivot(index='Year', columns='Scenario', values='Revenue') / 1e6).round(2).to_string())
+    print(f"\nConservation funding ($M, {config['conservation_share']:.0%} allocation):")
+    print((reference.pivot(index='Year', columns='Scenario', values='Conservation_Funding') / 1e6).round(2).to_string())
+
+    final = table[table['Year'] == table['Year'].max()]
+    print(f"\n{projection_years}-year cumulative conservation funding across all policies ($M):")
+    print((final.groupby('Scenario')['Cumulative_Conservation_Funding'].describe(percentiles=[0.05, 0.5, 0.95])
+           [['min', '5%', '50%', '95%', 'max']] / 1e6).round(1).to_string())
+
+    print("\nMedian capacity utilization in the final year by new groups opened:")
+    print(final.groupby('New_Groups')['Utilization'].median().map('{:.1%}'.format).to_string())
+
+    with ScenarioResultWriter('revenue_projections.arrow') as writer:
+        writer.write(table)
+    print("\n✓ Saved: revenue_projections.arrow")
+
+    print("\n" + "="*70)
+    print("REVENUE PROJECTION COMPLETE")
+    print("="*70)
@@ -5,40 +5,66 @@ Runs complete gorilla permit pricing analysis
 
 import subprocess
 import sys
+import time
 
+from scheduler import Stage, run_stages
+
+
+def run_script(script):
+    """Run an analysis script and return its console output."""
+    result = subprocess.run([sys.executable, script],
+                            capture_output=True,
+                            text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{script} exited with code {result.returncode}\n{result.stdout}{result.stderr}")
+    return result.stdout
+
+
+# (script, description, scripts it depends on)
 scripts = [
-    ('gorilla_pricing_analysis.py', 'Data Loading & Preparation'),
-    ('eda_and_modeling.py', 'Exploratory Data Analysis'),
-    ('forecasting_elasticity.py', 'Forecasting & Elasticity'),
-    ('revenue_optimization.py', 'Revenue Optimization')
+    ('gorilla_pricing_analysis.py', 'Data Loading & Preparation', []),
+    ('eda_and_modeling.py', 'Exploratory Data Analysis', ['gorilla_pricing_analysis.py']),
+    ('forecasting_elasticity.py', 'Forecasting & Elasticity', ['gorilla_pricing_analysis.py']),
+    ('revenue_optimization.py', 'Revenue Optimization', ['gorilla_pricing_analysis.py']),
+    ('forecast_optimization.py', 'Forward-Looking Optimization', ['forecasting_elasticity.py']),
+    ('revenue_projection.py', 'Multi-Year Revenue Projection', ['forecasting_elasticity.py']),
+    ('competitor_pricing.py', 'Competitor-Response Equilibrium', ['gorilla_pricing_analysis.py']),
+    ('booking_limits.py', 'Nested Booking Limits', ['forecasting_elasticity.py']),
+    ('model_zoo.py', 'Forecast Model Zoo', ['gorilla_pricing_analysis.py']),
+    ('dashboard.py', 'Interactive Dashboard', ['forecasting_elasticity.py']),
+    ('report_builder.py', 'Structured Reports', ['eda_and_modeling.py', 'forecasting_elasticity.py', 'revenue_optimization.py'])
 ]
 
-print("="*70)
-print("GORILLA PERMIT PRICING OPTIMIZATION - COMPLETE ANALYSIS")
-print("="*70)
-
-for i, (script, description) in enumerate(scripts, 1):
-    print(f"\n[{i}/{len(scripts)}] Running: {description}")
-    print("-"*70)
-    
-    try:
-        result = subprocess.run([sys.executable, script], 
-                              capture_output=False, 
-                              text=True, 
-                              check=True)
-        print(f"✓ {description} completed successfully")
-    except subprocess.CalledProcessError as e:
-        print(f"✗ Error in {script}: {e}")
-        continue
-    except Exception as e:
-        print(f"✗ Unexpected error: {e}")
-        continue
-
-print("\n" + "="*70)
-print("COMPLETE ANALYSIS FINISHED")
-print("="*70)
-print("\nGenerated Files:")
-print("  Data: processed_permit_data.csv, demand_forecast_2024.csv")
-print("  Visualizations: 01-08_*.png (8 figures)")
-print("  Results: eda_summary.txt, elasticity_results.txt, optimization_results.txt")
-print("  Recommendations: pricing_recommendations.csv, scenario_comparison.csv")
+if __name__ == '__main__':
+    print("="*70)
+    print("GORILLA PERMIT PRICING OPTIMIZATION - COMPLETE ANALYSIS")
+    print("="*70)
+
+    # Each script runs in its own subprocess, so threads are enough to overlap them
+    stages = [Stage(script, run_script, args=(script,), deps=deps) for script, _, deps in scripts]
+    start = time.perf_counter()
+    outcomes = run_stages(stages, executor='thread', echo=False)
+    elapsed = time.perf_counter() - start
+
+    for i, (script, description, _) in enumerate(scripts, 1):
+        outcome = outcomes[script]
+        print(f"\n[{i}/{len(scripts)}] Running: {description}")
+        print("-"*70)
+        if outcome['error']:
+            print(f"✗ Error in {script}: {outcome['error']}")
+        else:
+            print(outcome['result'], end='')
+            print(f"✓ {description} completed successfully ({outcome['seconds']:.1f}s)")
+
+    print("\n" + "="*70)
+    print(f"COMPLETE ANALYSIS FINISHED ({elapsed:.1f}s wall clock, "
+          f"{sum(o['seconds'] for o in outcomes.values()):.1f}s of stage time)")
+    print("="*70)
+    print("\nGenerated Files:")
+    print("  Data: processed_permit_data.csv, demand_forecast_2024.csv, revenue_projections.arrow,")
+    print("        model_zoo_scores.csv, model_zoo_forecast_2024.csv")
+    print("  Visualizations: 01-08_*.png (8 figures), dashboard.html")
+    print("  Results: eda_summary, elasticity_results, optimization_results (.txt, .json)")
+    print("  Reports: reports/*.docx, reports/*.md, reports/parks/ (one per park)")
+    print("  Recommendations: pricing_recommendations.csv, scenario_comparison.csv, forecast_optimization.csv,")
+    print("                   competitor_equilibrium.csv, booking_limits_2024.csv")
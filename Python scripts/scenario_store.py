@@ -0,0 +1,176 @@
+"""
+Scenario Result Store
+Incremental Arrow / Parquet output for large scenario sweeps, read back via memory mapping
+"""
+
+import json
+import operator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+_ops = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge
+}
+_compute_ops = {
+    '==': 'equal', '!=': 'not_equal',
+    '<': 'less', '<=': 'less_equal',
+    '>': 'greater', '>=': 'greater_equal'
+}
+
+
+def _is_parquet(path):
+    return str(path).endswith('.parquet')
+
+
+def _column_stats(batch):
+    """Min/max of each numeric column in a record batch."""
+    stats = {}
+    for name, column in zip(batch.schema.names, batch.columns):
+        if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+            result = pc.min_max(column)
+            if result['min'].is_valid:
+                stats[name] = [result['min'].as_py(), result['max'].as_py()]
+    return stats
+
+
+class ScenarioResultWriter:
+    """
+    Append scenario results as record batches.
+
+    Paths ending in .parquet write one row group per batch (with Parquet's
+    column statistics); anything else writes an Arrow IPC file whose batches
+    carry min/max statistics as custom metadata. The schema is taken from
+    the first batch written.
+    """
+
+    def __init__(self, path, compression='zstd'):
+        self.path = path
+        self.compression = compression
+        self.rows = 0
+        self._writer = None
+        self._sink = None
+
+    def write(self, data):
+        """Append a DataFrame or list of row dicts."""
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        if frame.empty:
+            return
+        if self._writer is None:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            self._open(table.schema)
+        else:
+            table = pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+
+        if _is_parquet(self.path):
+            self._writer.write_table(table)
+        else:
+            for batch in table.to_batches():
+                stats = json.dumps(_column_stats(batch)).encode()
+                self._writer.write_batch(batch, custom_metadata={'stats': stats})
+        self.rows += len(frame)
+
+    def _open(self, schema):
+        self._schema = schema
+        if _is_parquet(self.path):
+            self._writer = pq.ParquetWriter(self.path, schema, compression=self.compression,
+                                            write_statistics=True)
+        else:
+            self._sink = pa.OSFile(self.path, 'wb')
+            options = pa.ipc.IpcWriteOptions(compression=None)  # keep buffers mappable
+            self._writer = pa.ipc.new_file(self._sink, schema, options=options)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _batch_may_match(stats, filters):
+    # A batch can be skipped when a comparison is impossible within its [min, max]
+    for column, op, value in filters:
+        if column not in stats:
+            continue
+        low, high = stats[column]
+        if op == 'in':
+            if all(v < low or v > high for v in value):
+                return False
+        elif op == '==' and (value < low or value > high):
+            return False
+        elif op in ('<', '<=') and not _ops[op](low, value):
+            return False
+        elif op in ('>', '>=') and not _ops[op](high, value):
+            return False
+    return True
+
+
+def _filter_mask(table, filters):
+    mask = None
+    for column, op, value in filters:
+        if op == 'in':
+            condition = pc.is_in(table[column], value_set=pa.array(value))
+        else:
+            condition = getattr(pc, _compute_ops[op])(table[column], value)
+        mask = condition if mask is None else pc.and_(mask, condition)
+    return mask
+
+
+def open_scenarios(path, filters=None, columns=None):
+    """
+    Read scenario results as a pyarrow Table without loading the whole file.
+
+    filters is a list of (column, op, value) with op in ==, !=, <, <=, >, >=,
+    in. Arrow IPC files are memory-mapped, batches whose statistics rule
+    out the filter are never touched, and matching batches are zero-copy
+    views into the mapping. Parquet files prune row groups by their
+    statistics and decode only the requested columns.
+    """
+    filters = filters or []
+    if _is_parquet(path):
+        dnf = [(c, '=' if op == '==' else op, v) for c, op, v in filters] or None
+        return pq.read_table(path, columns=columns, filters=dnf, memory_map=True)
+
+    reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+    batches = []
+    for i in range(reader.num_record_batches):
+        batch, metadata = reader.get_batch_with_custom_metadata(i)
+        stats = json.loads(metadata['stats']) if metadata and 'stats' in metadata else {}
+        if _batch_may_match(stats, filters):
+            batches.append(batch)
+
+    table = pa.Table.from_batches(batches, schema=reader.schema)
+    if filters:
+        table = table.filter(_filter_mask(table, filters))
+    return table.select(columns) if columns else table
+
+
+def scenario_stats(path):
+    """Per-batch (or per-row-group) min/max statistics as a DataFrame."""
+    records = []
+    if _is_parquet(path):
+        metadata = pq.ParquetFile(path).metadata
+        for g in range(metadata.num_row_groups):
+            group = metadata.row_group(g)
+            for c in range(group.num_columns):
+                column = group.column(c)
+                if column.statistics is not None and column.statistics.has_min_max:
+                    records.append({'Batch': g, 'Column': column.path_in_schema, 'Rows': group.num_rows,
+                                    'Min': column.statistics.min, 'Max': column.statistics.max})
+    else:
+        reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+        for i in range(reader.num_record_batches):
+            batch, metadata = reader.get_batch_with_custom_metadata(i)
+            for column, (low, high) in json.loads(metadata['stats']).items():
+                records.append({'Batch': i, 'Column': column, 'Rows': batch.num_rows, 'Min': low, 'Max': high})
+    return pd.DataFrame(records)
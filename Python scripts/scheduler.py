@@ -0,0 +1,110 @@
+"""
+Stage Scheduler
+Runs independent analysis stages concurrently with deterministic output order
+"""
+
+import contextlib
+import io
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class Stage:
+    """A named unit of work: func(*args) runs once every stage in deps has succeeded."""
+
+    def __init__(self, name, func, args=(), deps=()):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.deps = tuple(deps)
+
+
+def _check_graph(stages):
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Stage names must be unique")
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in names:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+    # Kahn's algorithm; anything left over sits on a cycle
+    remaining = {stage.name: set(stage.deps) for stage in stages}
+    while True:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            break
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    if remaining:
+        raise ValueError(f"Dependency cycle among stages: {', '.join(sorted(remaining))}")
+
+
+def _run_captured(func, args, capture=True):
+    """Run a stage, capturing its printed output so it can be replayed in order."""
+    buffer = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(buffer) if capture else contextlib.nullcontext():
+            result = func(*args)
+        error = None
+    except Exception:
+        result, error = None, traceback.format_exc()
+    return {'result': result, 'output': buffer.getvalue(), 'error': error,
+            'seconds': time.perf_counter() - start}
+
+
+def run_stages(stages, max_workers=None, executor='process', echo=True):
+    """
+    Run stages as soon as their dependencies finish, on a worker pool.
+
+    Each stage's printed output is buffered and echoed in declaration order
+    (a stage is echoed once it and every stage declared before it are done),
+    so the log reads the same as a sequential run. Returns {name: outcome} in
+    declaration order, where outcome holds 'result', 'output', 'error' and
+    'seconds'. Stages whose dependencies failed are skipped, not run.
+
+    sys.stdout is process-global, so output is only captured with the
+    process executor; thread stages should return their output instead.
+    """
+    _check_graph(stages)
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    outcomes = {}
+    pending = {stage.name: stage for stage in stages}
+    running = {}
+    echoed = 0
+
+    def echo_ready():
+        nonlocal echoed
+        while echoed < len(stages) and stages[echoed].name in outcomes:
+            outcome = outcomes[stages[echoed].name]
+            if echo:
+                print(outcome['output'], end='')
+                if outcome['error']:
+                    print(outcome['error'], end='')
+            echoed += 1
+
+    with pool_class(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                failed = [dep for dep in stage.deps if dep in outcomes and outcomes[dep]['error']]
+                if failed:
+                    outcomes[name] = {'result': None, 'output': '', 'seconds': 0.0,
+                                      'error': f"Skipped: dependency '{failed[0]}' failed\n"}
+                    del pending[name]
+                elif all(dep in outcomes for dep in stage.deps):
+                    running[pool.submit(_run_captured, stage.func, stage.args, executor == 'process')] = name
+                    del pending[name]
+
+            echo_ready()
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes[running.pop(future)] = future.result()
+
+    echo_ready()
+    return {stage.name: outcomes[stage.name] for stage in stages}
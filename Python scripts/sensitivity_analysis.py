@@ -0,0 +1,213 @@
+"""
+Global Sensitivity Analysis
+Sobol indices and tornado study over the revenue model's assumptions
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from config import scenario_by_name
+from pricing_model import (config, segments, current_prices, elasticities, segment_shares, peak_months,
+                           gorilla_share, covid_factors, load_raw_inputs, segment_vector,
+                           monthly_permit_series, split_segments, demand_response)
+from shared_data import SharedDataset, attached, raw_inputs, shared_inputs
+
+# Recommended scenario's multipliers, evaluated against current pricing
+recommended = scenario_by_name(config, config['recommended_scenario'])
+peak_multiplier = segment_vector(recommended['peak_multiplier'])
+offpeak_multiplier = segment_vector(recommended['offpeak_multiplier'])
+
+# Alternative peak-season definitions; the factor picks one by index
+peak_options = [
+    peak_months,                      # Jun-Sep, Dec-Feb (baseline)
+    [6, 7, 8, 12, 1],                 # Core dry season only
+    [6, 7, 8, 9],                     # Mid-year only
+    [5, 6, 7, 8, 9, 12, 1, 2],        # Early mid-year start
+    [6, 7, 8, 9, 10, 12, 1, 2]        # Late mid-year finish
+]
+
+# (name, low, high, baseline)
+factors = [
+    ('gorilla_share', 0.30, 0.50, gorilla_share),
+    ('foreign_nonresident_share', 0.55, 0.75, segment_shares['Foreign_NonResident']),
+    ('east_african_share', 0.05, 0.15, segment_shares['East_African']),
+    ('covid_2020', 0.05, 0.20, covid_factors[2020]),
+    ('covid_2021', 0.40, 0.80, covid_factors[2021]),
+    ('peak_definition', 0, len(peak_options), 0),
+] + [
+    (f'elasticity_{segment}', 1.5 * elast, 0.5 * elast, elast)
+    for segment, elast in elasticities.items()
+]
+
+outputs = ['Scenario_Annual_Revenue', 'Revenue_vs_Baseline']
+
+_inputs = None
+
+
+def _init_worker(handle):
+    global _inputs
+    _inputs = raw_inputs(attached(handle))
+
+
+def evaluate(values, inputs):
+    """
+    Evaluate the revenue pipeline for a batch of factor settings.
+
+    values: n x len(factors) array in natural units. Returns n x 2 array of
+    (scenario annual revenue, % change vs current pricing).
+    """
+    bwindi_visitors, seasonality = inputs
+    col = {name: values[:, i] for i, (name, *_) in enumerate(factors)}
+    n_years = len(bwindi_visitors)
+
+    totals = monthly_permit_series(bwindi_visitors, seasonality, share=col['gorilla_share'],
+                                   covid_2020=col['covid_2020'], covid_2021=col['covid_2021'])
+
+    # Foreign residents and Rest of Africa keep their relative split of the remainder
+    base = np.array([segment_shares[s] for s in segments])
+    remainder = 1 - col['foreign_nonresident_share'] - col['east_african_share']
+    shares = np.column_stack([
+        col['foreign_nonresident_share'],
+        remainder * base[1] / (base[1] + base[2]),
+        remainder * base[2] / (base[1] + base[2]),
+        col['east_african_share']
+    ])
+    demand = split_segments(totals, shares)
+
+    options = np.array([np.isin(np.arange(1, 13), option) for option in peak_options])
+    peak_idx = np.clip(col['peak_definition'].astype(int), 0, len(peak_options) - 1)
+    is_peak = np.tile(options[peak_idx], (1, n_years))[..., None]
+
+    ref = np.array([current_prices[s] for s in segments], dtype=float)
+    prices = np.where(is_peak, ref * peak_multiplier, ref * offpeak_multiplier)
+    elast = np.column_stack([col[f'elasticity_{s}'] for s in segments])[:, None, :]
+
+    baseline = (demand * ref).sum(axis=(1, 2)) / n_years
+    scenario = (demand_response(demand, prices, ref, elast) * prices).sum(axis=(1, 2)) / n_years
+    return np.column_stack([scenario, (scenario / baseline - 1) * 100])
+
+
+def _evaluate_chunk(values):
+    return evaluate(values, _inputs)
+
+
+def evaluate_parallel(values, inputs, workers=None, chunk_size=4096):
+    """Evaluate factor settings in chunks across a process pool, preserving order."""
+    chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+    if workers == 1 or len(chunks) == 1:
+        inputs = raw_inputs(inputs) if isinstance(inputs, SharedDataset) else inputs
+        return np.vstack([evaluate(chunk, inputs) for chunk in chunks])
+    with shared_inputs(inputs) as dataset, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dataset.handle,)) as pool:
+        return np.vstack(list(pool.map(_evaluate_chunk, chunks)))
+
+
+def scale_factors(unit):
+    """Map unit-hypercube samples onto factor ranges."""
+    low = np.array([f[1] for f in factors], dtype=float)
+    high = np.array([f[2] for f in factors], dtype=float)
+    return low + unit * (high - low)
+
+
+def sobol_indices(inputs, n_base=1024, seed=42, workers=None):
+    """
+    First-order (Saltelli 2010) and total-order (Jansen) Sobol indices.
+
+    Uses n_base * (d + 2) model evaluations, all batched through evaluate().
+    """
+    d = len(factors)
+    sample = qmc.Sobol(d=2 * d, scramble=True, seed=seed).random(n_base)
+    A, B = sample[:, :d], sample[:, d:]
+    AB = np.repeat(A[None, :, :], d, axis=0)
+    for i in range(d):
+        AB[i, :, i] = B[:, i]
+
+    design = np.vstack([A, B, AB.reshape(-1, d)])
+    y = evaluate_parallel(scale_factors(design), inputs, workers=workers)
+    fA, fB = y[:n_base], y[n_base:2 * n_base]
+    fAB = y[2 * n_base:].reshape(d, n_base, -1)
+
+    variance = np.var(np.vstack([fA, fB]), axis=0)
+    first = np.mean(fB[None] * (fAB - fA[None]), axis=1) / variance
+    total = 0.5 * np.mean((fA[None] - fAB) ** 2, axis=1) / variance
+    return first, total
+
+
+def tornado(inputs):
+    """One-at-a-time swings: each factor at its low and high with others at baseline."""
+    baseline = np.array([f[3] for f in factors], dtype=float)
+    rows = [baseline]
+    for i, (name, low, high, _) in enumerate(factors):
+        levels = range(len(peak_options)) if name == 'peak_definition' else (low, high)
+        for level in levels:
+            row = baseline.copy()
+            row[i] = level
+            rows.append(row)
+
+    y = evaluate(np.array(rows), inputs)
+    base_y, y = y[0], y[1:]
+
+    records = []
+    pos = 0
+    for name, *_ in factors:
+        n_levels = len(peak_options) if name == 'peak_definition' else 2
+        block = y[pos:pos + n_levels]
+        pos += n_levels
+        for k, output in enumerate(outputs):
+            records.append({
+                'Factor': name,
+                'Output': output,
+                'Low': block[:, k].min(),
+                'High': block[:, k].max(),
+                'Baseline': base_y[k],
+                'Swing': block[:, k].max() - block[:, k].min()
+            })
+    return pd.DataFrame(records)
+
+
+if __name__ == '__main__':
+    print("="*70)
+    print("GLOBAL SENSITIVITY ANALYSIS")
+    print("="*70)
+
+    inputs = load_raw_inputs()
+    print(f"\n✓ Loaded Bwindi visitors for {len(inputs[0])} years and monthly seasonality")
+    print(f"✓ {len(factors)} factors, outputs: {', '.join(outputs)}")
+
+    # Tornado (one-at-a-time)
+    print("\n[1] TORNADO ANALYSIS...")
+    tornado_df = tornado(inputs)
+    for output in outputs:
+        ranked = tornado_df[tornado_df['Output'] == output].sort_values('Swing', ascending=False)
+        print(f"\n{output}:")
+        print(ranked[['Factor', 'Low', 'High', 'Swing']].round(2).to_string(index=False))
+
+    # Sobol indices
+    print("\n[2] SOBOL INDICES...")
+    n_base = 4096
+    first, total = sobol_indices(inputs, n_base=n_base, workers=os.cpu_count())
+    print(f"✓ {n_base * (len(factors) + 2):,} model evaluations")
+
+    sobol_records = []
+    for k, output in enumerate(outputs):
+        for i, (name, *_) in enumerate(factors):
+            sobol_records.append({'Factor': name, 'Output': output,
+                                  'S1': first[i, k], 'ST': total[i, k]})
+    sobol_df = pd.DataFrame(sobol_records)
+    for output in outputs:
+        ranked = sobol_df[sobol_df['Output'] == output].sort_values('ST', ascending=False)
+        print(f"\n{output}:")
+        print(ranked[['Factor', 'S1', 'ST']].round(3).to_string(index=False))
+
+    results = sobol_df.merge(tornado_df, on=['Factor', 'Output'])
+    results['Rank'] = results.groupby('Output')['ST'].rank(ascending=False).astype(int)
+    results.sort_values(['Output', 'Rank']).to_csv('sensitivity_results.csv', index=False)
+    print("\n✓ Saved: sensitivity_results.csv")
+
+    print("\n" + "="*70)
+    print("SENSITIVITY ANALYSIS COMPLETE")
+    print("="*70)
@@ -0,0 +1,325 @@
+"""
+Shared-Memory Dataset
+Publishes preprocessed permit arrays once so process-pool workers read them zero-copy
+"""
+
+import inspect
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from pricing_model import segments, current_prices, elasticities, segment_vector
+
+# Array offsets are rounded up to a cache line
+_alignment = 64
+
+# Python 3.13+ lets attaching processes opt out of the resource tracker
+_attach_kwargs = {'track': False} if 'track' in inspect.signature(shared_memory.SharedMemory).parameters else {}
+
+# Datasets this process has attached to, by block name, reused across pool tasks
+_attached = {}
+
+
+def _label_values(values):
+    values = pd.Index(values)
+    if isinstance(values, pd.DatetimeIndex):
+        return values.to_numpy(dtype='datetime64[ns]')
+    return values.tolist()
+
+
+class SharedDataset:
+    """
+    Named numpy arrays in one shared-memory block.
+
+    publish() copies each array in once; workers are sent the small,
+    picklable handle and attach() to the same memory, so their arrays are
+    read-only views and nothing is pickled per task. Every array names its
+    axes (e.g. date x park x segment), and labelled axes can be sliced by
+    label with select(). The publishing process owns the block and frees
+    it on close().
+    """
+
+    def __init__(self, shm, layout, labels, owner=False):
+        self._shm = shm
+        self.layout = layout
+        self.labels = labels
+        self.owner = owner
+        self.arrays = {}
+        for name, (offset, shape, dtype, _) in layout.items():
+            array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            array.flags.writeable = False
+            self.arrays[name] = array
+
+    @classmethod
+    def publish(cls, arrays, labels=None):
+        """
+        Copy arrays into a new shared block.
+
+        arrays maps name -> (array, axes), axes naming each dimension;
+        labels maps an axis name to its labels (a list, or dates).
+        """
+        layout, size = {}, 0
+        for name, (array, axes) in arrays.items():
+            array = np.asarray(array)
+            if len(axes) != array.ndim:
+                raise ValueError(f"'{name}' has {array.ndim} dimensions but {len(axes)} axis names")
+            layout[name] = (size, array.shape, array.dtype.str, tuple(axes))
+            size += -(-array.nbytes // _alignment) * _alignment
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, (array, _) in arrays.items():
+            offset, shape, dtype, _ = layout[name]
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = array
+        labels = {axis: _label_values(values) for axis, values in (labels or {}).items()}
+        return cls(shm, layout, labels, owner=True)
+
+    @classmethod
+    def attach(cls, handle):
+        """Map an existing block from its handle."""
+        shm = shared_memory.SharedMemory(name=handle['name'], **_attach_kwargs)
+        return cls(shm, handle['layout'], handle['labels'])
+
+    @property
+    def handle(self):
+        """What a worker needs to attach: block name, array layout and axis labels."""
+        return {'name': self._shm.name, 'layout': self.layout, 'labels': self.labels}
+
+    @property
+    def nbytes(self):
+        return self._shm.size
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def _position(self, axis, key):
+        values = self.labels[axis]
+        if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+            # Dates: a single date, or an inclusive (start, end) range
+            if isinstance(key, tuple):
+                start, end = key
+                lo = 0 if start is None else np.searchsorted(values, np.datetime64(pd.Timestamp(start)), 'left')
+                hi = len(values) if end is None else np.searchsorted(values, np.datetime64(pd.Timestamp(end)), 'right')
+                return slice(int(lo), int(hi))
+            i = int(np.searchsorted(values, np.datetime64(pd.Timestamp(key))))
+            if i == len(values) or values[i] != np.datetime64(pd.Timestamp(key)):
+                raise KeyError(f"{key} not in axis '{axis}'")
+            return i
+        if isinstance(key, list):
+            return [values.index(k) for k in key]
+        return values.index(key)
+
+    def select(self, name, **keys):
+        """
+        Slice an array by axis labels, e.g. select('daily_demand', park='Bwindi',
+        date=('2024-06-01', '2024-08-31')).
+
+        A single label drops its axis; an inclusive date range keeps it. Both
+        return views of shared memory. A list of labels keeps the axis in the
+        order given, which copies.
+        """
+        array = self.arrays[name]
+        axes = self.layout[name][3]
+        unknown = set(keys) - set(axes)
+        if unknown:
+            raise KeyError(f"'{name}' has axes {axes}, not {sorted(unknown)}")
+
+        index, picks, drop = [slice(None)] * len(axes), {}, []
+        for axis, key in keys.items():
+            d = axes.index(axis)
+            position = self._position(axis, key)
+            if isinstance(position, list):
+                picks[d] = position
+            elif isinstance(position, int):
+                index[d] = slice(position, position + 1)
+                drop.append(d)
+            else:
+                index[d] = position
+        result = array[tuple(index)]
+        for d, position in picks.items():
+            result = np.take(result, position, axis=d)
+        return result.squeeze(axis=tuple(drop)) if drop else result
+
+    def to_series(self, name):
+        """A 1-D array as a Series indexed by its axis labels."""
+        axis = self.layout[name][3][0]
+        return pd.Series(self.arrays[name], index=pd.Index(self.labels[axis]), name=name)
+
+    def close(self):
+        """Detach; the owner also frees the block."""
+        self.arrays = {}
+        try:
+            self._shm.close()
+        except BufferError:
+            pass   # views still referenced elsewhere; the mapping goes when they do
+        if self.owner:
+            self._shm.unlink()
+            self.owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attached(handle):
+    """Attach once per process and reuse the mapping for every later task."""
+    if handle['name'] not in _attached:
+        _attached[handle['name']] = SharedDataset.attach(handle)
+    return _attached[handle['name']]
+
+
+def _input_arrays(inputs):
+    bwindi_visitors, seasonality = inputs
+    years = sorted(bwindi_visitors)
+    arrays = {'bwindi_visitors': (np.array([bwindi_visitors[y] for y in years], dtype=float), ('year',)),
+              'seasonality': (np.asarray(seasonality, dtype=float), ('month',))}
+    return arrays, {'year': years, 'month': list(range(1, 13))}
+
+
+def publish_inputs(inputs):
+    """Publish load_raw_inputs() output: Bwindi visitors by year and the seasonality index."""
+    return SharedDataset.publish(*_input_arrays(inputs))
+
+
+def raw_inputs(dataset):
+    """(bwindi_visitors, seasonality) as returned by load_raw_inputs, read from a shared dataset."""
+    visitors = dataset.to_series('bwindi_visitors')
+    return {int(year): float(value) for year, value in visitors.items()}, dataset['seasonality']
+
+
+@contextmanager
+def shared_inputs(inputs):
+    """
+    Yield a SharedDataset for pool initializers: inputs as returned by
+    load_raw_inputs() are published for the duration of the block; a
+    dataset that is already shared is passed through and left open.
+    """
+    if isinstance(inputs, SharedDataset):
+        yield inputs
+        return
+    with publish_inputs(inputs) as dataset:
+        yield dataset
+
+
+def publish_series(series_by_name):
+    """Publish date-indexed series, each under its own name with its own date axis."""
+    return SharedDataset.publish(
+        {name: (series.to_numpy(dtype=float), (f'{name}_date',)) for name, series in series_by_name.items()},
+        labels={f'{name}_date': series.index for name, series in series_by_name.items()})
+
+
+def publish_permit_data(df, inputs=None, daily=None):
+    """
+    Publish the preprocessed permit data for workers.
+
+    monthly_permits (date x segment) comes from processed_permit_data.csv;
+    current_prices and elasticities (segment) from the configuration; with
+    inputs, bwindi_visitors (year) and seasonality (month); with daily, a
+    (dates, demand, parks) tuple, daily_demand (... x date x park x segment)
+    where any leading axes are named sample.
+    """
+    arrays = {
+        'monthly_permits': (df[segments].to_numpy(dtype=np.int64), ('month_start', 'segment')),
+        'total_permits': (df['Total_Permits'].to_numpy(dtype=np.int64), ('month_start',)),
+        'current_prices': (segment_vector(current_prices), ('segment',)),
+        'elasticities': (segment_vector(elasticities), ('segment',))
+    }
+    labels = {'month_start': df.index, 'segment': segments}
+    if inputs is not None:
+        input_arrays, input_labels = _input_arrays(inputs)
+        arrays.update(input_arrays)
+        labels.update(input_labels)
+    if daily is not None:
+        dates, demand, parks = daily
+        demand = np.asarray(demand)
+        arrays['daily_demand'] = (demand, ('sample',) * (demand.ndim - 3) + ('date', 'park', 'segment'))
+        labels.update(date=dates, park=list(parks))
+    return SharedDataset.publish(arrays, labels)
+
+
+def _season_revenue(handle, park, season):
+    # Worker task: revenue at current prices for one park and date range in every sample
+    dataset = attached(handle)
+    demand = dataset.select('daily_demand', park=park, date=season)
+    return park, season[0], float((demand.sum(axis=-2) @ dataset['current_prices']).mean())
+
+
+def _season_revenue_pickled(demand, prices, dates, parks, park, season):
+    # The same task when the arrays travel with it
+    window = (dates >= pd.Timestamp(season[0])) & (dates <= pd.Timestamp(season[1]))
+    selected = demand[:, window, list(parks).index(park)]
+    return park, season[0], float((selected.sum(axis=-2) @ prices).mean())
+
+
+if __name__ == '__main__':
+    import os
+
+    from pricing_model import config, load_raw_inputs
+    from capacity_allocation import park_daily_permits
+    from booking_limits import daily_segment_demand
+    from revenue_projection import base_year_demand
+
+    print("="*70)
+    print("SHARED-MEMORY DATASET")
+    print("="*70)
+
+    df = pd.read_csv('processed_permit_data.csv', index_col=0, parse_dates=True)
+    dates, mu, capacity = daily_segment_demand(base_year_demand())
+    n_samples = 1000
+    demand = np.random.default_rng(config['random_seed']).poisson(mu, size=(n_samples,) + mu.shape).astype(np.int32)
+    parks = list(park_daily_permits)
+
+    start = time.perf_counter()
+    dataset = publish_permit_data(df, inputs=load_raw_inputs(), daily=(dates, demand, parks))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    handle_bytes = len(pickle.dumps(dataset.handle))
+    print(f"\n✓ Published {len(dataset.arrays)} arrays ({dataset.nbytes / 1e6:.1f} MB) in {elapsed_ms:.0f} ms")
+    print(f"✓ Handle sent to workers: {handle_bytes / 1e3:.1f} KB")
+    for name, (_, shape, dtype, axes) in dataset.layout.items():
+        print(f"  {name:16s} {' x '.join(axes):34s} {str(shape):20s} {np.dtype(dtype)}")
+
+    # One task per park and month-long season window
+    windows = [(str(month.date()), str((month + pd.offsets.MonthEnd(0)).date()))
+               for month in pd.date_range(dates[0], dates[-1], freq='MS')]
+    tasks = [(park, window) for park in parks for window in windows]
+    print(f"\nRevenue at current prices for {len(tasks)} (park, month) tasks over {n_samples:,} samples:")
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        start = time.perf_counter()
+        shared = list(pool.map(_season_revenue, [dataset.handle] * len(tasks), *zip(*tasks)))
+        shared_seconds = time.perf_counter() - start
+
+        prices = segment_vector(current_prices)
+        start = time.perf_counter()
+        pickled = list(pool.map(_season_revenue_pickled, [demand] * len(tasks), [prices] * len(tasks),
+                                [dates] * len(tasks), [parks] * len(tasks), *zip(*tasks)))
+        pickled_seconds = time.perf_counter() - start
+
+    # Explicit check rather than assert, which python -O strips
+    shared_revenue, pickled_revenue = np.array([r[2] for r in shared]), np.array([r[2] for r in pickled])
+    mismatched = ~np.isclose(shared_revenue, pickled_revenue)
+    if mismatched.any():
+        worst = int(np.argmax(np.abs(shared_revenue - pickled_revenue)))
+        dataset.close()
+        raise RuntimeError(f"Shared-memory and pickled results differ in {mismatched.sum()} of {len(tasks)} tasks "
+                           f"(largest: {shared[worst][0]} {shared[worst][1]}, "
+                           f"${shared_revenue[worst]:,.2f} vs ${pickled_revenue[worst]:,.2f})")
+    print(f"  ✓ Identical results for all {len(tasks)} tasks")
+    print(f"  Arrays pickled per task: {pickled_seconds:6.2f}s ({demand.nbytes * len(tasks) / 1e9:.1f} GB serialized)")
+    print(f"  Shared memory:           {shared_seconds:6.2f}s ({handle_bytes * len(tasks) / 1e6:.2f} MB serialized)")
+
+    summary = pd.DataFrame(shared, columns=['Park', 'Month', 'Expected_Revenue'])
+    print("\nExpected revenue by park ($M):")
+    print((summary.groupby('Park')['Expected_Revenue'].sum() / 1e6).round(2).to_string())
+
+    dataset.close()
+
+    print("\n" + "="*70)
+    print("SHARED DATASET DEMO COMPLETE")
+    print("="*70)
@@ -0,0 +1,144 @@
+"""
+Configuration Sweep
+Runs thousands of pricing configurations in parallel against shared preprocessed data
+
+Usage: python sweep.py [sweep_file.json] [output.arrow|.parquet|.csv]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from config import load_sweep, config_hash
+from pricing_model import (load_raw_inputs, monthly_permit_series, split_segments,
+                           segment_vector, demand_response)
+from price_schedule import scenario_schedule
+from scenario_store import ScenarioResultWriter, open_scenarios
+from shared_data import attached, raw_inputs, shared_inputs
+
+_inputs = None
+
+
+def _init_worker(handle):
+    # Workers read the inputs from shared memory rather than unpickling a copy
+    global _inputs
+    _inputs = raw_inputs(attached(handle))
+
+
+@lru_cache(maxsize=32)
+def _noise(seed, n_months):
+    # Same stream as gorilla_pricing_analysis.py, so the base config reproduces its dataset
+    return np.random.default_rng(seed).uniform(0.95, 1.05, size=n_months)
+
+
+def evaluate_config(config, inputs):
+    """
+    Rebuild the permit series under one configuration and price every scenario.
+
+    inputs are the cleaned UBOS inputs from load_raw_inputs(); everything that
+    depends on the configuration (gorilla share, COVID factors, segment
+    shares, seed, prices, elasticities, peak months) is applied here.
+    """
+    bwindi_visitors, seasonality = inputs
+    n_years = len(bwindi_visitors)
+    noise = _noise(config['random_seed'], 12 * n_years)
+
+    totals = monthly_permit_series(bwindi_visitors, seasonality, share=config['gorilla_share'],
+                                   covid_2020=config['covid_factors'][2020],
+                                   covid_2021=config['covid_factors'][2021], noise=noise)
+    demand = split_segments(totals, segment_vector(config['segment_shares'], config['segments']))
+    months = np.tile(np.arange(1, 13), n_years)
+
+    ref = segment_vector(config['current_prices'], config['segments'])
+    elast = segment_vector(config['elasticities'], config['segments'])
+    baseline = (demand * ref).sum() / n_years
+
+    metrics = {'Baseline_Annual_Revenue': baseline}
+    for scenario in config['scenarios']:
+        prices = scenario_schedule(scenario, config['peak_months'], config['current_prices'])[months - 1]
+        new_demand = demand_response(demand, prices, ref, elast)
+        annual = (new_demand * prices).sum() / n_years
+        metrics[f"{scenario['name']}: Annual_Revenue"] = annual
+        metrics[f"{scenario['name']}: Revenue_vs_Baseline"] = (annual / baseline - 1) * 100
+        metrics[f"{scenario['name']}: Annual_Permits"] = new_demand.sum() / n_years
+    return metrics
+
+
+def _evaluate_chunk(runs):
+    return [dict(Config_Hash=config_hash(config), **params, **evaluate_config(config, _inputs))
+            for params, config in runs]
+
+
+def iter_sweep(runs, inputs, workers=None, chunk_size=250):
+    """
+    Evaluate (params, config) runs across a process pool, yielding one
+    DataFrame per chunk in run order. inputs may be load_raw_inputs() output
+    or a SharedDataset already published with them.
+    """
+    runs = list(runs)
+    chunks = [runs[i:i + chunk_size] for i in range(0, len(runs), chunk_size)]
+    with shared_inputs(inputs) as dataset, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dataset.handle,)) as pool:
+        for rows in pool.map(_evaluate_chunk, chunks):
+            yield pd.DataFrame(rows)
+
+
+def run_sweep(runs, inputs, workers=None, chunk_size=250):
+    """Evaluate (params, config) runs across a process pool; rows keep run order."""
+    return pd.concat(iter_sweep(runs, inputs, workers, chunk_size)).set_index('Config_Hash')
+
+
+def write_sweep(runs, inputs, output_file, workers=None, chunk_size=250):
+    """Stream each evaluated chunk to an Arrow/Parquet file as soon as it completes."""
+    with ScenarioResultWriter(output_file) as writer:
+        for frame in iter_sweep(runs, inputs, workers, chunk_size):
+            writer.write(frame)
+    return writer.rows
+
+
+if __name__ == '__main__':
+    sweep_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                    'example_sweep.json')
+    output_file = sys.argv[2] if len(sys.argv) > 2 else 'sweep_results.arrow'
+
+    print("="*70)
+    print("CONFIGURATION SWEEP")
+    print("="*70)
+
+    inputs = load_raw_inputs()
+    runs = list(load_sweep(sweep_file))
+    print(f"\n✓ Expanded {os.path.basename(sweep_file)} into {len(runs):,} runs")
+
+    start = time.perf_counter()
+    if output_file.endswith('.csv'):
+        results = run_sweep(runs, inputs, workers=os.cpu_count())
+        results.to_csv(output_file)
+        n_rows = len(results)
+    else:
+        n_rows = write_sweep(runs, inputs, output_file, workers=os.cpu_count())
+        results = open_scenarios(output_file).to_pandas().set_index('Config_Hash')
+    elapsed = time.perf_counter() - start
+    print(f"✓ Evaluated {n_rows:,} configurations in {elapsed:.1f}s")
+    print(f"✓ Saved: {output_file} ({os.path.getsize(output_file) / 1e6:.1f} MB)")
+
+    revenue_cols = [c for c in results.columns if c.endswith('Revenue_vs_Baseline')]
+    print("\nRevenue vs baseline across the sweep (%):")
+    print(results[revenue_cols].describe().round(2).to_string())
+
+    # List-valued parameters (e.g. peak_months) cannot be filtered on, so demo the first numeric one
+    scalar = [p for p, v in runs[0][0].items() if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    if not output_file.endswith('.csv') and scalar:
+        # Downstream reads memory-map the file and only touch the batches and columns they need
+        param = scalar[0]
+        value = runs[len(runs) // 2][0][param]
+        target = f"{runs[0][1]['recommended_scenario']}: Revenue_vs_Baseline"
+        start = time.perf_counter()
+        subset = open_scenarios(output_file, filters=[(param, '==', value)], columns=['Config_Hash', target])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"\n✓ Filtered {param} == {value:g}: {subset.num_rows:,} rows in {elapsed_ms:.1f} ms")
+        print(subset.to_pandas()[target].describe().round(2).to_string())